@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the hop merge engine
+
+Merges synthetic raw entries shaped like the scraped sources (range
+strings, 0-5 aromas, Hopsteiner additional properties, Yakima Chief product
+variants) at growing sizes with run_scrapers.merge_hops() and reports the
+time per entry, which stays flat when the merge scales linearly.
+
+First the merge of the entries recorded in benchmark_merge_reference.json.gz
+is compared with that file: the output of the per-group merge_hops() loop
+used before the merge engine, frozen when the engine replaced it.  The only
+documented difference is that the old loop stored merged product variant
+ranges as strings (``str(min(...))``) where the engine keeps the float, so
+those values are converted with ``str()`` before the comparison.  The
+reference was built from synthetic_entries(), so changing that function (or
+the merge rules) means the check no longer applies.
+
+Usage:
+    python benchmark_merge.py [--sizes 10000 100000 1000000] [--skip-check]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+from typing import Dict, List
+
+from hop_database.models.hop_model import STANDARD_AROMAS, HopEntry
+from hop_database.models.merge import VARIANT_MAX_KEYS, VARIANT_MIN_KEYS
+from run_scrapers import merge_hops
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_merge_reference.json.gz")
+
+SOURCES = ["Yakima Chief Hops", "Barth Haas", "Hopsteiner", "Crosby Hops", "John I. Haas"]
+COUNTRIES = ["USA", "United States", "Germany", "UK", "England", "Czech Republic", "New Zealand", ""]
+NOTES = ["Lemon", "lime ", "Grapefruit", "Pine", "resin", "Stone fruit", "Herbal", "Spicy", "Floral"]
+VARIANT_TYPES = ["T-90 Pellets", "LupuLN2® Cryo Hops®", "Whole Cone"]
+VARIANT_RANGE_KEYS = ["alpha_from", "alpha_to", "beta_from", "beta_to", "oil_from", "oil_to", "co_h_from", "co_h_to"]
+EXTENDED_KEYS = ["total_oil", "b_pinene", "myrcene", "linalool", "humulene", "farnesene"]
+
+
+def _range(rng: random.Random, low: float, high: float) -> tuple:
+    """A "from"/"to" pair as the scrapers give it: strings, sometimes missing."""
+    if rng.random() < 0.1:
+        return "", ""
+    start = round(rng.uniform(low, high), 1)
+    return str(start), str(round(start + rng.uniform(0, high / 3), 1))
+
+
+def synthetic_entries(count: int, seed: int = 0) -> List[HopEntry]:
+    """
+    ``count`` raw entries of about ``count / 8`` varieties.  Aroma dicts and
+    note lists come from small pools shared between entries (the merge only
+    reads them), so a million entries fit in memory.
+    """
+    rng = random.Random(seed)
+    varieties = [f"Variety {index}" for index in range(max(1, count // 8))]
+    spellings = ["{}", "{}®", "{} Hops", "{} (US)", "{}™ Brand"]
+    aroma_pool = [
+        {aroma: rng.choice([0, round(rng.uniform(0, 5), 1)]) for aroma in rng.sample(STANDARD_AROMAS, rng.randint(5, 9))}
+        for _ in range(512)
+    ]
+    notes_pool = [rng.sample(NOTES, rng.randint(0, 4)) for _ in range(256)]
+
+    entries = []
+    for index in range(count):
+        source = rng.choice(SOURCES)
+        alpha, beta, oil, co_h = _range(rng, 2, 16), _range(rng, 2, 9), _range(rng, 0.3, 3), _range(rng, 15, 45)
+        entry = HopEntry(
+            name=rng.choice(spellings).format(rng.choice(varieties)),
+            country=rng.choice(COUNTRIES),
+            source=source,
+            href=f"https://example.com/{source.split()[0].lower()}/{index % 997}",
+            description=rng.choice(["", "", "A dual-purpose variety."]),
+            alpha_from=alpha[0], alpha_to=alpha[1],
+            beta_from=beta[0], beta_to=beta[1],
+            oil_from=oil[0], oil_to=oil[1],
+            co_h_from=co_h[0], co_h_to=co_h[1],
+            storage=rng.choice(["", "", "60-70%", "75%"]),
+            notes=rng.choice(notes_pool),
+            standardized_aromas=rng.choice(aroma_pool),
+        )
+        if source == "Hopsteiner":
+            for key in EXTENDED_KEYS:
+                entry.additional_properties[f"{key}_from"], entry.additional_properties[f"{key}_to"] = _range(rng, 0.1, 2)
+        if source == "Yakima Chief Hops":
+            for variant_type in rng.sample(VARIANT_TYPES, rng.randint(1, 2)):
+                values = _range(rng, 2, 16) + _range(rng, 2, 9) + _range(rng, 0.3, 3) + _range(rng, 15, 45)
+                entry.product_variants.append({"type": variant_type, **dict(zip(VARIANT_RANGE_KEYS, values))})
+        entries.append(entry)
+    return entries
+
+
+def _as_reference(hop: Dict) -> Dict:
+    """``hop`` (a to_dict() result) with merged variant ranges stored as the old loop did."""
+    for variant in hop["product_variants"]:
+        for key in VARIANT_MIN_KEYS | VARIANT_MAX_KEYS:
+            if isinstance(variant.get(key), float):
+                variant[key] = str(variant[key])
+    return hop
+
+
+def check_reference(path: str = REFERENCE_PATH) -> str:
+    """Merge the reference's entries and compare with its output; returns a summary line."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        reference = json.load(f)
+    merged = merge_hops(synthetic_entries(reference["entries"], reference["seed"]))
+    actual = json.loads(json.dumps([_as_reference(hop.to_dict()) for hop in merged]))
+    expected = reference["merged"]
+    if actual == expected:
+        return f"{reference['entries']} entries (seed {reference['seed']}): identical to the pre-engine merge"
+    if len(actual) != len(expected):
+        return f"DIFFERENT: {len(actual)} merged entries, the pre-engine merge gave {len(expected)}"
+    hop, old = next((hop, old) for hop, old in zip(actual, expected) if hop != old)
+    fields = [key for key in old.keys() | hop.keys() if hop.get(key) != old.get(key)]
+    return f"DIFFERENT: {hop['name']} differs in {', '.join(sorted(fields))}"
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hop merge engine")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+        help="Numbers of raw entries to merge (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--skip-check", action="store_true",
+        help="Do not compare with the pre-engine merge output first",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic entries")
+    args = parser.parse_args(argv)
+
+    if not args.skip_check:
+        summary = check_reference()
+        if summary.startswith("DIFFERENT"):
+            raise SystemExit(summary)
+        print(summary)
+
+    print(f"{'entries':>10} {'merged':>8} {'engine s':>9} {'µs/entry':>9}")
+    for size in args.sizes:
+        merged, seconds = _timed(merge_hops, synthetic_entries(size, args.seed))
+        print(f"{size:>10} {len(merged):>8} {seconds:>9.2f} {seconds / size * 1e6:>9.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
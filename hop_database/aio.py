@@ -0,0 +1,330 @@
+"""
+Asyncio fetch backend for the hop scrapers
+
+Runs hop page and PDF fetches concurrently from a single event loop instead of
+spending one thread per in-flight request.  Each host gets a concurrency
+limiter, so a scraper can schedule every hop page at once while the supplier
+only sees as many concurrent requests as it can take: with aiohttp the limit is
+adapted to latency and errors by ``throttle.AdaptiveLimiter``, starting from
+the pool size registered with ``http.configure_host()``.  Every attempt also
+takes a slot from the global scheduler (``scheduler.py``), which caps requests
+in flight across all sources and serves listing pages before hop pages and
+PDFs.
+
+Responses are returned as ``requests.Response`` objects (see
+``http.build_response``) and failures are raised as ``requests.exceptions``
+types, so the scrapers share their parsing and error handling between the sync
+and async paths.  aiohttp is used when it is installed; without it each fetch
+is delegated to the shared requests session on a worker thread.
+"""
+
+import asyncio
+import functools
+from typing import Awaitable, Callable, Dict, Optional, Sequence, TypeVar
+
+import requests
+
+from . import http, scheduler, throttle
+from .download import (
+    CHUNK_SIZE,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_STALL_TIMEOUT,
+    PDF_CONTENT_TYPES,
+    BodyWriter,
+    Download,
+    check_response,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+T = TypeVar("T")
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based), honouring Retry-After."""
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after.strip())
+    return http.BACKOFF_FACTOR * (2 ** attempt)
+
+
+def _in_slot(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking fetch on a worker thread whose slot the coroutine already holds."""
+    with scheduler.holding_slot():
+        return func(*args, **kwargs)
+
+
+class AsyncFetcher:
+    """
+    Fetches URLs concurrently with a bounded number of requests per host.
+
+    Use as an async context manager so the underlying client session is closed:
+
+        async with AsyncFetcher() as fetcher:
+            response = await fetcher.get(url)
+    """
+
+    def __init__(self, host_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            host_limits: Optional {url_or_host: max concurrent requests} overrides.
+                Listed hosts get that fixed limit; other hosts use the adaptive
+                limiter from ``throttle.limiter()``, which starts at the pool
+                size registered with ``http.configure_host()``.
+        """
+        self._host_limits = {
+            http.host_of(host): limit for host, limit in (host_limits or {}).items()
+        }
+        self._fixed_limiters: Dict[str, throttle.AdaptiveLimiter] = {}
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        if aiohttp is not None:
+            self._session = aiohttp.ClientSession(
+                headers=http.DEFAULT_HEADERS,
+                # Concurrency is bounded per host by the limiters below
+                connector=aiohttp.TCPConnector(limit=0),
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the client session and its keep-alive connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _limiter(self, host: str) -> throttle.AdaptiveLimiter:
+        limit = self._host_limits.get(host)
+        if limit is None and self._session is not None:
+            return throttle.limiter(host)
+        # Without aiohttp, requests' blocking connection pool caps the host anyway
+        limiter = self._fixed_limiters.get(host)
+        if limiter is None:
+            limit = limit or http.host_pool_size(host)
+            limiter = self._fixed_limiters[host] = throttle.AdaptiveLimiter(
+                host, limit, minimum=limit, maximum=limit
+            )
+        return limiter
+
+    async def get(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        priority: int = scheduler.PAGE,
+    ) -> requests.Response:
+        """
+        GET ``url``, waiting for a free slot on its host first.
+
+        Args:
+            url: URL to fetch.
+            timeout: Connect/read timeout in seconds; defaults to the host's
+                configured timeout (same semantics as ``requests``).
+            headers: Extra headers merged over the default headers.
+            priority: Scheduler priority (``scheduler.LISTING`` for listing pages).
+
+        Returns:
+            The ``requests.Response``.  Callers decide whether to ``raise_for_status()``.
+        """
+        replayed = http.archive_replay(url)
+        if replayed is not None:
+            return replayed
+        if timeout is None:
+            timeout = http.host_timeout(url)
+        limiter = self._limiter(http.host_of(url))
+        if self._session is None:
+            loop = asyncio.get_running_loop()
+            http.check_deadline(url)
+            async with scheduler.slot_async(priority, limiter) as ticket:
+                try:
+                    response = await loop.run_in_executor(
+                        None, functools.partial(_in_slot, http.get, url, timeout=timeout, headers=headers)
+                    )
+                except requests.exceptions.Timeout:
+                    ticket.outcome = throttle.TIMEOUT
+                    raise
+                ticket.outcome = throttle.outcome_for_status(response.status_code)
+                return response
+        cached, fresh, request_headers = http.cache_lookup(url, headers)
+        if fresh is not None:
+            return http.archive_record(url, fresh)
+        response = await self._fetch(limiter, url, timeout, request_headers, priority)
+        return http.archive_record(url, http.cache_update(url, cached, response))
+
+    async def _fetch(
+        self,
+        limiter: throttle.AdaptiveLimiter,
+        url: str,
+        timeout: float,
+        headers: Optional[Dict[str, str]],
+        priority: int,
+    ) -> requests.Response:
+        """
+        Fetch with aiohttp, applying the same retry policy as the sync client.
+
+        Every attempt holds its own scheduler slot (under the host's limiter)
+        and reports its outcome, so backoff sleeps happen outside the limits
+        and the limiter sees each timeout, 429 and 5xx.
+        """
+        client_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=timeout
+        )
+        for attempt in range(http.MAX_RETRIES + 1):
+            http.check_deadline(url)
+            ticket = await scheduler.get_scheduler().acquire_async(priority, limiter)
+            retry_after = None
+            try:
+                async with self._session.get(
+                    url, headers=headers, timeout=client_timeout
+                ) as resp:
+                    body = await resp.read()
+                    ticket.outcome = throttle.outcome_for_status(resp.status)
+                    if resp.status not in http.RETRY_STATUS_CODES or attempt == http.MAX_RETRIES:
+                        return http.build_response(
+                            str(resp.url), resp.status, dict(resp.headers), body, resp.reason or ""
+                        )
+                    retry_after = resp.headers.get("Retry-After")
+            except asyncio.TimeoutError as exc:
+                ticket.outcome = throttle.TIMEOUT
+                raise requests.exceptions.Timeout(
+                    f"Timed out after {timeout}s fetching {url}"
+                ) from exc
+            except aiohttp.ClientConnectionError as exc:
+                if attempt == http.MAX_RETRIES:
+                    raise requests.exceptions.ConnectionError(f"{url}: {exc}") from exc
+            except aiohttp.ClientError as exc:
+                raise requests.exceptions.RequestException(f"{url}: {exc}") from exc
+            finally:
+                scheduler.get_scheduler().release(ticket)
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+        raise RuntimeError(f"Failed to fetch {url} after {http.MAX_RETRIES} retries")
+
+    async def download(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        content_types: Optional[Sequence[str]] = PDF_CONTENT_TYPES,
+        stall_timeout: float = DEFAULT_STALL_TIMEOUT,
+        deadline: Optional[float] = None,
+        priority: int = scheduler.PDF,
+    ) -> Download:
+        """
+        Coroutine variant of ``http.download()``: stream ``url`` into a spooled body.
+
+        Takes a scheduler slot (under the host's limiter) like get(), with the
+        same retry policy.
+        """
+        replayed = http.archive_replay(url, download=True)
+        if replayed is not None:
+            return Download.from_response(replayed, max_bytes, content_types)
+        if timeout is None:
+            timeout = http.host_timeout(url)
+        limiter = self._limiter(http.host_of(url))
+        if self._session is None:
+            loop = asyncio.get_running_loop()
+            http.check_deadline(url)
+            async with scheduler.slot_async(priority, limiter) as ticket:
+                try:
+                    result = await loop.run_in_executor(
+                        None,
+                        functools.partial(
+                            _in_slot, http.download, url, timeout=timeout, headers=headers,
+                            max_bytes=max_bytes, content_types=content_types,
+                            stall_timeout=stall_timeout, deadline=deadline,
+                        ),
+                    )
+                except requests.exceptions.Timeout:
+                    ticket.outcome = throttle.TIMEOUT
+                    raise
+                ticket.outcome = throttle.outcome_for_status(result.status_code)
+                return result
+        cached, fresh, request_headers = http.cache_lookup(url, headers, download=True)
+        if fresh is not None:
+            return Download.from_response(http.archive_record(url, fresh), max_bytes, content_types)
+        client_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=stall_timeout
+        )
+        for attempt in range(http.MAX_RETRIES + 1):
+            http.check_deadline(url)
+            ticket = await scheduler.get_scheduler().acquire_async(priority, limiter)
+            retry_after = None
+            try:
+                async with self._session.get(
+                    url, headers=request_headers, timeout=client_timeout
+                ) as resp:
+                    ticket.outcome = throttle.outcome_for_status(resp.status)
+                    if resp.status in http.RETRY_STATUS_CODES and attempt < http.MAX_RETRIES:
+                        retry_after = resp.headers.get("Retry-After")
+                    elif resp.status == 304 and cached is not None:
+                        response = http.cache_update(url, cached, Download(url, 304, dict(resp.headers)))
+                        return Download.from_response(
+                            http.archive_record(url, response), max_bytes, content_types
+                        )
+                    else:
+                        final_url = str(resp.url)
+                        check_response(final_url, resp.status, resp.headers, max_bytes, content_types)
+                        result = Download(final_url, resp.status, dict(resp.headers), reason=resp.reason or "")
+                        if result.ok:
+                            writer = BodyWriter(url, max_bytes, deadline)
+                            try:
+                                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                                    writer.write(chunk)
+                            except BaseException:
+                                writer.body.close()
+                                raise
+                            result.body = writer.finish()
+                        return http.archive_record(url, http.cache_update(url, cached, result))
+            except asyncio.TimeoutError as exc:
+                ticket.outcome = throttle.TIMEOUT
+                raise requests.exceptions.Timeout(
+                    f"{url} stalled for {stall_timeout}s"
+                ) from exc
+            except requests.exceptions.Timeout:
+                ticket.outcome = throttle.TIMEOUT
+                raise
+            except aiohttp.ClientConnectionError as exc:
+                if attempt == http.MAX_RETRIES:
+                    raise requests.exceptions.ConnectionError(f"{url}: {exc}") from exc
+            except aiohttp.ClientError as exc:
+                raise requests.exceptions.RequestException(f"{url}: {exc}") from exc
+            finally:
+                scheduler.get_scheduler().release(ticket)
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+        raise RuntimeError(f"Failed to download {url} after {http.MAX_RETRIES} retries")
+
+
+def run(
+    main: Callable[[AsyncFetcher], Awaitable[T]],
+    host_limits: Optional[Dict[str, int]] = None,
+) -> T:
+    """
+    Run ``main(fetcher)`` on a new event loop and return its result.
+
+    This is how the scrapers' synchronous ``scrape()`` entry points drive their
+    coroutine implementations.  Under ``http.deadline()`` the coroutine is
+    cancelled when the calling thread's deadline passes.
+
+    Raises:
+        http.DeadlineExceeded: If the deadline passed before ``main`` finished.
+    """
+    remaining = http.time_left()
+
+    async def _main() -> T:
+        async with AsyncFetcher(host_limits) as fetcher:
+            if remaining is None:
+                return await main(fetcher)
+            return await asyncio.wait_for(main(fetcher), max(0.0, remaining))
+
+    try:
+        return asyncio.run(_main())
+    except asyncio.TimeoutError as exc:
+        if remaining is None:
+            raise
+        raise http.DeadlineExceeded(f"Deadline passed after {remaining:.0f}s") from exc
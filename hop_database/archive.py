@@ -0,0 +1,216 @@
+"""
+Raw capture archive for scraping runs
+
+Every response body fetched during a run (HTML pages, JSON payloads, PDF spec
+sheets) is stored once, gzip-compressed, under the SHA-256 of its content.
+A per-run manifest maps each requested URL to its blob, status and headers.
+
+Installing a run with ``http.set_archive()`` either records into it or, for a
+run opened with ``RawArchive.open_run()``, replays it: every fetch is then
+answered from the archive with zero network I/O, so parsers and the merge step
+can be re-run over a complete dataset in seconds.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+
+from .download import Download, SpooledBody, body_of
+from .http import build_response
+
+# Response headers kept in the manifest (the body is stored decoded)
+ARCHIVED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class RawArchive:
+    """A directory of compressed, content-addressed blobs plus run manifests."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._objects_dir = os.path.join(directory, "objects")
+        self._runs_dir = os.path.join(directory, "runs")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest + ".gz")
+
+    def put_blob(self, data: Union[bytes, SpooledBody]) -> str:
+        """Store ``data`` (once) and return its SHA-256 hex digest."""
+        if isinstance(data, SpooledBody):
+            digest = data.sha256
+        else:
+            digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            if isinstance(data, SpooledBody):
+                # Compress spooled downloads chunk by chunk
+                with gzip.open(tmp_path, "wb") as f:
+                    for chunk in data.iter_chunks():
+                        f.write(chunk)
+            else:
+                with open(tmp_path, "wb") as f:
+                    f.write(gzip.compress(data))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        """Return the decompressed blob stored under ``digest``."""
+        with open(self._blob_path(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def get_blob_body(self, digest: str) -> SpooledBody:
+        """The blob stored under ``digest``, decompressed chunk by chunk into a SpooledBody."""
+        with gzip.open(self._blob_path(digest), "rb") as f:
+            return SpooledBody.from_stream(f)
+
+    def run_ids(self) -> List[str]:
+        """IDs of all recorded runs, oldest first."""
+        if not os.path.isdir(self._runs_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self._runs_dir) if name.endswith(".json"))
+
+    def new_run(self, run_id: Optional[str] = None) -> "ArchiveRun":
+        """Start recording a new run (the ID defaults to the current UTC timestamp)."""
+        run_id = run_id or time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        return ArchiveRun(self, run_id, {}, replaying=False)
+
+    def open_run(self, run_id: str) -> "ArchiveRun":
+        """
+        Open a recorded run for replay.
+
+        Args:
+            run_id: A run ID, or "latest" for the most recent run.
+
+        Raises:
+            FileNotFoundError: If no such run exists.
+        """
+        if run_id == "latest":
+            run_ids = self.run_ids()
+            if not run_ids:
+                raise FileNotFoundError(f"No archived runs in {self.directory}")
+            run_id = run_ids[-1]
+        manifest_path = os.path.join(self._runs_dir, run_id + ".json")
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        return ArchiveRun(self, run_id, manifest["responses"], replaying=True)
+
+    def save_manifest(self, run_id: str, responses: Dict[str, Dict]) -> str:
+        """Write a run manifest and return its path."""
+        os.makedirs(self._runs_dir, exist_ok=True)
+        path = os.path.join(self._runs_dir, run_id + ".json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"run_id": run_id, "responses": responses}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        return path
+
+    def prune(self, keep: int) -> Tuple[int, int]:
+        """
+        Delete all but the ``keep`` most recent runs.
+
+        Blobs no kept manifest references are deleted with them; blobs shared
+        with a kept run stay.  Must not run while another process is recording
+        into the same archive (its blobs are not referenced by a manifest yet).
+
+        Returns:
+            The number of runs and of blobs deleted.
+        """
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        run_ids = self.run_ids()
+        expired = run_ids[:-keep]
+        if not expired:
+            return 0, 0
+        referenced = set()
+        for run_id in run_ids[-keep:]:
+            with open(os.path.join(self._runs_dir, run_id + ".json"), "r") as f:
+                manifest = json.load(f)
+            referenced.update(entry["sha256"] for entry in manifest["responses"].values())
+        for run_id in expired:
+            os.remove(os.path.join(self._runs_dir, run_id + ".json"))
+        removed_blobs = 0
+        for prefix in os.listdir(self._objects_dir) if os.path.isdir(self._objects_dir) else []:
+            prefix_dir = os.path.join(self._objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                # Skip in-flight ".tmp" writes as well as anything still referenced
+                if name.endswith(".gz") and name[:-3] not in referenced:
+                    os.remove(os.path.join(prefix_dir, name))
+                    removed_blobs += 1
+        return len(expired), removed_blobs
+
+
+class ArchiveRun:
+    """One run of an archive: recording responses, or replaying recorded ones."""
+
+    def __init__(self, archive: RawArchive, run_id: str, responses: Dict[str, Dict], replaying: bool):
+        self.archive = archive
+        self.run_id = run_id
+        self.replaying = replaying
+        self._responses = responses  # requested URL → {"sha256", "status", "url", "headers"}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def record(self, url: str, response: requests.Response) -> None:
+        """Archive the body and metadata of ``response`` (or a Download) fetched for ``url``."""
+        if self.replaying:
+            return
+        digest = self.archive.put_blob(body_of(response))
+        headers = {
+            name: response.headers[name] for name in ARCHIVED_HEADERS if name in response.headers
+        }
+        with self._lock:
+            self._responses[url] = {
+                "sha256": digest,
+                "status": response.status_code,
+                "reason": response.reason or "",
+                "url": response.url or url,
+                "headers": headers,
+            }
+
+    def replay(self, url: str, download: bool = False) -> Union[requests.Response, Download]:
+        """
+        Return the archived response for ``url`` (as a Download with a spooled
+        body if ``download`` is set, so large PDFs are not held in memory).
+
+        Raises:
+            requests.exceptions.ConnectionError: If the URL was not fetched in
+                this run, so scrapers treat it like an unreachable page.
+        """
+        entry = self._responses.get(url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"{url} is not in archived run {self.run_id}"
+            )
+        if download:
+            ok = 200 <= entry["status"] < 300
+            return Download(
+                entry["url"],
+                entry["status"],
+                entry["headers"],
+                self.archive.get_blob_body(entry["sha256"]) if ok else None,
+                entry.get("reason", ""),
+            )
+        return build_response(
+            entry["url"],
+            entry["status"],
+            entry["headers"],
+            self.archive.get_blob(entry["sha256"]),
+            entry.get("reason", ""),
+        )
+
+    def save(self) -> Optional[str]:
+        """Write the manifest of a recording run; returns its path."""
+        if self.replaying:
+            return None
+        with self._lock:
+            responses = dict(self._responses)
+        return self.archive.save_manifest(self.run_id, responses)
@@ -0,0 +1,524 @@
+"""
+On-disk caches for the scraping pipeline
+
+``DiskCache`` is a size-bounded key/value store with least-recently-used
+eviction.  ``HttpCache`` builds on it to keep response bodies together with
+their ``ETag`` / ``Last-Modified`` validators, so repeated runs can revalidate
+with ``If-None-Match`` / ``If-Modified-Since`` and mostly receive
+``304 Not Modified`` instead of downloading every page and PDF again.
+``PdfParseCache`` stores the plain-dict results of the PDF parsers keyed by
+the SHA-256 of the PDF bytes, so unchanged spec sheets skip pdfplumber.
+"""
+
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+import requests
+
+from .download import Download, SpooledBody, body_of
+from .http import build_response
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+DEFAULT_PDF_MAX_BYTES = 64 * 1024 * 1024  # parse results are small JSON documents
+
+# Response headers kept with a cached body.  The body is stored decoded, so
+# transfer headers such as Content-Encoding / Content-Length are dropped.
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class DiskCache:
+    """
+    Size-bounded key/value store on disk with LRU eviction.
+
+    Each entry is a data file plus a small JSON metadata file, stored under a
+    two-level directory derived from the SHA-256 of the key.  Access times are
+    kept on the metadata file's mtime, so the LRU order survives restarts.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, list]] = None  # digest → [size, last_access]
+        self._total_bytes = 0
+        # Hard links handed out by get_body(), see _link_data()
+        self._links_dir = os.path.join(directory, "links")
+        self._link_ids = itertools.count()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _paths(self, digest: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, digest[:2], digest)
+        return base + ".data", base + ".json"
+
+    def _load_index(self) -> Dict[str, list]:
+        """Scan the cache directory once to learn entry sizes and access times."""
+        if self._index is None:
+            index: Dict[str, list] = {}
+            total = 0
+            # Links left behind by an earlier process that did not exit cleanly
+            if os.path.isdir(self._links_dir):
+                for name in os.listdir(self._links_dir):
+                    try:
+                        os.remove(os.path.join(self._links_dir, name))
+                    except OSError:
+                        pass
+            if os.path.isdir(self.directory):
+                for shard in os.listdir(self.directory):
+                    shard_dir = os.path.join(self.directory, shard)
+                    if not os.path.isdir(shard_dir):
+                        continue
+                    for name in os.listdir(shard_dir):
+                        if not name.endswith(".json"):
+                            continue
+                        digest = name[:-5]
+                        data_path, meta_path = self._paths(digest)
+                        try:
+                            size = os.path.getsize(data_path) + os.path.getsize(meta_path)
+                            last_access = os.path.getmtime(meta_path)
+                        except OSError:
+                            continue
+                        index[digest] = [size, last_access]
+                        total += size
+            self._index = index
+            self._total_bytes = total
+        return self._index
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        """Return (data, meta) for ``key``, or None if it is not cached."""
+        found = self._checkout(key, self._open_data)
+        if found is None:
+            return None
+        data_file, meta = found
+        with data_file:
+            return data_file.read(), meta
+
+    def get_body(self, key: str) -> Optional[Tuple[SpooledBody, Dict]]:
+        """
+        Return (body, meta) for ``key`` without reading the data, or None.
+
+        The body is a hard link to the entry's data file, so it stays readable
+        after the entry is evicted and is deleted when the body is closed.
+        """
+        found = self._checkout(key, self._link_data)
+        if found is None:
+            return None
+        data, meta = found
+        if isinstance(data, str):
+            return SpooledBody.from_file(data, meta.get("sha256")), meta
+        # No hard links on this file system: copy the opened file instead
+        with data:
+            return SpooledBody.from_stream(data), meta
+
+    def _checkout(self, key: str, claim: Callable[[str], Any]) -> Optional[Tuple[Any, Dict]]:
+        """
+        Look ``key`` up and mark it used, returning (claim(data_path), meta).
+
+        ``claim`` opens or links the data file under the lock, so eviction
+        cannot remove it first; the data itself is read after the lock is released.
+        """
+        digest = self._digest(key)
+        data_path, meta_path = self._paths(digest)
+        with self._lock:
+            index = self._load_index()
+            if digest not in index:
+                return None
+            try:
+                with open(meta_path, "r") as f:
+                    meta = json.load(f)
+                data = claim(data_path)
+            except (OSError, ValueError):
+                self._remove(digest)
+                return None
+            now = time.time()
+            index[digest][1] = now
+            try:
+                os.utime(meta_path, (now, now))
+            except OSError:
+                pass
+        return data, meta
+
+    @staticmethod
+    def _open_data(data_path: str) -> BinaryIO:
+        return open(data_path, "rb")
+
+    def _link_data(self, data_path: str) -> Union[str, BinaryIO]:
+        """A new hard link to ``data_path``, or the opened file where links are not supported."""
+        os.makedirs(self._links_dir, exist_ok=True)
+        link_path = os.path.join(
+            self._links_dir, f"{os.getpid()}-{next(self._link_ids)}-{os.path.basename(data_path)}"
+        )
+        try:
+            os.link(data_path, link_path)
+        except OSError:
+            return open(data_path, "rb")
+        return link_path
+
+    def put(self, key: str, data: Union[bytes, SpooledBody], meta: Optional[Dict] = None) -> None:
+        """
+        Store ``data`` (and JSON-serialisable ``meta``) under ``key``, evicting as needed.
+
+        A SpooledBody is copied to the cache in chunks rather than read into memory.
+        """
+        digest = self._digest(key)
+        data_path, meta_path = self._paths(digest)
+        meta_bytes = json.dumps(meta or {}).encode("utf-8")
+        size = len(data) + len(meta_bytes)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            for path, payload in ((data_path, data), (meta_path, meta_bytes)):
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    if isinstance(payload, SpooledBody):
+                        for chunk in payload.iter_chunks():
+                            f.write(chunk)
+                    else:
+                        f.write(payload)
+                os.replace(tmp_path, path)
+            if digest in index:
+                self._total_bytes -= index[digest][0]
+            index[digest] = [size, time.time()]
+            self._total_bytes += size
+            self._evict()
+
+    def update_meta(self, key: str, meta: Dict) -> None:
+        """Replace the metadata of an existing entry without rewriting its data."""
+        digest = self._digest(key)
+        data_path, meta_path = self._paths(digest)
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        with self._lock:
+            index = self._load_index()
+            if digest not in index:
+                return
+            tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(meta_bytes)
+            os.replace(tmp_path, meta_path)
+            try:
+                size = os.path.getsize(data_path) + len(meta_bytes)
+            except OSError:
+                self._remove(digest)
+                return
+            self._total_bytes += size - index[digest][0]
+            index[digest] = [size, time.time()]
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for digest, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(digest)
+
+    def _remove(self, digest: str) -> None:
+        entry = self._index.pop(digest, None)
+        if entry:
+            self._total_bytes -= entry[0]
+        for path in self._paths(digest):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body (spooled from the cache file) with the headers needed to revalidate it."""
+
+    url: str
+    body: SpooledBody
+    headers: Dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0
+
+    def is_fresh(self, max_age: float) -> bool:
+        """True if the entry is younger than ``max_age`` seconds and needs no revalidation."""
+        return max_age > 0 and time.time() - self.stored_at < max_age
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a 200 ``requests.Response`` from the cached body."""
+        return build_response(self.url, 200, self.headers, self.body.getvalue(), "OK")
+
+    def to_download(self) -> Download:
+        """A 200 ``Download`` of the cached body, still backed by the cache file."""
+        return Download(self.url, 200, self.headers, self.body, "OK")
+
+
+class HttpCache:
+    """
+    Persistent HTTP response cache with conditional revalidation.
+
+    Entries younger than ``max_age`` seconds are served without touching the
+    network.  Older entries are revalidated with their ETag / Last-Modified;
+    a ``304 Not Modified`` answer refreshes the entry and serves the stored
+    body.  Only successful (200) GET responses are stored.
+    """
+
+    def __init__(self, directory: str, max_age: float = 0, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: Where cached bodies and metadata are written.
+            max_age: Seconds an entry is used without revalidation (0 = always revalidate).
+            max_bytes: Size bound for the whole cache; least recently used entries are evicted.
+        """
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self.max_age = max_age
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self._stats[outcome] += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of 'fresh', 'revalidated' (304), 'fetched' and 'uncached' responses."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached entry for ``url``, if any (fresh or stale)."""
+        found = self.store.get_body(url)
+        if found is None:
+            return None
+        body, meta = found
+        return CachedResponse(url, body, meta.get("headers", {}), meta.get("stored_at", 0.0))
+
+    def fresh_response(
+        self, cached: Optional[CachedResponse], download: bool = False
+    ) -> Optional[Union[requests.Response, Download]]:
+        """
+        The cached response if it can be served without revalidation (as a
+        Download backed by the cache file if ``download`` is set).
+        """
+        if cached is not None and cached.is_fresh(self.max_age):
+            self._count("fresh")
+            return cached.to_download() if download else cached.to_response()
+        return None
+
+    def update(
+        self, url: str, cached: Optional[CachedResponse], response: requests.Response
+    ) -> requests.Response:
+        """
+        Record a network response and return the response the caller should see.
+
+        A 304 for a cached entry refreshes it and returns the stored body (as a
+        Download if ``response`` is one); a 200 is stored; anything else is
+        passed through untouched.
+        """
+        if response.status_code == 304 and cached is not None:
+            self.store.update_meta(
+                url,
+                {"url": url, "headers": cached.headers, "stored_at": time.time(), "sha256": cached.body.sha256},
+            )
+            self._count("revalidated")
+            return cached.to_download() if isinstance(response, Download) else cached.to_response()
+        if response.status_code == 200:
+            headers = {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            }
+            body = body_of(response)
+            meta = {"url": url, "headers": headers, "stored_at": time.time()}
+            if isinstance(body, SpooledBody):
+                # Lets get_body() hand out the cached file without hashing it again
+                meta["sha256"] = body.sha256
+            self.store.put(url, body, meta)
+            self._count("fetched")
+        else:
+            self._count("uncached")
+        return response
+
+
+class PdfParseCache:
+    """
+    Content-addressed cache of PDF parse results.
+
+    Results are keyed by parser name, parser version and the SHA-256 of the
+    PDF bytes, so the same spec sheet linked from several pages (or fetched
+    again on the next run) is parsed once.  Bumping a parser's version makes
+    its old results unreachable; they age out through LRU eviction.
+
+    Concurrent requests for one key share a single parse: the first caller
+    registers a future for the key and parses, later callers wait on that
+    future.  The lock is only held to look up and register the future, so
+    different PDFs are parsed in parallel.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_PDF_MAX_BYTES):
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of 'hits' and 'misses'."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _key(parser: str, version: int, pdf_content: Union[bytes, SpooledBody]) -> str:
+        if isinstance(pdf_content, SpooledBody):
+            digest = pdf_content.sha256
+        else:
+            digest = hashlib.sha256(pdf_content).hexdigest()
+        return f"{parser}/v{version}/{digest}"
+
+    def lookup(self, parser: str, version: int, pdf_content: bytes):
+        """The cached result for this PDF and parser version, or None."""
+        return self._lookup(self._key(parser, version, pdf_content))
+
+    def _lookup(self, key: str):
+        found = self.store.get(key)
+        self._count("hits" if found is not None else "misses")
+        return json.loads(found[0]) if found is not None else None
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def put(self, parser: str, version: int, pdf_content: bytes, result) -> None:
+        """Store a parse result (skipped when pdfplumber is missing and results are empty)."""
+        self._put(self._key(parser, version, pdf_content), parser, version, result)
+
+    def _put(self, key: str, parser: str, version: int, result) -> None:
+        if importlib.util.find_spec("pdfplumber") is None:
+            return
+        self.store.put(key, json.dumps(result).encode("utf-8"), {"parser": parser, "version": version})
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        """The in-flight future for ``key``, and whether the caller registered it and must settle it."""
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._inflight[key] = Future()
+        # A running future cannot be cancelled by a waiter
+        flight.set_running_or_notify_cancel()
+        return flight, True
+
+    def _settle(self, key: str, flight: Future, result=None, error: Optional[BaseException] = None) -> None:
+        """Unregister ``flight`` and hand its result (or error) to the waiters."""
+        with self._inflight_lock:
+            del self._inflight[key]
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def get_or_parse(self, parser: str, version: int, parse: Callable, pdf_content: bytes):
+        """
+        Return the cached result of ``parse(pdf_content)``, parsing on a miss.
+        A caller that finds the same PDF being parsed waits for that result.
+        """
+        key = self._key(parser, version, pdf_content)
+        flight, owner = self._claim(key)
+        if not owner:
+            self._count("hits")
+            return flight.result()
+        try:
+            result = self._lookup(key)
+            if result is None:
+                result = parse(pdf_content)
+                self._put(key, parser, version, result)
+        except BaseException as error:
+            self._settle(key, flight, error=error)
+            raise
+        self._settle(key, flight, result)
+        return result
+
+    async def get_or_parse_async(self, parser: str, version: int, parse: Callable, pdf_content: bytes):
+        """
+        Coroutine variant of get_or_parse() for a coroutine function ``parse``.
+        Hashing and the cache's disk I/O run on the loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        key = await loop.run_in_executor(None, self._key, parser, version, pdf_content)
+        flight, owner = self._claim(key)
+        if not owner:
+            self._count("hits")
+            return await asyncio.wrap_future(flight)
+        try:
+            result = await loop.run_in_executor(None, self._lookup, key)
+            if result is None:
+                result = await parse(pdf_content)
+                await loop.run_in_executor(None, self._put, key, parser, version, result)
+        except BaseException as error:
+            self._settle(key, flight, error=error)
+            raise
+        self._settle(key, flight, result)
+        return result
+
+
+_pdf_cache: Optional[PdfParseCache] = None
+
+
+def set_pdf_cache(cache: Optional[PdfParseCache]) -> None:
+    """Install (or with None, remove) the cache used by @cached_pdf_parser functions."""
+    global _pdf_cache
+    _pdf_cache = cache
+
+
+def get_pdf_cache() -> Optional[PdfParseCache]:
+    """The installed PDF parse cache, if any."""
+    return _pdf_cache
+
+
+def cached_pdf_parser(name: str, version: int):
+    """
+    Decorate a ``parse(pdf_content: bytes) -> dict`` function so its results go
+    through the installed PdfParseCache.  Bump ``version`` whenever the
+    parser's output for the same PDF changes.
+    """
+
+    def decorator(parse: Callable) -> Callable:
+        @functools.wraps(parse)
+        def wrapper(pdf_content: bytes):
+            cache = _pdf_cache
+            if cache is None:
+                return parse(pdf_content)
+            return cache.get_or_parse(name, version, parse, pdf_content)
+
+        wrapper.cache_name = name
+        wrapper.cache_version = version
+        return wrapper
+
+    return decorator
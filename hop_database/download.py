@@ -0,0 +1,299 @@
+"""
+Streaming downloads for large response bodies (PDF spec sheets)
+
+``http.download()`` and ``AsyncFetcher.download()`` read a response in chunks
+into a ``SpooledBody`` instead of holding the whole body in memory: bodies up
+to SPOOL_MEMORY_BYTES stay in memory, larger ones roll over to a temporary
+file that the PDF parsers (and the parser processes) open by path.
+
+Before any of the body is read the status, ``Content-Type`` and
+``Content-Length`` are checked, so an HTML error page or an oversized file is
+rejected without downloading it.  While streaming, the size cap is enforced
+per chunk, every chunk must arrive within the stall timeout (the read timeout
+of the underlying client) and an optional deadline bounds the whole transfer.
+
+Rejections are raised as ``requests.exceptions`` subclasses, so the scrapers'
+existing ``except requests.exceptions.RequestException`` handling covers them.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import time
+import weakref
+from typing import BinaryIO, Iterator, Mapping, Optional, Sequence, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MEMORY_BYTES = 2 * 1024 * 1024     # larger bodies roll over to a temp file
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024     # spec sheets are a few MB at most
+DEFAULT_STALL_TIMEOUT = 20               # seconds allowed between two chunks
+
+# Content types accepted for PDFs; servers often send generic binary types
+PDF_CONTENT_TYPES = (
+    "application/pdf",
+    "application/x-pdf",
+    "application/octet-stream",
+    "binary/octet-stream",
+    "application/force-download",
+)
+
+
+class DownloadRejected(requests.exceptions.RequestException):
+    """A download was aborted because the response is not what was asked for."""
+
+
+class UnexpectedContentType(DownloadRejected):
+    """The response's Content-Type is not one of the accepted types."""
+
+
+class DownloadTooLarge(DownloadRejected):
+    """The response is (or declares itself) larger than the size cap."""
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SpooledBody:
+    """
+    A response body kept in memory while small and in a temporary file otherwise.
+
+    The SHA-256 and size are computed while writing.  A rolled-over file is
+    deleted by close() or when the object is garbage collected.
+    """
+
+    def __init__(self, max_memory: int = SPOOL_MEMORY_BYTES):
+        self.max_memory = max_memory
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._digest: Optional[str] = None  # given up front for an adopted file
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file: Optional[BinaryIO] = None
+        self.path: Optional[str] = None  # set once the body lives on disk
+        self._finalizer = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, max_memory: int = SPOOL_MEMORY_BYTES) -> "SpooledBody":
+        body = cls(max_memory)
+        body.write(data)
+        return body.finish()
+
+    @classmethod
+    def from_file(cls, path: str, sha256: Optional[str] = None) -> "SpooledBody":
+        """
+        Adopt the complete file at ``path`` as a rolled-over body, without reading it.
+
+        The file is deleted like a spooled one.  Without ``sha256`` the digest
+        is computed from the file the first time it is asked for.
+        """
+        body = cls()
+        body._buffer = None
+        body.path = path
+        body._finalizer = weakref.finalize(body, _unlink, path)
+        body.size = os.path.getsize(path)
+        body._digest = sha256
+        body._sha256 = None
+        return body
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO, max_memory: int = SPOOL_MEMORY_BYTES) -> "SpooledBody":
+        """Spool the rest of a file object in chunks (rolling over like a download)."""
+        body = cls(max_memory)
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    return body.finish()
+                body.write(chunk)
+        except BaseException:
+            body.close()
+            raise
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        if self._file is None and self.size > self.max_memory:
+            fd, self.path = tempfile.mkstemp(prefix="hopdb-", suffix=".part")
+            self._finalizer = weakref.finalize(self, _unlink, self.path)
+            self._file = os.fdopen(fd, "wb")
+            self._file.write(self._buffer.getvalue())
+            self._buffer = None
+        (self._file or self._buffer).write(chunk)
+
+    def finish(self) -> "SpooledBody":
+        """Flush a rolled-over file; called once the last chunk is written."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the body."""
+        if self._digest is not None:
+            return self._digest
+        if self._sha256 is None:
+            # An adopted file whose digest was not given
+            self._sha256 = hashlib.sha256()
+            for chunk in self.iter_chunks():
+                self._sha256.update(chunk)
+        return self._sha256.hexdigest()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def open(self) -> BinaryIO:
+        """A new binary file object positioned at the start of the body."""
+        if self.path is not None:
+            return open(self.path, "rb")
+        return io.BytesIO(self._buffer.getvalue())
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open() as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def getvalue(self) -> bytes:
+        """The whole body as bytes (reads a rolled-over file into memory)."""
+        with self.open() as f:
+            return f.read()
+
+    def source(self) -> Union[str, bytes]:
+        """The body in a picklable form: its file path if on disk, else its bytes."""
+        return self.path if self.path is not None else self.getvalue()
+
+    def close(self) -> None:
+        """Delete the temporary file, if any."""
+        self.finish()
+        if self._finalizer is not None:
+            self._finalizer()
+
+
+class Download:
+    """
+    The result of a streaming download: status and headers plus a SpooledBody.
+
+    Mirrors the parts of ``requests.Response`` the scrapers use.  Bodies of
+    non-2xx responses are not read.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        body: Optional[SpooledBody] = None,
+        reason: str = "",
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.reason = reason
+        self.body = body if body is not None else SpooledBody().finish()
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @property
+    def content(self) -> bytes:
+        """The whole body as bytes; prefer ``body`` for large files."""
+        return self.body.getvalue()
+
+    def raise_for_status(self) -> None:
+        """Raise ``requests.exceptions.HTTPError`` for 4xx/5xx, like requests does."""
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}"
+            )
+
+    @classmethod
+    def from_response(
+        cls,
+        response: Union[requests.Response, "Download"],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        content_types: Optional[Sequence[str]] = PDF_CONTENT_TYPES,
+    ) -> "Download":
+        """
+        Wrap an already-read response (cache hit, archive replay) with the same checks.
+
+        A Download (a cached or replayed body spooled from disk) keeps its body.
+        """
+        check_response(response.url, response.status_code, response.headers, max_bytes, content_types)
+        body = None
+        if response.ok:
+            body = body_of(response)
+            if len(body) > max_bytes:
+                raise DownloadTooLarge(f"{response.url} exceeds {max_bytes} bytes")
+            if not isinstance(body, SpooledBody):
+                body = SpooledBody.from_bytes(body)
+        return cls(response.url, response.status_code, response.headers, body, response.reason or "")
+
+
+def check_response(
+    url: str,
+    status_code: int,
+    headers: Mapping[str, str],
+    max_bytes: int,
+    content_types: Optional[Sequence[str]],
+) -> None:
+    """
+    Reject a successful response from its headers alone, before reading the body.
+
+    Raises:
+        UnexpectedContentType: If ``content_types`` is given and the declared
+            type is not in it (a missing Content-Type is accepted).
+        DownloadTooLarge: If Content-Length exceeds ``max_bytes``.
+    """
+    if not 200 <= status_code < 300:
+        return
+    headers = CaseInsensitiveDict(headers)
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_types and content_type and content_type not in content_types:
+        raise UnexpectedContentType(f"{url} is {content_type}, expected one of {', '.join(content_types)}")
+    length = headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise DownloadTooLarge(f"{url} is {int(length)} bytes (limit {max_bytes})")
+
+
+class BodyWriter:
+    """Feeds streamed chunks into a SpooledBody, enforcing the size cap and deadline."""
+
+    def __init__(self, url: str, max_bytes: int, deadline: Optional[float] = None):
+        self.url = url
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.body = SpooledBody()
+        self._started = time.monotonic()
+
+    def write(self, chunk: bytes) -> None:
+        if self.body.size + len(chunk) > self.max_bytes:
+            self.body.close()
+            raise DownloadTooLarge(f"{self.url} exceeds {self.max_bytes} bytes")
+        if self.deadline is not None and time.monotonic() - self._started > self.deadline:
+            self.body.close()
+            raise requests.exceptions.Timeout(
+                f"Download of {self.url} took longer than {self.deadline}s"
+            )
+        self.body.write(chunk)
+
+    def finish(self) -> SpooledBody:
+        return self.body.finish()
+
+
+def body_of(response: Union[requests.Response, Download]) -> Union[bytes, SpooledBody]:
+    """The body of a response or download, without reading a spooled body into memory."""
+    if isinstance(response, Download):
+        return response.body
+    return response.content
@@ -0,0 +1,441 @@
+"""
+Shared HTTP client for the hop scrapers
+
+All scrapers fetch through one process-wide ``requests.Session`` so that
+connections to a supplier are pooled and kept alive across listing pages,
+hop pages and PDF spec sheets.  Each host gets its own connection pool, sized
+to the ceiling of its adaptive concurrency limit (see ``throttle.py``), plus
+shared default headers, timeouts and a retry policy for transient failures.
+
+A thread can run under a wall-clock deadline (see ``deadline()``): once it
+has passed, every further network request from that thread (or the event
+loop it drives) fails with ``DeadlineExceeded`` instead of being sent.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from . import scheduler, throttle
+from .download import (
+    CHUNK_SIZE,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_STALL_TIMEOUT,
+    PDF_CONTENT_TYPES,
+    BodyWriter,
+    Download,
+    check_response,
+)
+
+if TYPE_CHECKING:
+    from .archive import ArchiveRun
+    from .cache import CachedResponse, HttpCache
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+DEFAULT_TIMEOUT = 30      # seconds, used when neither the caller nor the host sets one
+DEFAULT_POOL_SIZE = 10    # initial concurrency of hosts that were not configured explicitly
+
+# Transient statuses worth retrying (rate limiting and gateway/server hiccups)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 1        # sleep BACKOFF_FACTOR * 2**attempt seconds between retries
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# host → pool size / default timeout registered via configure_host()
+_host_pool_sizes: Dict[str, int] = {}
+_host_timeouts: Dict[str, float] = {}
+
+# Optional persistent response cache, see set_cache()
+_cache: Optional["HttpCache"] = None
+
+# Optional raw capture archive run (recording or replaying), see set_archive()
+_archive: Optional["ArchiveRun"] = None
+
+# Per-thread wall-clock deadline (time.monotonic() value), see deadline()
+_deadline = threading.local()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The calling thread's deadline passed before a request could be sent."""
+
+
+def retry_policy() -> Retry:
+    """Retry policy shared by every host.
+
+    Connection errors and the statuses in RETRY_STATUS_CODES are retried with
+    exponential backoff (honouring ``Retry-After``).  Read timeouts are *not*
+    retried here, so callers that want to retry slow responses keep control of
+    how long they are willing to wait.
+    """
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+
+
+def host_of(url_or_host: str) -> str:
+    """Return the lower-cased host name of a URL (or the argument if it is already a host)."""
+    if "://" in url_or_host:
+        return (urlsplit(url_or_host).hostname or "").lower()
+    return url_or_host.lower()
+
+
+def _pool_maxsize(pool_size: int) -> int:
+    """
+    Connections to keep for a host: enough for every request its limiter can
+    let through, so a granted request never queues in urllib3 for a
+    connection (that wait would hold a scheduler slot and count as latency).
+    """
+    return max(pool_size, throttle.DEFAULT_MAX_LIMIT)
+
+
+def _mount_host(session: requests.Session, host: str, pool_size: int) -> None:
+    """Mount a dedicated, blocking connection pool for ``host`` on the session.
+
+    The host's limiter decides how many requests are in flight, starting at
+    ``pool_size``; the pool is sized to the limiter's ceiling, and
+    ``pool_block=True`` makes a request beyond it wait for a free keep-alive
+    connection instead of opening (and then discarding) an extra one.
+    """
+    for scheme in ("https", "http"):
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=_pool_maxsize(pool_size),
+            pool_block=True,
+            max_retries=retry_policy(),
+        )
+        session.mount(f"{scheme}://{host}/", adapter)
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                default_adapter = HTTPAdapter(
+                    pool_maxsize=_pool_maxsize(DEFAULT_POOL_SIZE), max_retries=retry_policy()
+                )
+                session.mount("https://", default_adapter)
+                session.mount("http://", default_adapter)
+                for host, pool_size in _host_pool_sizes.items():
+                    _mount_host(session, host, pool_size)
+                _session = session
+    return _session
+
+
+def configure_host(
+    url_or_host: str, pool_size: int = DEFAULT_POOL_SIZE, timeout: Optional[float] = None
+) -> None:
+    """
+    Register connection settings for one supplier host.
+
+    Args:
+        url_or_host: Any URL on the host, or the bare host name.
+        pool_size: Number of requests to the host allowed in flight at first
+            (the host's limiter adapts it from there); should match the
+            number of workers that fetch from this host concurrently.
+        timeout: Default timeout for requests to this host, in seconds.
+    """
+    host = host_of(url_or_host)
+    with _session_lock:
+        if _host_pool_sizes.get(host) != pool_size:
+            _host_pool_sizes[host] = pool_size
+            if _session is not None:
+                _mount_host(_session, host, pool_size)
+        if timeout is not None:
+            _host_timeouts[host] = timeout
+
+
+def host_pool_size(url: str) -> int:
+    """Initial number of concurrent requests allowed to ``url``'s host."""
+    return _host_pool_sizes.get(host_of(url), DEFAULT_POOL_SIZE)
+
+
+def host_timeout(url: str) -> float:
+    """Default timeout for ``url``: the host's configured timeout or DEFAULT_TIMEOUT."""
+    return _host_timeouts.get(host_of(url), DEFAULT_TIMEOUT)
+
+
+def set_cache(cache: Optional["HttpCache"]) -> None:
+    """Install (or with None, remove) the persistent response cache used by get()."""
+    global _cache
+    _cache = cache
+
+
+def get_cache() -> Optional["HttpCache"]:
+    """The installed response cache, if any."""
+    return _cache
+
+
+def set_archive(run: Optional["ArchiveRun"]) -> None:
+    """
+    Install (or with None, remove) a raw capture archive run.
+
+    A recording run archives every response returned by get() and the asyncio
+    backend; a replaying run answers every request from the archive instead of
+    the network.
+    """
+    global _archive
+    _archive = run
+
+
+def get_archive() -> Optional["ArchiveRun"]:
+    """The installed archive run, if any."""
+    return _archive
+
+
+def archive_replay(url: str, download: bool = False) -> Optional[Union[requests.Response, Download]]:
+    """
+    The archived response for ``url`` when replaying a run, else None (a
+    Download with a spooled body if ``download`` is set).
+    """
+    if _archive is not None and _archive.replaying:
+        return _archive.replay(url, download)
+    return None
+
+
+def archive_record(url: str, response: requests.Response) -> requests.Response:
+    """Add ``response`` to the recording archive run, if one is installed."""
+    if _archive is not None:
+        _archive.record(url, response)
+    return response
+
+
+def cache_lookup(
+    url: str, headers: Optional[Dict[str, str]] = None, download: bool = False
+) -> Tuple[
+    Optional["CachedResponse"], Optional[Union[requests.Response, Download]], Optional[Dict[str, str]]
+]:
+    """
+    Consult the response cache before fetching ``url``.
+
+    Returns (cached_entry, fresh_response, request_headers): when
+    ``fresh_response`` is set it can be returned without any network I/O
+    (for ``download`` it is a Download backed by the cache file); otherwise
+    ``request_headers`` carries the conditional headers needed to revalidate
+    ``cached_entry``.  Shared by get(), download() and the asyncio backend.
+    """
+    if _cache is None:
+        return None, None, headers
+    cached = _cache.lookup(url)
+    fresh = _cache.fresh_response(cached, download)
+    if fresh is not None or cached is None:
+        return cached, fresh, headers
+    return cached, None, {**cached.validators(), **(headers or {})}
+
+
+def cache_update(
+    url: str, cached: Optional["CachedResponse"], response: Union[requests.Response, Download]
+) -> Union[requests.Response, Download]:
+    """Record a network response in the cache; a 304 is turned back into the cached 200."""
+    if _cache is None:
+        return response
+    return _cache.update(url, cached, response)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the block under a wall-clock budget of ``seconds`` (None = no limit).
+
+    Requests made by this thread after the budget is spent raise
+    DeadlineExceeded, and ``aio.run()`` cancels its coroutine when the budget
+    runs out, so a slow source stops within its budget.
+    """
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = None if seconds is None else time.monotonic() + seconds
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def time_left() -> Optional[float]:
+    """Seconds until this thread's deadline (None without one; may be negative)."""
+    at = getattr(_deadline, "at", None)
+    return None if at is None else at - time.monotonic()
+
+
+def check_deadline(url: str) -> None:
+    """Raise DeadlineExceeded if this thread's deadline has passed."""
+    remaining = time_left()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline passed before fetching {url}")
+
+
+@contextmanager
+def _network_slot(url: str, priority: int) -> Iterator[scheduler.Ticket]:
+    """Hold a global scheduler slot (under the host's adaptive limit) for one request."""
+    check_deadline(url)
+    with scheduler.slot(priority, throttle.limiter(url)) as ticket:
+        try:
+            yield ticket
+        except requests.exceptions.Timeout:
+            ticket.outcome = throttle.TIMEOUT
+            raise
+
+
+def get(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    priority: int = scheduler.PAGE,
+    **kwargs,
+) -> requests.Response:
+    """
+    GET ``url`` through the shared session (and the response cache and
+    archive, if installed).
+
+    Args:
+        url: URL to fetch.
+        timeout: Timeout in seconds; defaults to the host's configured timeout.
+        headers: Extra headers merged over DEFAULT_HEADERS.
+        priority: Scheduler priority of the request (``scheduler.LISTING``
+            for listing pages, which are served before hop pages).
+        **kwargs: Passed through to ``requests.Session.get`` (e.g. ``params``).
+            Requests with extra arguments other than ``params`` bypass the cache.
+
+    Returns:
+        The ``requests.Response``.  Callers decide whether to ``raise_for_status()``.
+    """
+    if "params" in kwargs:
+        request = requests.models.PreparedRequest()
+        request.prepare_url(url, kwargs.pop("params"))
+        url = request.url
+    replayed = archive_replay(url)
+    if replayed is not None:
+        return replayed
+    if timeout is None:
+        timeout = host_timeout(url)
+    if kwargs:
+        with _network_slot(url, priority) as ticket:
+            response = get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+            ticket.outcome = throttle.outcome_for_status(response.status_code)
+        return archive_record(url, response)
+    cached, fresh, request_headers = cache_lookup(url, headers)
+    if fresh is not None:
+        return archive_record(url, fresh)
+    with _network_slot(url, priority) as ticket:
+        response = get_session().get(url, headers=request_headers, timeout=timeout)
+        ticket.outcome = throttle.outcome_for_status(response.status_code)
+    return archive_record(url, cache_update(url, cached, response))
+
+
+def download(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    content_types: Optional[Sequence[str]] = PDF_CONTENT_TYPES,
+    stall_timeout: float = DEFAULT_STALL_TIMEOUT,
+    deadline: Optional[float] = None,
+    priority: int = scheduler.PDF,
+) -> Download:
+    """
+    Stream ``url`` into a spooled body (see ``hop_database.download``).
+
+    Goes through the response cache, archive and scheduler like get().
+
+    Args:
+        timeout: Connect timeout; defaults to the host's configured timeout.
+        max_bytes: Abort once the body (or its Content-Length) exceeds this.
+        content_types: Accepted Content-Types (None accepts anything).
+        stall_timeout: Seconds to wait for the response and for each chunk.
+        deadline: Optional limit in seconds for the whole transfer.
+
+    Raises:
+        download.DownloadRejected: Wrong Content-Type or too large.
+        requests.exceptions.Timeout: Stalled, or past the deadline.
+    """
+    replayed = archive_replay(url, download=True)
+    if replayed is not None:
+        return Download.from_response(replayed, max_bytes, content_types)
+    if timeout is None:
+        timeout = host_timeout(url)
+    cached, fresh, request_headers = cache_lookup(url, headers, download=True)
+    if fresh is not None:
+        return Download.from_response(archive_record(url, fresh), max_bytes, content_types)
+    with _network_slot(url, priority) as ticket, get_session().get(
+        url, headers=request_headers, timeout=(timeout, stall_timeout), stream=True
+    ) as response:
+        ticket.outcome = throttle.outcome_for_status(response.status_code)
+        if response.status_code == 304 and cached is not None:
+            revalidated = cache_update(url, cached, Download(url, 304, response.headers))
+            return Download.from_response(archive_record(url, revalidated), max_bytes, content_types)
+        check_response(response.url, response.status_code, response.headers, max_bytes, content_types)
+        result = Download(response.url, response.status_code, response.headers, reason=response.reason or "")
+        if result.ok:
+            writer = BodyWriter(url, max_bytes, deadline)
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    writer.write(chunk)
+            except requests.exceptions.ConnectionError as exc:
+                writer.body.close()
+                # requests reports a read timeout mid-body as a ConnectionError
+                if exc.args and isinstance(exc.args[0], ReadTimeoutError):
+                    raise requests.exceptions.Timeout(f"{url} stalled for {stall_timeout}s") from exc
+                raise
+            except BaseException:
+                writer.body.close()
+                raise
+            result.body = writer.finish()
+    return archive_record(url, cache_update(url, cached, result))
+
+
+def build_response(
+    url: str,
+    status_code: int,
+    headers: Mapping[str, str],
+    content: bytes,
+    reason: str = "",
+) -> requests.Response:
+    """
+    Build a ``requests.Response`` from already-fetched data.
+
+    Lets fetch paths that do not go through the session (the asyncio backend,
+    caches, replays) hand scrapers the same response type they get from get().
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+def close() -> None:
+    """Close the shared session and all pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -5,9 +5,12 @@ Contains data models and validation utilities for hop entries.
 """
 
 from .hop_model import HopEntry, save_hop_entries, load_hop_entries, STANDARD_AROMAS, AROMA_MAPPINGS
+from .hop_table import BrewingComparison, HopTable
 
 __all__ = [
     "HopEntry",
+    "HopTable",
+    "BrewingComparison",
     "save_hop_entries",
     "load_hop_entries", 
     "STANDARD_AROMAS",
@@ -0,0 +1,221 @@
+"""
+Per-source aroma scaling
+
+Suppliers rate aromas on scales of their own, so before merging every
+source is brought to the 0-5 scale: a source whose reference value is above
+5 has its positive values scaled by ``5 / reference``, and every value is
+then rounded to one decimal and clamped to 0-5.
+
+``scale_by_source()`` does this for a whole hop list at once.  The numeric
+aroma values are flattened into one ``AromaValues`` array (hop then key
+order) with the source and category of each value as codes; a scaling
+strategy turns that into a (sources × categories) grid of reference values,
+and the scaled, rounded and clamped values are computed in one array
+operation before they are written back into the entries' aroma dicts.
+
+Strategies (``STRATEGIES``):
+
+* ``global_max``: the largest value of the source, across all categories
+  (the default, and the rule the merger has always used);
+* ``category_max``: the largest value of each category of the source;
+* ``percentile(q)``: the q-th percentile of the source's positive values,
+  so a few outliers do not compress the rest of the scale.
+"""
+
+import math
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .hop_model import HopEntry
+
+SCALE_MAX = 5.0
+
+# Value types that are scaled; anything else in an aroma dict is left alone
+_NUMBER = (int, float)
+_PLAIN_NUMBERS = {int, float, bool}
+
+_source_and_aromas = attrgetter("source", "standardized_aromas")
+
+
+@dataclass
+class AromaValues:
+    """
+    The numeric aroma values of a hop list, in hop then key order, with
+    ``sources[source[i]]`` and ``categories[category[i]]`` the source and
+    aroma category of value i.
+    """
+
+    values: np.ndarray
+    source: np.ndarray
+    category: np.ndarray
+    sources: List[str]
+    categories: List[str]
+
+    @property
+    def positive(self) -> np.ndarray:
+        return self.values > 0
+
+    def maxima(self) -> np.ndarray:
+        """(sources × categories) maximum of the positive values, 0 where there are none."""
+        grid = np.zeros((len(self.sources), len(self.categories)))
+        positive = self.positive
+        np.maximum.at(grid, (self.source[positive], self.category[positive]), self.values[positive])
+        return grid
+
+
+# A strategy maps the values to a (sources × categories) grid of reference values
+Strategy = Callable[[AromaValues], np.ndarray]
+
+
+def global_max(aromas: AromaValues) -> np.ndarray:
+    """The largest value of each source, for all its categories."""
+    maxima = aromas.maxima()
+    return np.repeat(maxima.max(axis=1, initial=0.0)[:, None], maxima.shape[1], axis=1)
+
+
+def category_max(aromas: AromaValues) -> np.ndarray:
+    """The largest value of each category of each source."""
+    return aromas.maxima()
+
+
+def percentile(q: float) -> Strategy:
+    """The ``q``-th percentile of the positive values of each source, for all its categories."""
+
+    def reference(aromas: AromaValues) -> np.ndarray:
+        positive = aromas.positive
+        values, source = aromas.values[positive], aromas.source[positive]
+        order = np.argsort(source, kind="stable")
+        bounds = np.cumsum(np.bincount(source, minlength=len(aromas.sources)))
+        per_source = [
+            np.percentile(group, q) if len(group) else 0.0
+            for group in np.split(values[order], bounds[:-1])
+        ]
+        return np.repeat(np.array(per_source, dtype=float)[:, None], len(aromas.categories), axis=1)
+
+    return reference
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "global-max": global_max,
+    "category-max": category_max,
+    "percentile": percentile(95),
+}
+
+
+@dataclass
+class ScalingReport:
+    """What ``scale_by_source()`` found and did."""
+
+    # Largest aroma value of each source that has a positive one, in order of appearance
+    maxima: Dict[str, float]
+    # Smallest and largest factor applied to each scaled source, in order of appearance
+    factors: Dict[str, Tuple[float, float]]
+
+
+def _index(values: List[str]) -> Dict[str, int]:
+    """Code of each distinct value, in order of first appearance."""
+    return {value: code for code, value in enumerate(dict.fromkeys(values))}
+
+
+def round_values(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    ``round(value, digits)`` of each value.  np.round scales, rounds and
+    divides, which can differ from Python's correctly rounded result only
+    next to a tie, so those values are rounded by Python.
+    """
+    rounded = np.round(values, digits)
+    shifted = values * 10.0 ** digits
+    near_tie = np.abs(shifted - np.floor(shifted) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie).tolist():
+        rounded.flat[index] = round(float(values.flat[index]), digits)
+    return rounded
+
+
+def _clamp(values: np.ndarray, high: float) -> np.ndarray:
+    """``min(high, max(0.0, value))`` of each value (NaN becomes 0.0, as with max())."""
+    values = np.where(values > 0.0, values, 0.0)
+    return np.where(values < high, values, high)
+
+
+def scale_by_source(
+    hop_entries: Sequence[HopEntry], strategy: Strategy = global_max, scale_max: float = SCALE_MAX
+) -> ScalingReport:
+    """
+    Scale the aroma values of every entry with a source to 0-``scale_max``,
+    in place.
+
+    Positive values whose reference value (see ``strategy``) is above
+    ``scale_max`` are multiplied by ``scale_max / reference``; other numeric
+    values are not scaled.  Scaled values and all numeric values that are not
+    scaled are rounded to one decimal and clamped to 0-``scale_max``.
+    Non-numeric values and the key order of the dicts are left unchanged.
+    """
+    eligible = [
+        (source, aromas)
+        for source, aromas in map(_source_and_aromas, hop_entries)
+        if source and isinstance(aromas, dict)
+    ]
+    keys = [key for _, aromas in eligible for key in aromas]
+    raw = [value for _, aromas in eligible for value in aromas.values()]
+    lengths = [len(aromas) for _, aromas in eligible]
+
+    if set(map(type, raw)) <= _PLAIN_NUMBERS:
+        numeric = np.ones(len(raw), dtype=bool)
+        values = np.array(raw, dtype=float)
+    else:
+        numeric = np.fromiter((isinstance(value, _NUMBER) for value in raw), bool, len(raw))
+        values = np.array(
+            [float(value) if isinstance(value, _NUMBER) else math.nan for value in raw], dtype=float
+        )
+
+    sources = [source for source, _ in eligible]
+    source_index = _index(sources)
+    category_index = _index(keys)
+    aromas = AromaValues(
+        values[numeric],
+        np.repeat(np.fromiter(map(source_index.__getitem__, sources), np.intp, len(sources)), lengths)[numeric],
+        np.fromiter(map(category_index.__getitem__, keys), np.intp, len(keys))[numeric],
+        list(source_index),
+        list(category_index),
+    )
+
+    references = strategy(aromas)
+    reference = references[aromas.source, aromas.category]
+    scaled = reference > scale_max
+    factors = np.divide(scale_max, reference, out=np.ones_like(reference), where=scaled)
+    result = _clamp(round_values(np.where(scaled, aromas.values * factors, aromas.values), 1), scale_max)
+    # Values at or below zero are only rounded and clamped when their source is not scaled
+    changed = ~scaled | aromas.positive
+
+    if numeric.all() and changed.all():
+        raw = result.tolist()
+    else:
+        positions = np.flatnonzero(numeric)[changed].tolist()
+        for position, value in zip(positions, result[changed].tolist()):
+            raw[position] = value
+    start = 0
+    for (_, entry_aromas), length in zip(eligible, lengths):
+        end = start + length
+        entry_aromas.update(zip(keys[start:end], raw[start:end]))
+        start = end
+
+    return ScalingReport(_maxima(aromas), _factors(aromas, references, scale_max))
+
+
+def _maxima(aromas: AromaValues) -> Dict[str, float]:
+    source = aromas.source[aromas.positive]
+    codes, first = np.unique(source, return_index=True)
+    largest = aromas.maxima().max(axis=1, initial=0.0)
+    return {aromas.sources[code]: float(largest[code]) for code in codes[np.argsort(first)].tolist()}
+
+
+def _factors(aromas: AromaValues, references: np.ndarray, scale_max: float) -> Dict[str, Tuple[float, float]]:
+    factors = {}
+    for code, row in enumerate(references):
+        scaled = row[row > scale_max]
+        if len(scaled):
+            factors[aromas.sources[code]] = (float(scale_max / scaled.max()), float(scale_max / scaled.min()))
+    return factors
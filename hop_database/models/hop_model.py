@@ -7,10 +7,14 @@ This module defines the standard data structure for hop entries and provides
 utilities for creating, validating, and normalizing hop data across all sources.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, List, Optional, Union
 import json
+import math
 import os
+import sys
+from functools import lru_cache
+from operator import attrgetter
 
 # Standard aroma categories
 STANDARD_AROMAS = [
@@ -111,11 +115,148 @@ AROMA_MAPPINGS = {
 }
 
 
+# Brewing range fields: kept as given (raw, for provenance) and parsed once
+# into a float "<field>_value" slot (NaN when missing)
+RANGE_FIELDS = (
+    "alpha_from",
+    "alpha_to",
+    "beta_from",
+    "beta_to",
+    "oil_from",
+    "oil_to",
+    "co_h_from",
+    "co_h_to",
+)
+_VALUE_SLOTS = {name: f"{name}_value" for name in RANGE_FIELDS}
+
+# The range values of an entry as given, in RANGE_FIELDS order, read straight
+# from their slots (readers of many entries skip the field descriptors)
+raw_range_values = attrgetter(*(f"_{name}" for name in RANGE_FIELDS))
+
+
+@lru_cache(maxsize=4096)
+def parse_range_value(value: Union[str, float, None]) -> float:
+    """
+    Parse a range endpoint: numbers as they are, strings reduced to their
+    digits and dots ("<1.5%" → 1.5).  NaN if nothing numeric is left.
+
+    Sources repeat the same few values, so results are cached and entries
+    share their float objects.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        if value.replace(".", "", 1).isdecimal():
+            return float(value)
+        # Remove any non-numeric characters and parse
+        cleaned = "".join(c for c in value if c.isdigit() or c == ".")
+        try:
+            return float(cleaned) if cleaned else math.nan
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _average(low: float, high: float) -> float:
+    """Average of a parsed range; a missing (NaN) or zero end is left out."""
+    if low != low:
+        low = 0.0
+    if high != high:
+        high = 0.0
+    if low == 0 and high == 0:
+        return 0.0
+    if high == 0:
+        return low
+    if low == 0:
+        return high
+    return (low + high) / 2
+
+
+class _TrackedField:
+    """
+    Descriptor for a field the derived brewing statistics depend on:
+    assigning it drops the statistics cached on the entry.
+    """
+
+    __slots__ = ("_slot", "_derived")
+
+    def __init__(self, slot, derived):
+        self._slot = slot        # member descriptors of the field's slot
+        self._derived = derived  # and of the statistics cache
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return self._slot.__get__(obj, owner)
+
+    def __set__(self, obj, value):
+        self._slot.__set__(obj, value)
+        self._derived.__set__(obj, None)
+
+
+class _RangeField(_TrackedField):
+    """A brewing range field: also stores its parse in the ``<field>_value`` slot."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, slot, derived, value):
+        super().__init__(slot, derived)
+        self._value = value
+
+    def __set__(self, obj, value):
+        if type(value) is str:
+            value = sys.intern(value)  # range strings repeat across entries
+        self._slot.__set__(obj, value)
+        self._value.__set__(obj, parse_range_value(value))
+        self._derived.__set__(obj, None)
+
+
+# Fields whose assignment invalidates the cached statistics (besides the ranges)
+_TRACKED_FIELDS = ("standardized_aromas",)
+
+
+def _with_slots(cls):
+    """
+    Rebuild a dataclass with ``__slots__`` (what ``dataclass(slots=True)``
+    does on Python 3.10+), with the range and tracked fields behind
+    descriptors that keep the parsed values and the statistics cache current.
+    """
+    names = tuple(f.name for f in fields(cls))
+    tracked = set(_VALUE_SLOTS) | set(_TRACKED_FIELDS)
+    namespace = {key: value for key, value in cls.__dict__.items() if key not in names}
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = (
+        tuple(f"_{name}" if name in tracked else name for name in names)
+        + tuple(_VALUE_SLOTS.values())
+        + ("_derived",)
+    )
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    derived = slotted._derived
+    for name in _TRACKED_FIELDS:
+        setattr(slotted, name, _TrackedField(getattr(slotted, f"_{name}"), derived))
+    for name, value_slot in _VALUE_SLOTS.items():
+        setattr(slotted, name, _RangeField(getattr(slotted, f"_{name}"), derived, getattr(slotted, value_slot)))
+    return slotted
+
+
+@_with_slots
 @dataclass
 class HopEntry:
     """
     Standardized hop data model used across all sources.
     All scrapers should create instances of this class.
+
+    Brewing ranges keep the values the source gave (strings or numbers);
+    each assignment also stores the parsed float in ``<field>_value``
+    (``alpha_from_value`` etc., NaN when missing), which the average getters
+    and brewing statistics read.
+
+    Averages, purpose and classifications are computed on first use and
+    cached on the entry; assigning a range field or the aromas (as
+    ``merge_hops`` does) drops the cache.  In-place changes to a field's
+    value are not seen, so assign the field instead.
     """
 
     # Basic Information
@@ -125,7 +266,7 @@ class HopEntry:
     href: str = ""
     description: str = ""
 
-    # Brewing Parameters
+    # Brewing Parameters (raw, as the source gave them; parsed into <field>_value)
     alpha_from: Union[str, float] = ""
     alpha_to: Union[str, float] = ""
     beta_from: Union[str, float] = ""
@@ -191,6 +332,31 @@ class HopEntry:
                         self.standardized_aromas[standard_aroma], current_intensity
                     )
 
+    def _derived_stats(self) -> Dict[str, Union[str, float]]:
+        """Averages and classifications, computed once until a tracked field is assigned."""
+        derived = self._derived
+        if derived is None:
+            alpha = _average(self.alpha_from_value, self.alpha_to_value)
+            beta = _average(self.beta_from_value, self.beta_to_value)
+            oil = _average(self.oil_from_value, self.oil_to_value)
+            cohumulone = _average(self.co_h_from_value, self.co_h_to_value)
+            if alpha >= 10 and oil < 2:
+                purpose = "Bittering"
+            elif alpha < 8 and oil >= 1.5:
+                purpose = "Aroma"
+            else:
+                purpose = "Dual Purpose"
+            derived = self._derived = {
+                "alpha": alpha,
+                "beta": beta,
+                "oil": oil,
+                "cohumulone": cohumulone,
+                "brewing_purpose": purpose,
+                "alpha_classification": self._classify_alpha(alpha),
+                "oil_classification": self._classify_oil(oil),
+            }
+        return derived
+
     def get_brewing_purpose(self) -> str:
         """
         Determine the hop's primary brewing purpose based on alpha acid and oil content.
@@ -198,59 +364,31 @@ class HopEntry:
         Returns:
             str: 'Bittering', 'Aroma', or 'Dual Purpose'
         """
-        avg_alpha = self.get_average_alpha()
-        avg_oil = self.get_average_oil()
-
-        if avg_alpha >= 10 and avg_oil < 2:
-            return "Bittering"
-        elif avg_alpha < 8 and avg_oil >= 1.5:
-            return "Aroma"
-        else:
-            return "Dual Purpose"
+        return self._derived_stats()["brewing_purpose"]
 
     def get_average_alpha(self) -> float:
         """Get average alpha acid percentage."""
-        return self._get_average_value(self.alpha_from, self.alpha_to)
+        return self._derived_stats()["alpha"]
 
     def get_average_beta(self) -> float:
         """Get average beta acid percentage."""
-        return self._get_average_value(self.beta_from, self.beta_to)
+        return self._derived_stats()["beta"]
 
     def get_average_oil(self) -> float:
         """Get average oil content."""
-        return self._get_average_value(self.oil_from, self.oil_to)
+        return self._derived_stats()["oil"]
 
     def get_average_cohumulone(self) -> float:
         """Get average cohumulone percentage."""
-        return self._get_average_value(self.co_h_from, self.co_h_to)
-
-    def _get_average_value(
-        self, from_val: Union[str, float], to_val: Union[str, float]
-    ) -> float:
-        """Helper method to calculate average of range values."""
-
-        def parse_value(val):
-            if isinstance(val, (int, float)):
-                return float(val)
-            if isinstance(val, str):
-                # Remove any non-numeric characters and parse
-                cleaned = "".join(c for c in val if c.isdigit() or c == ".")
-                try:
-                    return float(cleaned) if cleaned else 0.0
-                except ValueError:
-                    return 0.0
-            return 0.0
-
-        from_parsed = parse_value(from_val)
-        to_parsed = parse_value(to_val)
-
-        if from_parsed == 0 and to_parsed == 0:
-            return 0.0
-        if to_parsed == 0:
-            return from_parsed
-        if from_parsed == 0:
-            return to_parsed
-        return (from_parsed + to_parsed) / 2
+        return self._derived_stats()["cohumulone"]
+
+    def get_alpha_classification(self) -> str:
+        """Alpha acid level: 'Low', 'Medium' or 'High'."""
+        return self._derived_stats()["alpha_classification"]
+
+    def get_oil_classification(self) -> str:
+        """Oil content level: 'Low', 'Medium' or 'High'."""
+        return self._derived_stats()["oil_classification"]
 
     def get_brewing_stats(self) -> Dict[str, Union[str, float]]:
         """
@@ -259,15 +397,19 @@ class HopEntry:
         Returns:
             Dict containing brewing purpose, averages, and classifications
         """
-        return {
-            "brewing_purpose": self.get_brewing_purpose(),
-            "avg_alpha": round(self.get_average_alpha(), 1),
-            "avg_beta": round(self.get_average_beta(), 1),
-            "avg_oil": round(self.get_average_oil(), 2),
-            "avg_cohumulone": round(self.get_average_cohumulone(), 1),
-            "alpha_classification": self._classify_alpha(self.get_average_alpha()),
-            "oil_classification": self._classify_oil(self.get_average_oil()),
-        }
+        derived = self._derived_stats()
+        stats = derived.get("brewing_stats")
+        if stats is None:
+            stats = derived["brewing_stats"] = {
+                "brewing_purpose": derived["brewing_purpose"],
+                "avg_alpha": round(derived["alpha"], 1),
+                "avg_beta": round(derived["beta"], 1),
+                "avg_oil": round(derived["oil"], 2),
+                "avg_cohumulone": round(derived["cohumulone"], 1),
+                "alpha_classification": derived["alpha_classification"],
+                "oil_classification": derived["oil_classification"],
+            }
+        return dict(stats)
 
     def _classify_alpha(self, alpha: float) -> str:
         """Classify alpha acid level."""
@@ -357,26 +499,23 @@ def analyze_brewing_parameters(hop_entries: List[HopEntry]) -> Dict:
     valid_cohumulone_count = 0
 
     for hop in hop_entries:
+        derived = hop._derived_stats()
+
         # Purpose classification
-        purpose = hop.get_brewing_purpose()
-        stats["by_purpose"][purpose] += 1
+        stats["by_purpose"][derived["brewing_purpose"]] += 1
 
         # Alpha classification
-        avg_alpha = hop.get_average_alpha()
-        alpha_class = hop._classify_alpha(avg_alpha)
-        stats["alpha_ranges"][alpha_class] += 1
+        stats["alpha_ranges"][derived["alpha_classification"]] += 1
 
         # Oil classification
-        avg_oil = hop.get_average_oil()
-        oil_class = hop._classify_oil(avg_oil)
-        stats["oil_ranges"][oil_class] += 1
+        stats["oil_ranges"][derived["oil_classification"]] += 1
 
         # Accumulate for averages
-        total_alpha += avg_alpha
-        total_beta += hop.get_average_beta()
-        total_oil += avg_oil
+        total_alpha += derived["alpha"]
+        total_beta += derived["beta"]
+        total_oil += derived["oil"]
 
-        avg_cohumulone = hop.get_average_cohumulone()
+        avg_cohumulone = derived["cohumulone"]
         if avg_cohumulone > 0:
             total_cohumulone += avg_cohumulone
             valid_cohumulone_count += 1
@@ -409,16 +548,19 @@ def compare_hops_brewing_parameters(hop_entries: List[HopEntry]) -> Dict:
 
     comparison = {"hops": [], "normalized_data": [], "recommendations": []}
 
+    purposes = []
     for hop in hop_entries:
+        derived = hop._derived_stats()
+        purposes.append(derived["brewing_purpose"])
         hop_data = {
             "name": hop.name,
             "source": hop.source,
-            "brewing_purpose": hop.get_brewing_purpose(),
+            "brewing_purpose": derived["brewing_purpose"],
             "parameters": {
-                "alpha": hop.get_average_alpha(),
-                "beta": hop.get_average_beta(),
-                "oil": hop.get_average_oil(),
-                "cohumulone": hop.get_average_cohumulone(),
+                "alpha": derived["alpha"],
+                "beta": derived["beta"],
+                "oil": derived["oil"],
+                "cohumulone": derived["cohumulone"],
             },
         }
         comparison["hops"].append(hop_data)
@@ -426,15 +568,14 @@ def compare_hops_brewing_parameters(hop_entries: List[HopEntry]) -> Dict:
         # Normalized data for radar charts (0-10 scale)
         normalized = {
             "name": hop.name,
-            "alpha_normalized": min((hop.get_average_alpha() / 20) * 10, 10),
-            "beta_normalized": min((hop.get_average_beta() / 10) * 10, 10),
-            "oil_normalized": min((hop.get_average_oil() / 4) * 10, 10),
-            "cohumulone_normalized": min((hop.get_average_cohumulone() / 50) * 10, 10),
+            "alpha_normalized": min((derived["alpha"] / 20) * 10, 10),
+            "beta_normalized": min((derived["beta"] / 10) * 10, 10),
+            "oil_normalized": min((derived["oil"] / 4) * 10, 10),
+            "cohumulone_normalized": min((derived["cohumulone"] / 50) * 10, 10),
         }
         comparison["normalized_data"].append(normalized)
 
     # Generate recommendations
-    purposes = [hop.get_brewing_purpose() for hop in hop_entries]
     if all(p == "Bittering" for p in purposes):
         comparison["recommendations"].append(
             "All selected hops are primarily bittering hops - great for early boil additions"
@@ -0,0 +1,292 @@
+"""
+Columnar hop table
+
+``HopTable`` holds a whole database column-wise in NumPy arrays, so the
+brewing analytics of ``hop_model`` run as array operations instead of Python
+loops over ``HopEntry`` objects:
+
+* ``ranges``: an (N × 8) float matrix of the parsed range endpoints in
+  ``RANGE_FIELDS`` order (NaN when missing), read from the entries'
+  ``<field>_value`` slots without re-parsing;
+* ``aromas``: an (N × 9) float matrix in ``STANDARD_AROMAS`` order;
+* ``country`` and ``source``: categorical columns (``Categorical`` codes
+  into a list of categories).
+
+Averages, brewing purpose and the alpha/oil classifications follow exactly
+the rules of ``HopEntry``.  ``analyze_brewing_parameters()`` returns the same
+result as the list-based function of ``hop_model``;
+``compare_brewing_parameters()`` returns a columnar ``BrewingComparison``
+whose ``to_records()`` does.
+"""
+
+from dataclasses import dataclass
+from operator import attrgetter, itemgetter
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .hop_model import RANGE_FIELDS, STANDARD_AROMAS, HopEntry
+
+PURPOSES = ("Bittering", "Aroma", "Dual Purpose")
+LEVELS = ("Low", "Medium", "High")
+
+# Averaged parameters and the columns of their range endpoints
+PARAMETERS = {
+    "alpha": ("alpha_from", "alpha_to"),
+    "beta": ("beta_from", "beta_to"),
+    "oil": ("oil_from", "oil_to"),
+    "cohumulone": ("co_h_from", "co_h_to"),
+}
+
+# Value of each parameter shown as 10 on the comparison's 0-10 scale
+NORMALIZATION_SCALES = {"alpha": 20, "beta": 10, "oil": 4, "cohumulone": 50}
+
+_RANGE_INDEX = {name: index for index, name in enumerate(RANGE_FIELDS)}
+_range_values = attrgetter(*(f"{name}_value" for name in RANGE_FIELDS))
+_aroma_values = itemgetter(*STANDARD_AROMAS)
+_NO_AROMAS = (0,) * len(STANDARD_AROMAS)
+
+
+def _aroma_row(aromas) -> tuple:
+    """The aroma values of an entry in STANDARD_AROMAS order (0 when absent)."""
+    if not isinstance(aromas, dict):
+        return _NO_AROMAS
+    try:
+        return _aroma_values(aromas)
+    except KeyError:
+        return tuple(aromas.get(aroma, 0) for aroma in STANDARD_AROMAS)
+
+
+@dataclass
+class Categorical:
+    """A categorical column: ``categories[codes[i]]`` is the value of row i."""
+
+    codes: np.ndarray
+    categories: List[str]
+
+    @classmethod
+    def from_values(cls, values: Iterable[str]) -> "Categorical":
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        return cls(np.array(codes, dtype=np.int32), list(index))
+
+    def values(self) -> List[str]:
+        categories = self.categories
+        return [categories[code] for code in self.codes.tolist()]
+
+
+def _average(low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """HopEntry's average of a range: a missing (NaN) or zero end is left out."""
+    low = np.nan_to_num(low, nan=0.0)
+    high = np.nan_to_num(high, nan=0.0)
+    return np.where(high == 0, low, np.where(low == 0, high, (low + high) / 2))
+
+
+def _purpose_codes(alpha: np.ndarray, oil: np.ndarray) -> np.ndarray:
+    return np.select([(alpha >= 10) & (oil < 2), (alpha < 8) & (oil >= 1.5)], [0, 1], default=2)
+
+
+def _levels(values: np.ndarray, medium: float, high: float) -> np.ndarray:
+    """0 (Low) below ``medium``, 1 (Medium) below ``high``, else 2 (High)."""
+    return np.searchsorted([medium, high], values, side="right")
+
+
+def _sequential_sum(values: np.ndarray) -> float:
+    """Left-to-right sum, as the list-based analysis accumulates it (np.sum is pairwise)."""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def _capped(values: np.ndarray, cap: float) -> list:
+    """``min(value, cap)`` per row, including its int result for values above the cap."""
+    result = values.tolist()
+    for index in np.flatnonzero(values > cap).tolist():
+        result[index] = cap
+    return result
+
+
+class HopTable:
+    """A hop database held column-wise in NumPy arrays."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        ranges: np.ndarray,
+        aromas: np.ndarray,
+        country: Categorical,
+        source: Categorical,
+    ):
+        self.names = list(names)
+        self.ranges = np.asarray(ranges, dtype=float).reshape(len(self.names), len(RANGE_FIELDS))
+        self.aromas = np.asarray(aromas, dtype=float).reshape(len(self.names), len(STANDARD_AROMAS))
+        self.country = country
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_entries(cls, hop_entries: Sequence[HopEntry]) -> "HopTable":
+        """Build a table from entries (their ranges are already parsed)."""
+        ranges = np.array([_range_values(hop) for hop in hop_entries], dtype=float)
+        aromas = np.array([_aroma_row(hop.standardized_aromas) for hop in hop_entries], dtype=float)
+        return cls(
+            [hop.name for hop in hop_entries],
+            ranges,
+            aromas,
+            Categorical.from_values(hop.country for hop in hop_entries),
+            Categorical.from_values(hop.source for hop in hop_entries),
+        )
+
+    def to_entries(self) -> List[HopEntry]:
+        """
+        Entries with the table's name, country, source, ranges (floats, ""
+        when missing) and aromas; other HopEntry fields keep their defaults.
+        """
+        ranges = np.where(np.isnan(self.ranges), None, self.ranges).tolist()
+        aromas = self.aromas.tolist()
+        entries = []
+        for name, country, source, row, aroma_row in zip(
+            self.names, self.country.values(), self.source.values(), ranges, aromas
+        ):
+            entries.append(
+                HopEntry(
+                    name=name,
+                    country=country,
+                    source=source,
+                    **{field: "" if value is None else value for field, value in zip(RANGE_FIELDS, row)},
+                    standardized_aromas=dict(zip(STANDARD_AROMAS, aroma_row)),
+                )
+            )
+        return entries
+
+    def column(self, field: str) -> np.ndarray:
+        """The parsed values of one range field (a view into ``ranges``)."""
+        return self.ranges[:, _RANGE_INDEX[field]]
+
+    def average(self, parameter: str) -> np.ndarray:
+        """Per-hop average of "alpha", "beta", "oil" or "cohumulone"."""
+        low, high = PARAMETERS[parameter]
+        return _average(self.column(low), self.column(high))
+
+    def purpose_codes(self) -> np.ndarray:
+        """Brewing purpose of each hop as an index into PURPOSES."""
+        return _purpose_codes(self.average("alpha"), self.average("oil"))
+
+    def brewing_purpose(self) -> Categorical:
+        """Brewing purpose of each hop: 'Bittering', 'Aroma' or 'Dual Purpose'."""
+        return Categorical(self.purpose_codes().astype(np.int32), list(PURPOSES))
+
+    def alpha_classification(self) -> np.ndarray:
+        """Alpha acid level of each hop as an index into LEVELS."""
+        return _levels(self.average("alpha"), 6, 10)
+
+    def oil_classification(self) -> np.ndarray:
+        """Oil content level of each hop as an index into LEVELS."""
+        return _levels(self.average("oil"), 1.5, 2.5)
+
+    def analyze_brewing_parameters(self) -> Dict:
+        """Vectorized ``hop_model.analyze_brewing_parameters``, with the same result."""
+        count = len(self)
+        if not count:
+            return {}
+        alpha, beta = self.average("alpha"), self.average("beta")
+        oil, cohumulone = self.average("oil"), self.average("cohumulone")
+
+        def counts(codes: np.ndarray, labels: Sequence[str]) -> Dict[str, int]:
+            return dict(zip(labels, np.bincount(codes, minlength=len(labels)).tolist()))
+
+        valid_cohumulone = cohumulone[cohumulone > 0]
+        return {
+            "total_hops": count,
+            "by_purpose": counts(_purpose_codes(alpha, oil), PURPOSES),
+            "alpha_ranges": counts(_levels(alpha, 6, 10), LEVELS),
+            "oil_ranges": counts(_levels(oil, 1.5, 2.5), LEVELS),
+            "averages": {
+                "alpha": round(_sequential_sum(alpha) / count, 1),
+                "beta": round(_sequential_sum(beta) / count, 1),
+                "oil": round(_sequential_sum(oil) / count, 2),
+                "cohumulone": (
+                    round(_sequential_sum(valid_cohumulone) / len(valid_cohumulone), 1)
+                    if len(valid_cohumulone)
+                    else 0
+                ),
+            },
+        }
+
+    def compare_brewing_parameters(self) -> "BrewingComparison":
+        """
+        Vectorized ``hop_model.compare_hops_brewing_parameters``, as columns;
+        its ``to_records()`` is the list-based result.
+        """
+        averages = {parameter: self.average(parameter) for parameter in PARAMETERS}
+        purpose_codes = _purpose_codes(averages["alpha"], averages["oil"])
+        if not len(self):
+            recommendations = []
+        elif (purpose_codes == 0).all():
+            recommendations = ["All selected hops are primarily bittering hops - great for early boil additions"]
+        elif (purpose_codes == 1).all():
+            recommendations = [
+                "All selected hops are aroma hops - ideal for late boil, whirlpool, or dry hop additions"
+            ]
+        else:
+            recommendations = [
+                "Mix of hop purposes - consider using bittering hops early and aroma hops late in the boil"
+            ]
+        return BrewingComparison(self.names, self.source, averages, purpose_codes, recommendations)
+
+
+@dataclass
+class BrewingComparison:
+    """
+    Per-hop brewing parameters of a HopTable, column-wise.
+
+    ``averages`` maps each of PARAMETERS to an array of per-hop averages and
+    ``purpose_codes`` indexes into PURPOSES; ``normalized()`` gives the 0-10
+    radar-chart scale.  ``to_records()`` builds the per-hop dicts of
+    ``hop_model.compare_hops_brewing_parameters``.
+    """
+
+    names: List[str]
+    source: Categorical
+    averages: Dict[str, np.ndarray]
+    purpose_codes: np.ndarray
+    recommendations: List[str]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _scaled(self, parameter: str) -> np.ndarray:
+        return self.averages[parameter] / NORMALIZATION_SCALES[parameter] * 10
+
+    def normalized(self, parameter: str) -> np.ndarray:
+        """One parameter on the 0-10 scale (capped at 10)."""
+        return np.minimum(self._scaled(parameter), 10)
+
+    def brewing_purpose(self) -> Categorical:
+        """Brewing purpose of each hop: 'Bittering', 'Aroma' or 'Dual Purpose'."""
+        return Categorical(self.purpose_codes.astype(np.int32), list(PURPOSES))
+
+    def to_records(self) -> Dict:
+        """The result of ``hop_model.compare_hops_brewing_parameters`` for the same hops."""
+        if not len(self):
+            return {}
+        purposes = [PURPOSES[code] for code in self.purpose_codes.tolist()]
+        values = {parameter: column.tolist() for parameter, column in self.averages.items()}
+        normalized = {parameter: _capped(self._scaled(parameter), 10) for parameter in PARAMETERS}
+        comparison = {"hops": [], "normalized_data": [], "recommendations": list(self.recommendations)}
+        for index, (name, source) in enumerate(zip(self.names, self.source.values())):
+            comparison["hops"].append(
+                {
+                    "name": name,
+                    "source": source,
+                    "brewing_purpose": purposes[index],
+                    "parameters": {parameter: values[parameter][index] for parameter in PARAMETERS},
+                }
+            )
+            comparison["normalized_data"].append(
+                {
+                    "name": name,
+                    **{f"{parameter}_normalized": normalized[parameter][index] for parameter in PARAMETERS},
+                }
+            )
+        return comparison
@@ -0,0 +1,282 @@
+"""
+Merging of hop entries from several sources
+
+``merge_entries()`` merges the entries that share a group key (the
+normalized variety name) into one ``HopEntry`` per group.  The entries are
+read once into a columnar view: the range values become an (N × 8) float
+matrix, aroma and additional property values long (group, column, value)
+arrays.  ``group_stats()`` accumulates the min, max, sum and count of the
+positive values of every (group, column) cell with NumPy's unbuffered
+``ufunc.at``, so the numeric merge is linear in the number of values; only
+the text fields and the product variants are combined per group in Python.
+
+A merged entry has:
+
+* ranges: the lowest positive ``*_from`` and the highest positive ``*_to``
+  of its entries (0.0 when there is none);
+* aromas: the mean of the positive values of each aroma, rounded to 2
+  decimals (0 when there is none);
+* additional ``<key>_from``/``<key>_to`` properties: merged like the ranges;
+* notes: the sorted set of lowercased notes; country: the first one given,
+  normalized; source: the distinct sources, sorted and joined by " / ";
+  href: the distinct links joined by " | "; storage: the distinct values
+  joined by " / "; description: the first one given;
+* product variants: one per type, sorted by type, with range values merged
+  as numbers (see ``merge_variants()``).
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .aroma_scaling import round_values
+from .hop_model import RANGE_FIELDS, STANDARD_AROMAS, HopEntry, raw_range_values
+
+# Product variant keys merged to the lowest / highest value
+VARIANT_MIN_KEYS = {"alpha_from", "beta_from", "oil_from", "co_h_from"}
+VARIANT_MAX_KEYS = {"alpha_to", "beta_to", "oil_to", "co_h_to"}
+
+_FROM = np.array([name.endswith("_from") for name in RANGE_FIELDS])
+_text_fields = attrgetter(
+    "country", "source", "href", "storage", "description", "notes", "product_variants"
+)
+
+
+def get_safe_float(value, default=0.0):
+    """Safely converts a value to a float."""
+    if value is None or value == '': return default
+    try: return float(value)
+    except (ValueError, TypeError): return default
+
+
+# Sources repeat the same few values
+_cached_safe_float = lru_cache(maxsize=65536)(get_safe_float)
+
+
+def _safe_float(value) -> float:
+    """``get_safe_float()``, cached unless the value is unhashable."""
+    try:
+        return _cached_safe_float(value)
+    except TypeError:
+        return get_safe_float(value)
+
+
+def _safe_floats(values: list) -> np.ndarray:
+    """``get_safe_float()`` of each value."""
+    try:
+        return np.fromiter(map(_cached_safe_float, values), float, len(values))
+    except TypeError:  # an unhashable value
+        return np.fromiter(map(get_safe_float, values), float, len(values))
+
+
+def _index(values: Iterable[str]) -> Dict[str, int]:
+    """Code of each distinct value, in order of first appearance."""
+    return {value: code for code, value in enumerate(dict.fromkeys(values))}
+
+
+@dataclass
+class GroupStats:
+    """
+    Min, max, sum and count of the positive values in each (group, column)
+    cell; min and max are 0.0 in cells without a positive value.
+    """
+
+    minimum: np.ndarray
+    maximum: np.ndarray
+    total: np.ndarray
+    count: np.ndarray
+
+
+def group_stats(
+    groups: np.ndarray, columns: np.ndarray, values: np.ndarray, shape: Tuple[int, int]
+) -> GroupStats:
+    """
+    Accumulate the positive ``values`` into their (``groups``, ``columns``)
+    cells of a ``shape`` grid.  Sums add the values in input order, as a
+    Python loop over the entries does.
+    """
+    positive = values > 0
+    cells = np.ravel_multi_index((groups[positive], columns[positive]), shape)
+    values = values[positive]
+    size = shape[0] * shape[1]
+    minimum = np.full(size, np.inf)
+    np.minimum.at(minimum, cells, values)
+    maximum = np.zeros(size)
+    np.maximum.at(maximum, cells, values)
+    total = np.zeros(size)
+    np.add.at(total, cells, values)
+    count = np.bincount(cells, minlength=size)
+    minimum[count == 0] = 0.0
+    return GroupStats(*(array.reshape(shape) for array in (minimum, maximum, total, count)))
+
+
+def _first_cells(groups: np.ndarray, columns: np.ndarray, width: int) -> Dict[int, List[int]]:
+    """The columns of each group's cells, in order of their first appearance in the input."""
+    cells, first = np.unique(groups * width + columns, return_index=True)
+    per_group: Dict[int, List[int]] = {}
+    for cell in cells[np.argsort(first, kind="stable")].tolist():
+        per_group.setdefault(cell // width, []).append(cell % width)
+    return per_group
+
+
+def _ranges(hop_entries: Sequence[HopEntry], group: np.ndarray, groups: int) -> List[Dict[str, float]]:
+    values = _safe_floats([value for row in map(raw_range_values, hop_entries) for value in row])
+    width = len(RANGE_FIELDS)
+    stats = group_stats(np.repeat(group, width), np.tile(np.arange(width), len(group)), values, (groups, width))
+    merged = np.where(_FROM, stats.minimum, stats.maximum).tolist()
+    return [dict(zip(RANGE_FIELDS, row)) for row in merged]
+
+
+def _aromas(aroma_dicts: list, group: np.ndarray, groups: int) -> List[Dict]:
+    owners = [index for index, aromas in enumerate(aroma_dicts) if isinstance(aromas, dict)]
+    dicts = [aroma_dicts[index] for index in owners]
+    keys = [key for aromas in dicts for key in aromas]
+    values = np.array([value for aromas in dicts for value in aromas.values()], dtype=float)
+    category_index = _index([*STANDARD_AROMAS, *keys])
+    categories = list(category_index)
+    value_group = np.repeat(group[owners], [len(aromas) for aromas in dicts])
+    category = np.fromiter(map(category_index.__getitem__, keys), np.intp, len(keys))
+    stats = group_stats(value_group, category, values, (groups, len(categories)))
+
+    means = round_values(np.divide(stats.total, stats.count, out=np.zeros_like(stats.total), where=stats.count > 0), 2)
+    rows = means.astype(object)
+    rows[stats.count == 0] = 0  # the int default of aromas without a value
+    rows = rows.tolist()
+    standard = len(STANDARD_AROMAS)
+    merged = [dict(zip(STANDARD_AROMAS, row)) for row in rows]
+    if len(categories) > standard:
+        # Other aromas follow in order of their first positive value in the group
+        positive = values > 0
+        extra = positive & (category >= standard)
+        for code, columns in _first_cells(value_group[extra], category[extra], len(categories)).items():
+            merged[code].update((categories[column], rows[code][column]) for column in columns)
+    return merged
+
+
+def _range_key(key: str) -> Tuple[str, int]:
+    """The base key and side (0: from, 1: to) of an additional property; side -1 for other keys."""
+    if key.endswith("_from"):
+        return key[:-5], 0
+    if key.endswith("_to"):
+        return key[:-3], 1
+    return key, -1
+
+
+def _additional_properties(properties: list, group: np.ndarray, groups: int) -> List[Dict[str, float]]:
+    owners = [index for index, props in enumerate(properties) if props]
+    dicts = [properties[index] for index in owners]
+    keys = [key for props in dicts for key in props]
+    split = {key: _range_key(key) for key in dict.fromkeys(keys)}
+    base_index = _index(base for base, side in split.values() if side >= 0)
+    names = list(base_index)
+    merged = [{} for _ in range(groups)]
+    if not names:
+        return merged
+
+    # Column of each value: 2 * base + side, or -1 for keys that are not ranges
+    column_of = {key: 2 * base_index[base] + side if side >= 0 else -1 for key, (base, side) in split.items()}
+    columns = np.fromiter(map(column_of.__getitem__, keys), np.intp, len(keys))
+    ranged = columns >= 0
+    raw = [value for props in dicts for value in props.values()]
+    values = _safe_floats([value for value, keep in zip(raw, ranged.tolist()) if keep])
+    value_group = np.repeat(group[owners], [len(props) for props in dicts])[ranged]
+    columns = columns[ranged]
+    stats = group_stats(value_group, columns, values, (groups, 2 * len(names)))
+    lows, highs = stats.minimum[:, 0::2].tolist(), stats.maximum[:, 1::2].tolist()
+    # Keys follow in order of the first appearance of their base key in the group
+    for code, bases in _first_cells(value_group, columns // 2, len(names)).items():
+        for base in bases:
+            merged[code][f"{names[base]}_from"] = lows[code][base]
+            merged[code][f"{names[base]}_to"] = highs[code][base]
+    return merged
+
+
+def merge_variants(variants: Iterable[Dict]) -> List[Dict]:
+    """
+    Merge product variants by type, sorted by type.  The first variant of a
+    type is taken as it is; later ones fill its empty keys and extend its
+    ranges: a ``*_from`` value becomes the lowest and a ``*_to`` value the
+    highest positive number given (a float), or is replaced when it is not a
+    positive number.
+    """
+    merged_by_type: Dict[str, Dict] = {}
+    for variant in variants:
+        variant_type = variant.get("type", "")
+        if not variant_type:
+            continue
+        merged = merged_by_type.get(variant_type)
+        if merged is None:
+            merged_by_type[variant_type] = dict(variant)
+            continue
+        for key, value in variant.items():
+            if value in (None, ""):
+                continue
+            if key in VARIANT_MIN_KEYS or key in VARIANT_MAX_KEYS:
+                current = _safe_float(merged.get(key))
+                if current == 0:
+                    merged[key] = value
+                else:
+                    number = _safe_float(value)
+                    if number > 0:
+                        merged[key] = min(current, number) if key in VARIANT_MIN_KEYS else max(current, number)
+            elif not merged.get(key):
+                merged[key] = value
+    return sorted(merged_by_type.values(), key=lambda v: v.get("type", ""))
+
+
+def merge_entries(
+    hop_entries: Sequence[HopEntry],
+    group_keys: Sequence[str],
+    normalize_country: Callable[[str], str] = str.strip,
+) -> List[HopEntry]:
+    """
+    Merge the entries that share a group key into one entry per group.
+
+    Args:
+        hop_entries: The entries to merge.
+        group_keys: The group key of each entry; a group's entry is named
+            ``key.capitalize()``.
+        normalize_country: Applied to the country of a merged entry.
+
+    Returns:
+        The merged entries, in order of the first entry of each group.
+    """
+    group_index = _index(group_keys)
+    group = np.fromiter(map(group_index.__getitem__, group_keys), np.intp, len(group_keys))
+    groups = len(group_index)
+
+    ranges = _ranges(hop_entries, group, groups)
+    aromas = _aromas([hop.standardized_aromas for hop in hop_entries], group, groups)
+    properties = _additional_properties([hop.additional_properties for hop in hop_entries], group, groups)
+
+    # Text fields and variants, combined per group over the entries sorted by group
+    order = np.argsort(group, kind="stable").tolist()
+    ends = np.cumsum(np.bincount(group, minlength=groups)).tolist()
+    text = list(map(_text_fields, hop_entries))
+    text = [text[index] for index in order]
+
+    merged_hops = []
+    start = 0
+    for code, (key, end) in enumerate(zip(group_index, ends)):
+        rows = text[start:end]
+        start = end
+        country = next((row[0] for row in rows if row[0]), None)
+        merged_hops.append(
+            HopEntry(
+                name=key.capitalize(),
+                country=normalize_country(country) if country is not None else "",
+                source=" / ".join(sorted({row[1] for row in rows if row[1]})),
+                href=" | ".join(dict.fromkeys(row[2] for row in rows if row[2])),
+                storage=" / ".join(dict.fromkeys(row[3] for row in rows if row[3])),
+                description=next((row[4] for row in rows if row[4]), ""),
+                notes=sorted({note.strip().lower() for row in rows for note in row[5] if note}),
+                standardized_aromas=aromas[code],
+                additional_properties=properties[code],
+                product_variants=merge_variants(variant for row in rows for variant in row[6]),
+                **ranges[code],
+            )
+        )
+    return merged_hops
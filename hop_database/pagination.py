@@ -0,0 +1,109 @@
+"""
+Concurrent pagination for paginated catalogs
+
+Supplier catalogs split over pages (the Shopify ``products.json`` feed of
+Yakima Valley Hops, the Magento listings of Yakima Chief) used to be walked
+one page after another, so downloading a catalog took one round trip per
+page.  ``paginate()`` fetches the first page, learns the page count from it
+when the catalog reports one, and then requests the remaining pages
+concurrently.  When the count is unknown it keeps a window of speculative
+requests ahead of the last full page and stops at the first short page.
+
+Pages are yielded as they arrive, so callers can parse the items of one page
+(or start fetching their detail pages) while others are still downloading.
+Each page comes with its number, so callers that need catalog order can
+restore it.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import requests
+
+from . import aio, scheduler
+
+T = TypeVar("T")
+
+DEFAULT_WINDOW = 4  # speculative page requests in flight while the page count is unknown
+
+
+async def paginate(
+    fetcher: aio.AsyncFetcher,
+    page_url: Callable[[int], str],
+    parse_items: Callable[[requests.Response], List[T]],
+    page_size: int,
+    count_pages: Optional[Callable[[requests.Response, List[T]], Optional[int]]] = None,
+    window: int = DEFAULT_WINDOW,
+    timeout: Optional[float] = None,
+    priority: int = scheduler.LISTING,
+) -> AsyncIterator[Tuple[int, List[T]]]:
+    """
+    Fetch every page of a paginated catalog and yield ``(page number, items)``
+    in the order the pages arrive (pages without items are not yielded).
+
+    Args:
+        fetcher: Fetcher used for every page.
+        page_url: Builds the URL of a page from its 1-based number.
+        parse_items: Extracts the items from a page response.
+        page_size: Items on a full page; a shorter page is the last one when
+            the page count is unknown.
+        count_pages: Reads the page count from the first page (response and
+            items), or returns None when the catalog does not say.
+        window: Pages requested ahead while the page count is unknown.  Use 0
+            for catalogs that answer out-of-range page numbers with the last
+            page: only the first page is fetched then.
+        timeout: Per-request timeout passed to the fetcher.
+        priority: Scheduler priority of the page requests.
+
+    Raises:
+        requests.exceptions.RequestException: If a page cannot be fetched (or
+            ``parse_items`` raises one); pages still in flight are cancelled.
+    """
+
+    async def fetch(number: int) -> Tuple[requests.Response, List[T]]:
+        response = await fetcher.get(page_url(number), timeout=timeout, priority=priority)
+        response.raise_for_status()
+        return response, parse_items(response)
+
+    def is_last(items: List[T]) -> bool:
+        return page_count is None and len(items) < page_size
+
+    response, items = await fetch(1)
+    page_count = count_pages(response, items) if count_pages is not None else None
+    if items:
+        yield 1, items
+    if is_last(items) or (page_count is None and window <= 0):
+        return
+    last = page_count  # number of the last page to fetch, once known
+
+    pending: Dict[asyncio.Future, int] = {}
+    next_page = 2
+    try:
+        while True:
+            while next_page <= (last if last is not None else next_page + window - len(pending) - 1):
+                pending[asyncio.ensure_future(fetch(next_page))] = next_page
+                next_page += 1
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda task: pending.get(task, 0)):
+                if task not in pending:
+                    continue  # dropped above: beyond a page found to be the last
+                number = pending.pop(task)
+                _, items = task.result()
+                if last is not None and number > last:
+                    continue
+                if is_last(items):
+                    last = number
+                    for other, other_number in list(pending.items()):
+                        if other_number > last:
+                            other.cancel()
+                            del pending[other]
+                if items:
+                    yield number, items
+    finally:
+        for task in pending:
+            if task.done() and not task.cancelled():
+                task.exception()  # already failed or finished: nothing to cancel
+            else:
+                task.cancel()
@@ -0,0 +1,315 @@
+"""
+Process-wide scheduler for fetch and parse jobs
+
+Every network fetch (``http.get``/``http.download`` and the asyncio backend)
+and every PDF parse (``utils.pdf.run_parser``) takes a slot from one shared
+``Scheduler`` before it runs, so a multi-source crawl uses a fixed, tunable
+amount of resources no matter how many sources run concurrently:
+
+* a global fetch budget caps requests in flight across all hosts, on top of
+  each host's adaptive limit (``throttle.AdaptiveLimiter``);
+* a parse budget caps PDF parses (normally the parser process count);
+* waiting jobs are dispatched by priority, so listing pages go before hop
+  pages and HTML before PDFs; jobs for a host that is at its limit do not
+  hold up jobs for other hosts.
+
+Sources run on their own threads and event loops, so the scheduler is guarded
+by a thread lock; coroutines are woken on their own loop and threads through
+an event.  ``report()`` describes queue depth, wait times and utilization.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+# Job priorities (lower runs first); PARSE jobs use the parse budget
+LISTING = 0
+PAGE = 1
+PDF = 2
+PARSE = 3
+
+PRIORITY_NAMES = {LISTING: "listing", PAGE: "page", PDF: "pdf", PARSE: "parse"}
+
+FETCH = "fetch"
+PARSING = "parse"
+
+DEFAULT_FETCH_BUDGET = 24  # requests in flight across all hosts
+
+# Outcome recorded for a ticket released without reporting one
+FAILED = "failed"
+
+_held = threading.local()
+
+
+class Ticket:
+    """A granted (or pending) slot; set ``outcome`` before releasing it."""
+
+    __slots__ = ("priority", "seq", "limiter", "enqueued", "started", "outcome", "_notify", "granted", "cancelled")
+
+    def __init__(self, priority: int, seq: int, limiter, notify: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.limiter = limiter
+        self.enqueued = time.monotonic()
+        self.started = 0.0
+        self.outcome = FAILED
+        self._notify = notify
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Scheduler:
+    """Grants fetch and parse slots under global budgets and per-host limits."""
+
+    def __init__(self, fetch_budget: int = DEFAULT_FETCH_BUDGET, parse_budget: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._budgets = {FETCH: max(1, fetch_budget), PARSING: max(1, parse_budget or os.cpu_count() or 1)}
+        self._busy = {FETCH: 0, PARSING: 0}
+        self._busy_seconds = {FETCH: 0.0, PARSING: 0.0}
+        self._peak_busy = {FETCH: 0, PARSING: 0}
+        self._queue: List[Ticket] = []
+        self._seq = itertools.count()
+        self._first_job: Optional[float] = None
+        self._last_change = 0.0
+        self._counts: Counter = Counter()        # (priority, "jobs" | "queued") → count
+        self._wait: Counter = Counter()          # priority → total wait seconds
+        self._max_wait: Dict[int, float] = {}
+        self._depth: Counter = Counter()         # priority → jobs currently queued
+        self._peak_depth: Counter = Counter()
+
+    @staticmethod
+    def _pool(priority: int) -> str:
+        return PARSING if priority == PARSE else FETCH
+
+    def configure(self, fetch_budget: Optional[int] = None, parse_budget: Optional[int] = None) -> None:
+        """Change the budgets; queued jobs are dispatched under the new values."""
+        with self._lock:
+            if fetch_budget is not None:
+                self._budgets[FETCH] = max(1, fetch_budget)
+            if parse_budget is not None:
+                self._budgets[PARSING] = max(1, parse_budget)
+            self._dispatch()
+
+    # --- bookkeeping (caller holds self._lock) ---
+
+    def _account(self, now: float) -> None:
+        if self._first_job is None:
+            self._first_job = self._last_change = now
+        elapsed = now - self._last_change
+        for pool, busy in self._busy.items():
+            self._busy_seconds[pool] += busy * elapsed
+        self._last_change = now
+
+    def _try_grant(self, ticket: Ticket, now: float) -> bool:
+        pool = self._pool(ticket.priority)
+        if self._busy[pool] >= self._budgets[pool]:
+            return False
+        if ticket.limiter is not None and not ticket.limiter.try_acquire():
+            return False
+        self._busy[pool] += 1
+        self._peak_busy[pool] = max(self._peak_busy[pool], self._busy[pool])
+        ticket.granted = True
+        ticket.started = now
+        waited = now - ticket.enqueued
+        self._counts[ticket.priority, "jobs"] += 1
+        self._wait[ticket.priority] += waited
+        self._max_wait[ticket.priority] = max(self._max_wait.get(ticket.priority, 0.0), waited)
+        return True
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._account(now)
+        blocked = []
+        while self._queue and any(self._busy[p] < self._budgets[p] for p in self._busy):
+            ticket = heapq.heappop(self._queue)
+            if ticket.cancelled:
+                continue
+            if self._try_grant(ticket, now):
+                self._depth[ticket.priority] -= 1
+                ticket._notify()
+            else:
+                blocked.append(ticket)
+        for ticket in blocked:
+            heapq.heappush(self._queue, ticket)
+
+    def _enqueue(self, ticket: Ticket) -> bool:
+        """Grant immediately if possible, otherwise queue; True if granted."""
+        now = time.monotonic()
+        self._account(now)
+        # Every queued job is blocked (budget or host limit), so nothing is skipped
+        if self._try_grant(ticket, now):
+            return True
+        heapq.heappush(self._queue, ticket)
+        self._counts[ticket.priority, "queued"] += 1
+        self._depth[ticket.priority] += 1
+        self._peak_depth[ticket.priority] = max(self._peak_depth[ticket.priority], self._depth[ticket.priority])
+        return False
+
+    # --- public API ---
+
+    def acquire(self, priority: int, limiter=None) -> Ticket:
+        """Block the calling thread until a slot is granted."""
+        event = threading.Event()
+        ticket = Ticket(priority, next(self._seq), limiter, event.set)
+        with self._lock:
+            if self._enqueue(ticket):
+                return ticket
+        event.wait()
+        return ticket
+
+    async def acquire_async(self, priority: int, limiter=None) -> Ticket:
+        """Wait on the running event loop until a slot is granted."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        ticket = Ticket(
+            priority, next(self._seq), limiter, lambda: loop.call_soon_threadsafe(_resolve, future)
+        )
+        with self._lock:
+            if self._enqueue(ticket):
+                return ticket
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket.granted:
+                    self._release(ticket)
+                else:
+                    ticket.cancelled = True
+                    self._depth[priority] -= 1
+            raise
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Return a slot, reporting ``ticket.outcome`` to the host limiter."""
+        with self._lock:
+            self._release(ticket)
+
+    def _release(self, ticket: Ticket) -> None:
+        self._account(time.monotonic())
+        self._busy[self._pool(ticket.priority)] -= 1
+        if ticket.limiter is not None:
+            ticket.limiter.release(ticket.started, ticket.outcome)
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Budgets, utilization and per-priority job counts, queue depths and waits."""
+        with self._lock:
+            self._account(time.monotonic())
+            elapsed = (self._last_change - self._first_job) if self._first_job is not None else 0.0
+            pools = {
+                pool: {
+                    "budget": self._budgets[pool],
+                    "busy": self._busy[pool],
+                    "peak_busy": self._peak_busy[pool],
+                    "utilization": (
+                        self._busy_seconds[pool] / (self._budgets[pool] * elapsed) if elapsed > 0 else 0.0
+                    ),
+                }
+                for pool in (FETCH, PARSING)
+            }
+            priorities = {
+                name: {
+                    "jobs": self._counts[priority, "jobs"],
+                    "queued": self._counts[priority, "queued"],
+                    "depth": self._depth[priority],
+                    "peak_depth": self._peak_depth[priority],
+                    "mean_wait": (
+                        self._wait[priority] / self._counts[priority, "jobs"]
+                        if self._counts[priority, "jobs"] else 0.0
+                    ),
+                    "max_wait": self._max_wait.get(priority, 0.0),
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            }
+            return {"elapsed": elapsed, "pools": pools, "priorities": priorities}
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+    # A cancelled waiter hands its slot back in acquire_async()
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler."""
+    return _scheduler
+
+
+def configure(fetch_budget: Optional[int] = None, parse_budget: Optional[int] = None) -> None:
+    """Set the global fetch and/or parse budget."""
+    _scheduler.configure(fetch_budget, parse_budget)
+
+
+@contextmanager
+def holding_slot() -> Iterator[None]:
+    """Mark the current thread as already holding a slot for the fetch it runs."""
+    _held.active = True
+    try:
+        yield
+    finally:
+        _held.active = False
+
+
+def slot_held() -> bool:
+    """True inside holding_slot(): the caller's slot covers this fetch."""
+    return getattr(_held, "active", False)
+
+
+@contextmanager
+def slot(priority: int, limiter=None) -> Iterator[Ticket]:
+    """
+    Hold a slot of the global scheduler for the duration of the block.
+
+    Set ``ticket.outcome`` inside the block so the host limiter learns how the
+    request went.  Inside holding_slot() no extra slot is taken.
+    """
+    if slot_held():
+        yield Ticket(priority, -1, None, lambda: None)
+        return
+    ticket = _scheduler.acquire(priority, limiter)
+    try:
+        yield ticket
+    finally:
+        _scheduler.release(ticket)
+
+
+@asynccontextmanager
+async def slot_async(priority: int, limiter=None) -> AsyncIterator[Ticket]:
+    """Coroutine variant of slot()."""
+    ticket = await _scheduler.acquire_async(priority, limiter)
+    try:
+        yield ticket
+    finally:
+        _scheduler.release(ticket)
+
+
+def report() -> List[str]:
+    """Lines describing budgets, utilization, queue depth and waits."""
+    s = _scheduler.stats()
+    if not any(q["jobs"] for q in s["priorities"].values()):
+        return []
+    lines = []
+    for pool, p in s["pools"].items():
+        lines.append(
+            f"  {pool:<6} budget {p['budget']:>3}  peak {p['peak_busy']:>3} busy  "
+            f"utilization {p['utilization']:.0%}"
+        )
+    for name, q in s["priorities"].items():
+        if q["jobs"]:
+            lines.append(
+                f"  {name:<8} {q['jobs']:>5} jobs, {q['queued']:>5} queued (peak depth {q['peak_depth']})  "
+                f"wait mean {q['mean_wait']:.2f}s max {q['max_wait']:.2f}s"
+            )
+    return lines
@@ -1,75 +1,291 @@
+"""
+Barth Haas hop varieties overview
+
+The overview page (about 370 KB) lists every variety as a card,
+``div.col-12.col-lg-4.section-card-item``, whose ``data-*`` attributes carry
+the name, country, alpha/beta/oil ranges and the aroma profile
+(``data-filter-values``); the card's ``li`` items are the taste notes and its
+``a.section-card-link`` the variety page.
+
+``CardScanner`` reads only that.  It jumps from card to card with
+``str.find`` and tracks the ``div``/``li``/``a`` tags inside a card with one
+regular expression; attribute values are decoded like ``html.parser`` does
+(names lowercased, character references resolved) and ``li`` contents that
+hold markup go through ``html.parser``.  Tokenizing the whole page with
+``html.parser`` alone takes longer than this whole extraction, so markup
+outside the cards is never tokenized.  No tree is built, the buffer never
+holds more than one card, and each card becomes a ``HopEntry`` as soon as its
+closing tag arrives, so the page (or the saved ``bh.html``, see
+``parse_saved_page()``) can be fed in chunks.
+"""
+
 import json
 import os
-import requests as req
-from bs4 import BeautifulSoup
+import re
+from html import unescape
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional
 
+from .. import http, scheduler
 from ..models.hop_model import HopEntry, save_hop_entries
 
+URL = "https://www.barthhaas.com/hops-and-products/hop-varieties-overview"
+HTML_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "bh.html")
+
+CARD_CLASS = "col-12 col-lg-4 section-card-item"
+LINK_CLASS = "section-card-link"
+CHUNK_SIZE = 64 * 1024
+
+# A complete tag, with quoted attribute values that may contain ">"
+_ATTRS = r"""(?:"[^"]*"|'[^']*'|[^'">])*"""
+_TAG = re.compile(r"<(/?)([a-zA-Z][^\s/>]*)" + _ATTRS + ">")
+# The only tags a card is scanned for
+_CARD_TAG = re.compile(r"<(/?)(div|li|a)(?=[\s/>])" + _ATTRS + ">", re.IGNORECASE)
+# One attribute of a start tag (the name is followed by an optional value)
+_ATTR = re.compile(r"""([^\s/>=][^\s/>=]*)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?""")
+_TAG_NAME = re.compile(r"</?[^\s/>]*")
+
+# The character references of typical attribute values, resolved without a regex callback
+_COMMON_REFS = (("&quot;", '"'), ("&#39;", "'"), ("&lt;", "<"), ("&gt;", ">"), ("&amp;", "&"))
+
+
+def _unescape(value: str) -> str:
+    """html.unescape(), with a fast path for values that only use _COMMON_REFS."""
+    if "&" not in value:
+        return value
+    if value.count("&") != sum(value.count(ref) for ref, _ in _COMMON_REFS):
+        return unescape(value)
+    for ref, char in _COMMON_REFS:  # "&amp;" last, so "&amp;quot;" stays "&quot;"
+        value = value.replace(ref, char)
+    return value
+
+
+def tag_attrs(tag: str) -> Dict[str, str]:
+    """
+    The attributes of a start tag, as html.parser reports them: names
+    lowercased, values unquoted and unescaped, "" for valueless attributes
+    and the last value of a repeated attribute.
+    """
+    attrs = {}
+    for match in _ATTR.finditer(tag, _TAG_NAME.match(tag).end(), len(tag) - 1):
+        name, double, single, bare = match.groups()
+        value = double if double is not None else single if single is not None else bare or ""
+        attrs[name.lower()] = _unescape(value)
+    return attrs
+
+
+class _TextParser(HTMLParser):
+    """Collects the text of an HTML fragment (the contents of an ``li``)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._text: List[str] = []
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def text(self, fragment: str) -> str:
+        if "<" not in fragment and "&" not in fragment:
+            return fragment
+        self.reset()
+        self._text = []
+        self.feed(fragment)
+        self.close()
+        return "".join(self._text)
+
+
+class _Card:
+    """What is read from one card while it is being scanned."""
+
+    __slots__ = ("attrs", "notes", "open_notes", "href", "depth")
+
+    def __init__(self, attrs: Dict[str, str]):
+        self.attrs = attrs
+        self.notes: List[Optional[str]] = []
+        self.open_notes: List[tuple] = []  # (index in notes, offset of the li's content)
+        self.href: Optional[str] = None
+        self.depth = 1  # open divs, the card's own included
+
+
+class CardScanner:
+    """
+    Streaming extractor for the hop cards of the overview page.
+
+    ``feed()`` takes the page in chunks of any size and returns the entries of
+    the cards completed by that chunk; ``close()`` returns a card left open at
+    the end of the page.  Markup outside the cards is skipped without being
+    tokenized.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # scan position in the buffer
+        self._card: Optional[_Card] = None
+        self._text = _TextParser()
+
+    def feed(self, chunk: str) -> List[HopEntry]:
+        self._buffer += chunk
+        entries = []
+        while True:
+            if self._card is None:
+                if not self._find_card():
+                    break
+            entry = self._scan_card()
+            if entry is None:
+                break
+            entries.append(entry)
+        return entries
+
+    def close(self) -> List[HopEntry]:
+        entries = self.feed("")
+        if self._card is not None:
+            entries.append(self._finish_card(len(self._buffer)))
+        self._buffer, self._pos = "", 0
+        return entries
+
+    def _find_card(self) -> bool:
+        """Move to the content of the next card; False if more input is needed."""
+        buffer = self._buffer
+        while True:
+            found = buffer.find(CARD_CLASS, self._pos)
+            if found < 0:
+                # Only a tag cut off at the end of the chunk can still become a card
+                start = buffer.rfind("<", self._pos)
+                if start < 0 or _TAG.match(buffer, start) is not None:
+                    start = len(buffer)
+                self._buffer, self._pos = buffer[start:], 0
+                return False
+            start = buffer.rfind("<", self._pos, found)
+            tag = _TAG.match(buffer, start) if start >= 0 else None
+            if tag is None or tag.end() <= found:
+                if start >= 0 and tag is None and ">" not in buffer[found:]:
+                    # The tag may be cut off at the end of the chunk
+                    self._buffer, self._pos = buffer[start:], 0
+                    return False
+                self._pos = found + len(CARD_CLASS)  # text, not a class attribute
+                continue
+            self._pos = tag.end()
+            if tag.group(1) or tag.group(2).lower() != "div":
+                continue
+            attrs = tag_attrs(tag.group(0))
+            if attrs.get("class") != CARD_CLASS:
+                continue
+            # The card starts the buffer, so offsets recorded while scanning it stay valid
+            self._buffer, self._pos = buffer[self._pos:], 0
+            self._card = _Card(attrs)
+            if tag.group(0).endswith("/>"):
+                self._card.depth = 0
+            return True
+
+    def _scan_card(self) -> Optional[HopEntry]:
+        """Scan the current card; its entry once its closing tag is read, else None."""
+        card, buffer = self._card, self._buffer
+        if card.depth == 0:
+            return self._finish_card(self._pos)
+        for tag in _CARD_TAG.finditer(buffer, self._pos):
+            self._pos = tag.end()
+            closing, name = tag.group(1), tag.group(2).lower()
+            if name == "div":
+                if closing:
+                    card.depth -= 1
+                    if card.depth == 0:
+                        return self._finish_card(tag.start())
+                elif not tag.group(0).endswith("/>"):
+                    card.depth += 1
+            elif name == "li":
+                if closing:
+                    if card.open_notes:
+                        index, content = card.open_notes.pop()
+                        card.notes[index] = self._note(buffer[content:tag.start()])
+                else:
+                    card.open_notes.append((len(card.notes), tag.end()))
+                    card.notes.append(None)
+            elif not closing and card.href is None and LINK_CLASS in tag.group(0):
+                attrs = tag_attrs(tag.group(0))
+                if LINK_CLASS in attrs.get("class", "").split():
+                    card.href = attrs.get("href", "")
+        return None
+
+    def _note(self, fragment: str) -> str:
+        return self._text.text(fragment).strip()
+
+    def _finish_card(self, end: int) -> HopEntry:
+        card = self._card
+        for index, content in card.open_notes:
+            card.notes[index] = self._note(self._buffer[content:end])
+        self._card = None
+        return hop_entry(card.attrs, card.notes, card.href or "")
+
+
+def _aroma_data(attrs: Dict[str, str]) -> Dict[str, float]:
+    """The card's aroma profile from ``data-filter-values``, with the "raw" prefixes stripped."""
+    try:
+        filter_values = attrs.get("data-filter-values", "{}")
+        # Handle empty string case
+        if filter_values.strip() == "" or filter_values.strip() == '""':
+            aroma_data_raw = {}
+        else:
+            aroma_data_raw = json.loads(filter_values)
+
+        # Ensure aroma_data_raw is a dictionary
+        if isinstance(aroma_data_raw, dict):
+            return {key.strip("raw"): value for key, value in aroma_data_raw.items()}
+        print(f"Warning: data-filter-values is not a dict for hop {attrs.get('data-name', 'unknown')}: {type(aroma_data_raw)}")
+    except (json.JSONDecodeError, AttributeError, KeyError) as e:
+        print(f"Error parsing aroma data for hop {attrs.get('data-name', 'unknown')}: {e}")
+    return {}
+
+
+def hop_entry(attrs: Dict[str, str], notes: List[str], href: str) -> HopEntry:
+    """Build the HopEntry of one card from its attributes, taste notes and link."""
+    hop_entry = HopEntry(
+        name=attrs["data-name"],
+        country=attrs["data-country"],
+        source="Barth Haas",
+        href="https://www.barthhaas.com/" + href,
+        alpha_from=attrs["data-alpha-from"],
+        alpha_to=attrs["data-alpha-to"],
+        beta_from=attrs["data-beta-from"],
+        beta_to=attrs["data-beta-to"],
+        oil_from=attrs["data-oil-from"],
+        oil_to=attrs["data-oil-to"],
+        co_h_from="",  # Not available in Barth Haas data
+        co_h_to="",
+        notes=notes
+    )
+
+    # Set standardized aromas from structured aroma data
+    hop_entry.set_standardized_aromas("barth", _aroma_data(attrs))
+    return hop_entry
+
+
+def iter_hop_entries(chunks: Iterable[str]) -> Iterator[HopEntry]:
+    """Yield one HopEntry per card of the overview page, given as chunks of text."""
+    scanner = CardScanner()
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.close()
+
+
+def parse_page(html: str) -> List[HopEntry]:
+    """The entries of an overview page held in memory."""
+    return list(iter_hop_entries([html]))
+
+
+def parse_saved_page(path: str = HTML_PATH) -> List[HopEntry]:
+    """The entries of a saved overview page (``data/bh.html`` by default), read in chunks."""
+    with open(path) as file:
+        return list(iter_hop_entries(iter(lambda: file.read(CHUNK_SIZE), "")))
+
 
 def scrape(save=True):
-    url = "https://www.barthhaas.com/hops-and-products/hop-varieties-overview"
-    r = req.get(url)
+    r = http.get(URL, priority=scheduler.LISTING)
     html = r.text
     # Perform the request and export the file
-    html_path = os.path.join(os.path.dirname(__file__), "..", "data", "bh.html")
-    with open(html_path, "w") as file:
+    with open(HTML_PATH, "w") as file:
         file.write(html)
 
-    soup = BeautifulSoup(html, "html.parser")
-    hop_info = soup.find_all("div", class_="col-12 col-lg-4 section-card-item")
-    hop_entries = []
-    # aromas
-    for hop in hop_info:
-        # hop_cards = hop.find_all('div', class_='section-card card-content-height')
-        # hop_aromas = hop.find('ul', class_='section-card-text__tastes')
-        hop_flavour_notes = [aroma.text.strip() for aroma in hop.find_all("li")]
-        # hop Data
-        href = hop.find('a', {'class': 'section-card-link'})
-        href = href['href'] if href is not None else ""
-        
-        # Extract aroma data with error handling
-        try:
-            filter_values = hop.attrs.get("data-filter-values", "{}")
-            if isinstance(filter_values, str):
-                # Handle empty string case
-                if filter_values.strip() == "" or filter_values.strip() == '""':
-                    aroma_data_raw = {}
-                else:
-                    aroma_data_raw = json.loads(filter_values)
-            else:
-                aroma_data_raw = filter_values
-            
-            # Ensure aroma_data_raw is a dictionary
-            if isinstance(aroma_data_raw, dict):
-                aroma_data = {key.strip("raw"): value for key, value in aroma_data_raw.items()}
-            else:
-                print(f"Warning: data-filter-values is not a dict for hop {hop.attrs.get('data-name', 'unknown')}: {type(aroma_data_raw)}")
-                aroma_data = {}
-        except (json.JSONDecodeError, AttributeError, KeyError) as e:
-            print(f"Error parsing aroma data for hop {hop.attrs.get('data-name', 'unknown')}: {e}")
-            aroma_data = {}
-        
-        # Create HopEntry directly
-        hop_entry = HopEntry(
-            name=hop.attrs["data-name"],
-            country=hop.attrs["data-country"],
-            source="Barth Haas",
-            href="https://www.barthhaas.com/" + href,
-            alpha_from=hop.attrs["data-alpha-from"],
-            alpha_to=hop.attrs["data-alpha-to"],
-            beta_from=hop.attrs["data-beta-from"],
-            beta_to=hop.attrs["data-beta-to"],
-            oil_from=hop.attrs["data-oil-from"],
-            oil_to=hop.attrs["data-oil-to"],
-            co_h_from="",  # Not available in Barth Haas data
-            co_h_to="",
-            notes=hop_flavour_notes
-        )
-        
-        # Set standardized aromas from structured aroma data
-        hop_entry.set_standardized_aromas("barth", aroma_data)
-        hop_entries.append(hop_entry)
-    
+    hop_entries = parse_page(html)
 
     # Save using the new model's save function
     if save:
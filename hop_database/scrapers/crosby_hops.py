@@ -1,18 +1,22 @@
 # your_project_folder/scrapers/crosby_hops.py
 
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 import json
 import re
-import concurrent.futures
 from typing import List, Optional, Tuple
 
+from .. import aio, http, scheduler, state
 # Assumes hop_model is in a sibling 'models' directory
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..utils.html import make_soup, only
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+CATALOG_URL = "https://www.crosbyhops.com/shop-hops/hop-catalog/"
+MAX_CONCURRENCY = 10  # initial concurrent requests to crosbyhops.com (adapted by throttle)
+# Bump when the entries parsed from unchanged pages change, so the state store re-parses them
+PARSER_VERSION = 1
+
+http.configure_host(CATALOG_URL, pool_size=MAX_CONCURRENCY)
 
 def parse_range(text: str) -> tuple[str, str]:
     """Parses a string like '14 - 16 %' into from/to values."""
@@ -54,36 +58,49 @@ def process_name_and_country(name: str) -> Tuple[str, str]:
     return cleaned_name.strip(), country
 
 
+def parse_hop_links(content: bytes) -> List[str]:
+    """Finds the URLs for all individual hop pages on the main catalog page."""
+    soup = make_soup(content, parse_only=only('a', class_='result-item'))
+    link_tags = soup.find_all('a', class_='result-item')
+    hop_links = set()
+    for link_tag in link_tags:
+        href = link_tag.get('href')
+        if href and 'hop-catalog' in href:
+            hop_links.add(href)
+    print(f"Found {len(hop_links)} unique hop links.")
+    return list(hop_links)
+
+
 def get_hop_links(catalog_url):
     """
     Scrapes the main catalog page to find the URLs for all individual hop pages.
     """
     print("Fetching hop links from the main catalog...")
     try:
-        # Use the header in the request
-        response = requests.get(catalog_url, headers=HEADERS)
+        response = http.get(catalog_url, priority=scheduler.LISTING)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        link_tags = soup.find_all('a', class_='result-item')
-        hop_links = set()
-        for link_tag in link_tags:
-            href = link_tag.get('href')
-            if href and 'hop-catalog' in href:
-                hop_links.add(href)
-        print(f"Found {len(hop_links)} unique hop links.")
-        return list(hop_links)
-
     except requests.exceptions.RequestException as e:
         print(f"Error fetching catalog URL: {e}")
         return []
+    return parse_hop_links(response.content)
 
 
-def process_hop_page(hop_url: str) -> Optional[HopEntry]:
-    """Fetches and processes a single hop page, returning a HopEntry object."""
+async def get_hop_links_async(fetcher: aio.AsyncFetcher, catalog_url: str) -> List[str]:
+    """Coroutine variant of get_hop_links()."""
+    print("Fetching hop links from the main catalog...")
     try:
-        response = requests.get(hop_url, headers=HEADERS)
+        response = await fetcher.get(catalog_url, priority=scheduler.LISTING)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching catalog URL: {e}")
+        return []
+    return parse_hop_links(response.content)
+
+
+def parse_hop_page(content: bytes, hop_url: str) -> Optional[HopEntry]:
+    """Parses a fetched hop page, returning a HopEntry object."""
+    try:
+        soup = make_soup(content)
 
         # --- Scrape Raw Data ---
         raw_data = {}
@@ -175,24 +192,68 @@ def process_hop_page(hop_url: str) -> Optional[HopEntry]:
         print(f"--- Error processing {hop_url}: {e} ---")
         return None
 
-def scrape(save=False):
-    """Main function to orchestrate the scraping process."""
-    base_url = "https://www.crosbyhops.com/shop-hops/hop-catalog/"
-    hop_links = get_hop_links(base_url)
-    
+def _entry_for_page(hop_url: str, content: bytes) -> Optional[HopEntry]:
+    """Parse a fetched hop page, reusing the stored entry if the page is unchanged."""
+    previous = state.lookup(hop_url, content, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    return state.remember(
+        hop_url, "Crosby Hops", (content,), parse_hop_page(content, hop_url), parser_version=PARSER_VERSION
+    )
+
+
+async def _entry_for_page_async(hop_url: str, content: bytes) -> Optional[HopEntry]:
+    """Coroutine variant of _entry_for_page(); the state store is used off the event loop."""
+    previous = await state.lookup_async(hop_url, content, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    return await state.remember_async(
+        hop_url, "Crosby Hops", (content,), parse_hop_page(content, hop_url), parser_version=PARSER_VERSION
+    )
+
+
+def process_hop_page(hop_url: str) -> Optional[HopEntry]:
+    """Fetches and processes a single hop page, returning a HopEntry object."""
+    try:
+        response = http.get(hop_url)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"--- Error processing {hop_url}: {e} ---")
+        return None
+    return _entry_for_page(hop_url, response.content)
+
+
+async def process_hop_page_async(fetcher: aio.AsyncFetcher, hop_url: str) -> Optional[HopEntry]:
+    """Coroutine variant of process_hop_page()."""
+    try:
+        response = await fetcher.get(hop_url)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"--- Error processing {hop_url}: {e} ---")
+        return None
+    return await _entry_for_page_async(hop_url, response.content)
+
+
+async def scrape_async(fetcher: aio.AsyncFetcher) -> List[HopEntry]:
+    """Fetches the catalog, then every hop page concurrently on one event loop."""
+    hop_links = await get_hop_links_async(fetcher, CATALOG_URL)
+
     if not hop_links:
         print("No hop links found. Exiting.")
         return []
 
-    hop_entries = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_hop = {executor.submit(process_hop_page, link): link for link in hop_links}
-        for future in concurrent.futures.as_completed(future_to_hop):
-            result = future.result()
-            if result:
-                hop_entries.append(result)
+    results = await asyncio.gather(
+        *(process_hop_page_async(fetcher, link) for link in hop_links)
+    )
+    hop_entries = [result for result in results if result]
 
     print(f"\nSuccessfully scraped {len(hop_entries)} of {len(hop_links)} hops.")
+    return hop_entries
+
+
+def scrape(save=False):
+    """Main function to orchestrate the scraping process."""
+    hop_entries = aio.run(scrape_async)
 
     if save:
         output_file = "data/crosbyhops.json"
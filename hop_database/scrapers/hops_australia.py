@@ -4,40 +4,52 @@
 Scraper for Hop Products Australia (hops.com.au)
 
 Extracts hop data from the main listing page, individual hop pages,
-and PDF technical data sheets (for sensory analysis).
+and PDF technical data sheets (for sensory analysis).  Spec sheets that are
+linked from neither the listing nor the hop page are found in an index of
+the site's WordPress media library, built once per run.
 """
 
-import concurrent.futures
-import io
+import asyncio
 import re
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import requests
 from bs4 import BeautifulSoup
 
+from .. import aio, http, scheduler, state
+from ..cache import cached_pdf_parser
+from ..download import Download, SpooledBody
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..pagination import paginate
+from ..utils.html import make_soup
+from ..utils.pdf import PdfDocument, open_pdf, pdfplumber_available, run_parser, run_parser_async
 
 BASE_URL = "https://www.hops.com.au"
 HOPS_LISTING_URL = "https://www.hops.com.au/hops/"
 
 PAGE_TIMEOUT = 90   # seconds — site is slow
-PDF_TIMEOUT = 120   # seconds — PDFs can be large
+PDF_STALL_TIMEOUT = 30            # seconds without data before a PDF download is abandoned
+PDF_DEADLINE = 90                 # seconds allowed for a whole PDF download
+PDF_MAX_BYTES = 25 * 1024 * 1024  # spec sheets are well under this
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/91.0.4472.124 Safari/537.36"
-    )
-}
+MAX_CONCURRENCY = 5  # initial concurrent requests to hops.com.au (adapted by throttle)
+WP_MEDIA_PAGE_SIZE = 100  # WordPress REST API maximum per_page
+# Bump when the entries parsed from unchanged pages change, so the state store re-parses them
+PARSER_VERSION = 1
 
+http.configure_host(BASE_URL, pool_size=MAX_CONCURRENCY, timeout=PAGE_TIMEOUT)
 
-def _get_with_retry(url: str, timeout: int = PAGE_TIMEOUT, retries: int = 3) -> requests.Response:
-    """GET request with simple retry + backoff for slow/flaky servers."""
+
+T = TypeVar("T", requests.Response, Download)
+
+
+def _retry_on_timeout(fetch: Callable[[], T], url: str, retries: int = 3) -> T:
+    """Call ``fetch()`` and raise_for_status(), with simple retry + backoff on timeouts."""
     for attempt in range(retries):
         try:
-            response = requests.get(url, headers=HEADERS, timeout=timeout)
+            response = fetch()
             response.raise_for_status()
             return response
         except requests.exceptions.Timeout:
@@ -52,6 +64,67 @@ def _get_with_retry(url: str, timeout: int = PAGE_TIMEOUT, retries: int = 3) ->
     raise RuntimeError(f"Failed to fetch {url} after {retries} attempts")
 
 
+async def _retry_on_timeout_async(
+    fetch: Callable[[], Awaitable[T]], url: str, retries: int = 3
+) -> T:
+    """Coroutine variant of _retry_on_timeout()."""
+    for attempt in range(retries):
+        try:
+            response = await fetch()
+            response.raise_for_status()
+            return response
+        except requests.exceptions.Timeout:
+            if attempt < retries - 1:
+                wait = 2 ** attempt  # 1s, 2s, 4s
+                print(f"  Timeout fetching {url}, retrying in {wait}s ({attempt+1}/{retries})...")
+                await asyncio.sleep(wait)
+            else:
+                raise
+    raise RuntimeError(f"Failed to fetch {url} after {retries} attempts")
+
+
+def _get_with_retry(
+    url: str, timeout: int = PAGE_TIMEOUT, retries: int = 3, priority: int = scheduler.PAGE
+) -> requests.Response:
+    """GET request with simple retry + backoff for slow/flaky servers."""
+    return _retry_on_timeout(lambda: http.get(url, timeout=timeout, priority=priority), url, retries)
+
+
+async def _get_with_retry_async(
+    fetcher: aio.AsyncFetcher,
+    url: str,
+    timeout: int = PAGE_TIMEOUT,
+    retries: int = 3,
+    priority: int = scheduler.PAGE,
+) -> requests.Response:
+    """Coroutine variant of _get_with_retry()."""
+    return await _retry_on_timeout_async(
+        lambda: fetcher.get(url, timeout=timeout, priority=priority), url, retries
+    )
+
+
+def _download_pdf(pdf_url: str) -> SpooledBody:
+    """Stream a spec sheet into a spooled body, retrying stalled downloads."""
+    download = _retry_on_timeout(
+        lambda: http.download(
+            pdf_url, max_bytes=PDF_MAX_BYTES, stall_timeout=PDF_STALL_TIMEOUT, deadline=PDF_DEADLINE
+        ),
+        pdf_url,
+    )
+    return download.body
+
+
+async def _download_pdf_async(fetcher: aio.AsyncFetcher, pdf_url: str) -> SpooledBody:
+    """Coroutine variant of _download_pdf()."""
+    download = await _retry_on_timeout_async(
+        lambda: fetcher.download(
+            pdf_url, max_bytes=PDF_MAX_BYTES, stall_timeout=PDF_STALL_TIMEOUT, deadline=PDF_DEADLINE
+        ),
+        pdf_url,
+    )
+    return download.body
+
+
 def _normalize_hop_url(href: str) -> str:
     """Normalize a hops.com.au URL to use www and trailing slash."""
     href = href.rstrip("/")
@@ -64,6 +137,16 @@ def _is_on_domain(href: str) -> bool:
     return bool(re.match(r"^https?://(?:www\.)?hops\.com\.au/", href, re.I))
 
 
+def _pdf_matching_slug(hop_slug: str, pdf_urls: List[str]) -> Optional[str]:
+    """First PDF whose file name contains the hop slug (ignoring dashes, spaces and case)."""
+    slug_norm = re.sub(r"[-\s]", "", hop_slug).lower()
+    for pdf in pdf_urls:
+        pdf_filename = re.sub(r"[-\s_]", "", pdf.rsplit("/", 1)[-1]).lower()
+        if slug_norm in pdf_filename:
+            return pdf
+    return None
+
+
 def collect_listing_links(listing_url: str = HOPS_LISTING_URL) -> Dict[str, Optional[str]]:
     """
     Fetch the hop listing page and return a {hop_url: pdf_url_or_None} mapping.
@@ -81,12 +164,12 @@ def collect_listing_links(listing_url: str = HOPS_LISTING_URL) -> Dict[str, Opti
 
     print(f"Fetching hop listing from {listing_url} ...")
     try:
-        response = _get_with_retry(listing_url, timeout=PAGE_TIMEOUT)
+        response = _get_with_retry(listing_url, timeout=PAGE_TIMEOUT, priority=scheduler.LISTING)
     except requests.exceptions.RequestException as exc:
         print(f"Error fetching listing page: {exc}")
         return {}
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = make_soup(response.content)
 
     def _abs(href: str) -> str:
         href = re.sub(r"^https?://hops\.com\.au", BASE_URL, href, flags=re.I)
@@ -132,7 +215,7 @@ def collect_listing_links(listing_url: str = HOPS_LISTING_URL) -> Dict[str, Opti
     if not result:
         try:
             api_url = BASE_URL + "/wp-json/wp/v2/posts?per_page=100&_fields=link"
-            api_resp = requests.get(api_url, headers=HEADERS, timeout=PAGE_TIMEOUT)
+            api_resp = http.get(api_url, timeout=PAGE_TIMEOUT)
             if api_resp.status_code == 200:
                 hop_slug_re = re.compile(r"/hops/[^/]+/?$", re.I)
                 for post in api_resp.json():
@@ -175,12 +258,9 @@ def collect_listing_links(listing_url: str = HOPS_LISTING_URL) -> Dict[str, Opti
             if existing_pdf:
                 continue
             slug = hop_url.rstrip("/").rsplit("/", 1)[-1]
-            slug_norm = re.sub(r"[-\s]", "", slug).lower()
-            for pdf in all_pdfs:
-                pdf_filename = re.sub(r"[-\s_]", "", pdf.rsplit("/", 1)[-1]).lower()
-                if slug_norm in pdf_filename:
-                    result[hop_url] = pdf
-                    break
+            pdf = _pdf_matching_slug(slug, all_pdfs)
+            if pdf:
+                result[hop_url] = pdf
 
     n_with_pdf = sum(1 for v in result.values() if v)
     print(f"Found {len(result)} hop links ({n_with_pdf} with PDFs from listing page).")
@@ -272,24 +352,87 @@ def parse_range(text: str) -> Tuple[str, str]:
     return "", ""
 
 
-def _find_pdf_via_wp_api(hop_slug: str) -> Optional[str]:
-    """Query the WordPress REST API for PDF attachments matching the hop slug.
-    Used as a fallback when the hop page doesn't link its spec sheet directly."""
+class MediaIndex:
+    """Spec-sheet PDFs of the WordPress media library, matched to hop slugs in memory."""
+
     _EXCLUDE = re.compile(r"/legal/|privacy|policy|terms|disclaimer", re.I)
+
+    def __init__(self, source_urls: List[str]):
+        self.pdf_urls = [
+            url for url in source_urls
+            if url.lower().endswith(".pdf") and not self._EXCLUDE.search(url)
+        ]
+
+    def find(self, hop_slug: str) -> Optional[str]:
+        """The spec sheet for ``hop_slug``, by the listing page's slug matching rules."""
+        return _pdf_matching_slug(hop_slug, self.pdf_urls)
+
+    def __len__(self) -> int:
+        return len(self.pdf_urls)
+
+
+def _wp_media_page_url(page: int) -> str:
+    return (
+        f"{BASE_URL}/wp-json/wp/v2/media"
+        f"?mime_type=application/pdf&per_page={WP_MEDIA_PAGE_SIZE}&page={page}&_fields=source_url"
+    )
+
+
+def _media_source_urls(resp: requests.Response) -> List[str]:
+    return [item.get("source_url", "") for item in resp.json()]
+
+
+def _media_page_count(resp: requests.Response, items: List[str]) -> Optional[int]:
+    total_pages = resp.headers.get("X-WP-TotalPages", "")
+    return int(total_pages) if total_pages.isdigit() else None
+
+
+async def build_media_index_async(fetcher: aio.AsyncFetcher) -> Optional[MediaIndex]:
+    """
+    Index every PDF in the site's media library (newest first), fetching the
+    REST API pages concurrently.  Returns None if the API is unavailable.
+    """
+    pages: Dict[int, List[str]] = {}
     try:
-        api_url = (
-            f"{BASE_URL}/wp-json/wp/v2/media"
-            f"?search={hop_slug}&mime_type=application/pdf&per_page=10"
-        )
-        resp = requests.get(api_url, headers=HEADERS, timeout=PAGE_TIMEOUT)
-        if resp.status_code == 200:
-            for item in resp.json():
-                url = item.get("source_url", "")
-                if url.lower().endswith(".pdf") and not _EXCLUDE.search(url):
-                    return url
-    except Exception:
-        pass
-    return None
+        # WordPress rejects page numbers past the end, so only the reported pages are fetched
+        async for number, urls in paginate(
+            fetcher,
+            _wp_media_page_url,
+            _media_source_urls,
+            WP_MEDIA_PAGE_SIZE,
+            count_pages=_media_page_count,
+            window=0,
+            timeout=PAGE_TIMEOUT,
+        ):
+            pages[number] = urls
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        print(f"  Warning: could not index WordPress media: {exc}")
+        return None
+    index = MediaIndex([url for number in sorted(pages) for url in pages[number]])
+    print(f"Indexed {len(index)} PDFs from the WordPress media library ({len(pages)} pages)")
+    return index
+
+
+def build_media_index() -> Optional[MediaIndex]:
+    """Synchronous wrapper around build_media_index_async()."""
+    return aio.run(build_media_index_async)
+
+
+_shared_media_index: Optional[MediaIndex] = None
+_shared_media_index_lock = threading.Lock()
+
+
+def shared_media_index() -> Optional[MediaIndex]:
+    """
+    The media index of process_hop_page() callers that pass none, built by
+    build_media_index() on first use and kept for the process.  A failed
+    build returns None and is tried again on the next call.
+    """
+    global _shared_media_index
+    with _shared_media_index_lock:
+        if _shared_media_index is None:
+            _shared_media_index = build_media_index()
+        return _shared_media_index
 
 
 def find_pdf_url(soup: BeautifulSoup, page_url: str) -> Optional[str]:
@@ -322,88 +465,89 @@ def find_pdf_url(soup: BeautifulSoup, page_url: str) -> Optional[str]:
     return preferred[0] if preferred else (candidates[0] if candidates else None)
 
 
-def parse_pdf_sensory(pdf_content: bytes) -> Dict[str, float]:
+def sensory_from_document(doc: PdfDocument) -> Dict[str, float]:
     """
-    Extract sensory/aroma intensity values from an HPA PDF technical data sheet.
+    Extract sensory/aroma intensity values from an extracted HPA technical data sheet.
 
     HPA PDFs include a "Beer sensory" radar chart and analytical data.
-    Tries multiple extraction strategies using pdfplumber.
+    Tries multiple extraction strategies on the page tables, text and words.
     """
     sensory: Dict[str, float] = {}
 
-    try:
-        import pdfplumber
-    except ImportError:
+    for page in doc.pages:
+        # Strategy 1: Try table extraction
+        for table in page.tables:
+            for row in (table or []):
+                if not row:
+                    continue
+                cells = [str(c).strip() if c else "" for c in row]
+                if len(cells) >= 2:
+                    label = cells[0]
+                    score_str = cells[-1]
+                    mapped = _map_sensory_label(label)
+                    if mapped:
+                        score = _parse_score(score_str)
+                        if score is not None:
+                            sensory[mapped] = max(sensory.get(mapped, 0.0), score)
+
+        # Strategy 2: Extract text and parse labeled sections
+        lines = page.text.splitlines()
+        in_sensory = False
+        for line in lines:
+            if re.search(r"beer\s+sensory|sensory\s+anal", line, re.I):
+                in_sensory = True
+                continue
+            if in_sensory and re.search(
+                r"(oil\s+compos|usage|brewing\s+val|storage|analytical|raw\s+hop)", line, re.I
+            ):
+                in_sensory = False
+                continue
+
+            if not in_sensory:
+                continue
+
+            # Match "LabelName   5" or "Label Name: 5" or "LabelName 5.5"
+            match = re.match(
+                r"^([A-Za-z][A-Za-z\s/&]+?)\s{2,}(\d+(?:\.\d+)?)\s*$", line
+            )
+            if not match:
+                match = re.match(
+                    r"^([A-Za-z][A-Za-z\s/&]+?)\s*[:\-–]\s*(\d+(?:\.\d+)?)\s*$",
+                    line,
+                )
+            if match:
+                label = match.group(1).strip()
+                score_str = match.group(2).strip()
+                mapped = _map_sensory_label(label)
+                if mapped:
+                    score = _parse_score(score_str)
+                    if score is not None:
+                        sensory[mapped] = max(sensory.get(mapped, 0.0), score)
+
+        # Strategy 3: correlate labels near numeric values using the word
+        # bounding boxes (for charts where values appear near labels)
+        if not sensory:
+            try:
+                _extract_sensory_from_words(page.words, sensory)
+            except Exception:
+                pass
+
+    return sensory
+
+
+@cached_pdf_parser("hpa-sensory", version=1)
+def parse_pdf_sensory(pdf_content: bytes) -> Dict[str, float]:
+    """Extract sensory/aroma intensity values from an HPA PDF technical data sheet."""
+    if not pdfplumber_available():
         print("  Warning: pdfplumber not installed — skipping PDF sensory extraction.")
-        return sensory
+        return {}
 
     try:
-        with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-            for page in pdf.pages:
-                # Strategy 1: Try table extraction
-                tables = page.extract_tables() or []
-                for table in tables:
-                    for row in (table or []):
-                        if not row:
-                            continue
-                        cells = [str(c).strip() if c else "" for c in row]
-                        if len(cells) >= 2:
-                            label = cells[0]
-                            score_str = cells[-1]
-                            mapped = _map_sensory_label(label)
-                            if mapped:
-                                score = _parse_score(score_str)
-                                if score is not None:
-                                    sensory[mapped] = max(sensory.get(mapped, 0.0), score)
-
-                # Strategy 2: Extract text and parse labeled sections
-                text = page.extract_text() or ""
-                lines = text.splitlines()
-                in_sensory = False
-                for line in lines:
-                    if re.search(r"beer\s+sensory|sensory\s+anal", line, re.I):
-                        in_sensory = True
-                        continue
-                    if in_sensory and re.search(
-                        r"(oil\s+compos|usage|brewing\s+val|storage|analytical|raw\s+hop)", line, re.I
-                    ):
-                        in_sensory = False
-                        continue
-
-                    if not in_sensory:
-                        continue
-
-                    # Match "LabelName   5" or "Label Name: 5" or "LabelName 5.5"
-                    match = re.match(
-                        r"^([A-Za-z][A-Za-z\s/&]+?)\s{2,}(\d+(?:\.\d+)?)\s*$", line
-                    )
-                    if not match:
-                        match = re.match(
-                            r"^([A-Za-z][A-Za-z\s/&]+?)\s*[:\-–]\s*(\d+(?:\.\d+)?)\s*$",
-                            line,
-                        )
-                    if match:
-                        label = match.group(1).strip()
-                        score_str = match.group(2).strip()
-                        mapped = _map_sensory_label(label)
-                        if mapped:
-                            score = _parse_score(score_str)
-                            if score is not None:
-                                sensory[mapped] = max(sensory.get(mapped, 0.0), score)
-
-                # Strategy 3: Try extracting words with bounding boxes to correlate
-                # labels near numeric values (for charts where values appear near labels)
-                if not sensory:
-                    try:
-                        words = page.extract_words(x_tolerance=5, y_tolerance=5)
-                        _extract_sensory_from_words(words, sensory)
-                    except Exception:
-                        pass
-
+        with open_pdf(pdf_content) as doc:
+            return sensory_from_document(doc)
     except Exception as exc:
         print(f"  Warning: could not parse PDF for sensory data: {exc}")
-
-    return sensory
+        return {}
 
 
 def _extract_sensory_from_words(words: list, sensory: Dict[str, float]) -> None:
@@ -435,9 +579,13 @@ def _extract_sensory_from_words(words: list, sensory: Dict[str, float]) -> None:
                     sensory[mapped] = max(sensory.get(mapped, 0.0), score)
 
 
-def parse_pdf_brewing_values(pdf_content: bytes) -> Dict[str, str]:
+_RANGE = r"\d+(?:\.\d+)?\s*[-–—]\s*\d+(?:\.\d+)?"
+
+
+def brewing_values_from_document(doc: PdfDocument) -> Dict[str, str]:
     """
-    Extract analytical brewing values (alpha, beta, cohumulone, oil) from an HPA PDF.
+    Extract analytical brewing values (alpha, beta, cohumulone, oil) from an
+    extracted HPA PDF.
 
     Two strategies:
     1. Table extraction — handles PDFs where data is in tables (pdfplumber rows)
@@ -451,55 +599,79 @@ def parse_pdf_brewing_values(pdf_content: bytes) -> Dict[str, str]:
     """
     values: Dict[str, str] = {}
 
-    try:
-        import pdfplumber
-    except ImportError:
-        return values
+    for page in doc.pages:
+        # Strategy 1: table extraction
+        for table in page.tables:
+            for row in table:
+                if not row or len(row) < 2:
+                    continue
+                label = (row[0] or "").strip().lower()
+                # Combine remaining cells for the value
+                value = " ".join(str(c) for c in row[1:] if c).strip()
+                if not value or not re.search(_RANGE, value):
+                    continue
+                if re.search(r"\balpha\b", label) and "co" not in label:
+                    values.setdefault("alpha", value)
+                elif re.search(r"\bbeta\b", label):
+                    values.setdefault("beta", value)
+                elif re.search(r"co-?h|cohumulone", label):
+                    values.setdefault("cohumulone", value)
+                elif re.search(r"\boil\b", label):
+                    values.setdefault("oil", value)
+
+        # Strategy 2: text pattern matching
+        for pattern, key in [
+            # Alpha: plain "Alpha", "Alpha acids", "Alpha Acid %", "Total alpha"
+            (r"(?:Total\s+)?[Aa]lpha(?:\s+[Aa]cids?\s*%?)?\s+(" + _RANGE + r")", "alpha"),
+            # Beta: plain "Beta", "Beta acids"
+            (r"[Bb]eta(?:\s+[Aa]cids?)?\s+(" + _RANGE + r")", "beta"),
+            # Cohumulone / Co-H
+            (r"[Cc]o-?h(?:umulone)?\s+(" + _RANGE + r")", "cohumulone"),
+            # Total oil / Oil content
+            (r"(?:[Tt]otal\s+)?[Oo]il(?:\s+[Cc]ontent)?\s+(" + _RANGE + r")", "oil"),
+        ]:
+            m = re.search(pattern, page.text)
+            if m and key not in values:
+                values[key] = m.group(1).strip()
 
-    _RANGE = r"\d+(?:\.\d+)?\s*[-–—]\s*\d+(?:\.\d+)?"
+    return values
 
-    try:
-        with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-            for page in pdf.pages:
-                # Strategy 1: table extraction
-                for table in (page.extract_tables() or []):
-                    for row in table:
-                        if not row or len(row) < 2:
-                            continue
-                        label = (row[0] or "").strip().lower()
-                        # Combine remaining cells for the value
-                        value = " ".join(str(c) for c in row[1:] if c).strip()
-                        if not value or not re.search(_RANGE, value):
-                            continue
-                        if re.search(r"\balpha\b", label) and "co" not in label:
-                            values.setdefault("alpha", value)
-                        elif re.search(r"\bbeta\b", label):
-                            values.setdefault("beta", value)
-                        elif re.search(r"co-?h|cohumulone", label):
-                            values.setdefault("cohumulone", value)
-                        elif re.search(r"\boil\b", label):
-                            values.setdefault("oil", value)
-
-                # Strategy 2: text pattern matching
-                text = page.extract_text() or ""
-                for pattern, key in [
-                    # Alpha: plain "Alpha", "Alpha acids", "Alpha Acid %", "Total alpha"
-                    (r"(?:Total\s+)?[Aa]lpha(?:\s+[Aa]cids?\s*%?)?\s+(" + _RANGE + r")", "alpha"),
-                    # Beta: plain "Beta", "Beta acids"
-                    (r"[Bb]eta(?:\s+[Aa]cids?)?\s+(" + _RANGE + r")", "beta"),
-                    # Cohumulone / Co-H
-                    (r"[Cc]o-?h(?:umulone)?\s+(" + _RANGE + r")", "cohumulone"),
-                    # Total oil / Oil content
-                    (r"(?:[Tt]otal\s+)?[Oo]il(?:\s+[Cc]ontent)?\s+(" + _RANGE + r")", "oil"),
-                ]:
-                    m = re.search(pattern, text)
-                    if m and key not in values:
-                        values[key] = m.group(1).strip()
 
+@cached_pdf_parser("hpa-brewing-values", version=1)
+def parse_pdf_brewing_values(pdf_content: bytes) -> Dict[str, str]:
+    """Extract analytical brewing values (alpha, beta, cohumulone, oil) from an HPA PDF."""
+    if not pdfplumber_available():
+        return {}
+
+    try:
+        with open_pdf(pdf_content) as doc:
+            return brewing_values_from_document(doc)
     except Exception as exc:
         print(f"  Warning: could not parse PDF for brewing values: {exc}")
+        return {}
 
-    return values
+
+@cached_pdf_parser("hpa-spec-sheet", version=1)
+def parse_pdf_spec_sheet(pdf_content: bytes) -> Dict[str, Dict]:
+    """
+    Extract brewing values and sensory scores from an HPA PDF in one pass.
+
+    Returns {"brewing_values": ..., "sensory": ...} as produced by
+    parse_pdf_brewing_values() and parse_pdf_sensory(), from a single
+    extraction of the document.
+    """
+    result: Dict[str, Dict] = {"brewing_values": {}, "sensory": {}}
+    if not pdfplumber_available():
+        print("  Warning: pdfplumber not installed — skipping PDF sensory extraction.")
+        return result
+
+    try:
+        with open_pdf(pdf_content) as doc:
+            result["brewing_values"] = brewing_values_from_document(doc)
+            result["sensory"] = sensory_from_document(doc)
+    except Exception as exc:
+        print(f"  Warning: could not parse PDF: {exc}")
+    return result
 
 
 # HPA sensory category names that appear in their PDFs → AROMA_MAPPINGS keys
@@ -582,13 +754,97 @@ def parse_aroma_notes(soup: BeautifulSoup) -> List[str]:
     return [n.lower() for n in notes if n]
 
 
-def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optional[HopEntry]:
+def _parse_hop_html(hop_url: str, content: bytes) -> Tuple[BeautifulSoup, Dict, Dict[str, str]]:
+    """Parse a hop page into (soup, HopEntry fields found in the HTML, raw brewing values)."""
+    soup = make_soup(content)
+    hop_slug = hop_url.rstrip("/").rsplit("/", 1)[-1]
+
+    # Name from <h1>, fallback to slug
+    h1 = soup.find("h1")
+    fields: Dict = {"name": h1.get_text(strip=True) if h1 else hop_slug.replace("-", " ").title()}
+
+    # Brewing values from HTML (tables / definition lists / inline text)
+    bv = parse_brewing_values(soup)
+    fields["alpha_from"], fields["alpha_to"] = parse_range(bv.get("alpha", ""))
+    fields["beta_from"], fields["beta_to"] = parse_range(bv.get("beta", ""))
+    fields["co_h_from"], fields["co_h_to"] = parse_range(bv.get("cohumulone", ""))
+    fields["oil_from"], fields["oil_to"] = parse_range(bv.get("oil", ""))
+
+    fields["description"] = parse_description(soup)
+    fields["notes"] = parse_aroma_notes(soup)
+    return soup, fields, bv
+
+
+def _page_pdf_url(
+    soup: BeautifulSoup, hop_url: str, known_pdf_url: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """PDF discovery without the network: listing-page URL first, then page link.
+
+    Returns (pdf_url, pdf_source)."""
+    if known_pdf_url:
+        return known_pdf_url, "listing"
+    pdf_url = find_pdf_url(soup, hop_url)
+    return pdf_url, ("page-link" if pdf_url else None)
+
+
+def _state_bodies(page_html: bytes, known_pdf_url: Optional[str], media_pdf_url: Optional[str]) -> tuple:
+    """
+    What a hop entry is parsed from, as state store bodies: the page, the
+    listing's PDF link and the media library's PDF for the hop (a spec sheet
+    uploaded or replaced there changes the key).
+    """
+    return page_html, (known_pdf_url or "").encode(), (media_pdf_url or "").encode()
+
+
+def _apply_pdf_brewing_values(fields: Dict, pdf_bv: Dict[str, str], hop_slug: str) -> None:
+    """Override HTML brewing values with those parsed from the PDF spec sheet."""
+    print(f"  [DBG] {hop_slug}: pdf_bv={pdf_bv!r}")
+    if pdf_bv.get("alpha"):
+        fields["alpha_from"], fields["alpha_to"] = parse_range(pdf_bv["alpha"])
+    if pdf_bv.get("beta"):
+        fields["beta_from"], fields["beta_to"] = parse_range(pdf_bv["beta"])
+    if pdf_bv.get("cohumulone"):
+        fields["co_h_from"], fields["co_h_to"] = parse_range(pdf_bv["cohumulone"])
+    if pdf_bv.get("oil"):
+        fields["oil_from"], fields["oil_to"] = parse_range(pdf_bv["oil"])
+
+
+def _build_hop_entry(
+    hop_url: str, fields: Dict, pdf_url: Optional[str], sensory_data: Optional[Dict[str, float]]
+) -> HopEntry:
+    """Create the HopEntry for a hop page; sensory scores always come from the PDF."""
+    hop_slug = hop_url.rstrip("/").rsplit("/", 1)[-1]
+    hop_entry = HopEntry(
+        country="Australia",
+        source="Hop Products Australia",
+        href=hop_url,
+        **fields,
+    )
+
+    if sensory_data is not None:
+        hop_entry.set_standardized_aromas("australianhops", sensory_data)
+
+    print(
+        f"  [DBG] {hop_slug}: final alpha={hop_entry.alpha_from}-{hop_entry.alpha_to} "
+        f"beta={hop_entry.beta_from}-{hop_entry.beta_to} "
+        f"coh={hop_entry.co_h_from}-{hop_entry.co_h_to} "
+        f"oil={hop_entry.oil_from}-{hop_entry.oil_to}"
+    )
+    print(f"  Page loaded: {hop_entry.name} — pdf: {pdf_url or 'none'}")
+    return hop_entry
+
+
+def process_hop_page(
+    hop_url: str, known_pdf_url: Optional[str] = None, media_index: Optional[MediaIndex] = None
+) -> Optional[HopEntry]:
     """Fetch a hop page and its PDF spec sheet, merge both sources into a HopEntry.
 
     HTML provides: name, country, description, aroma notes, and sometimes brewing values.
     PDF provides: authoritative brewing values (alpha/beta/cohumulone/oil) and sensory scores.
     When both sources have a brewing value the PDF wins (it is the official spec sheet).
-    PDF discovery order: known_pdf_url (from listing page) → page link → WP REST API.
+    PDF discovery order: known_pdf_url (from listing page) → page link → WP media index.
+    Without a ``media_index`` (see build_media_index()) the shared_media_index() is
+    used, built on the first page that needs it.
     """
     try:
         response = _get_with_retry(hop_url, timeout=PAGE_TIMEOUT)
@@ -596,124 +852,152 @@ def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optio
         print(f"  Error fetching {hop_url}: {exc}")
         return None
 
-    soup = BeautifulSoup(response.content, "html.parser")
     hop_slug = hop_url.rstrip("/").rsplit("/", 1)[-1]
+    media_pdf_url = None
+    if not known_pdf_url:
+        if media_index is None:
+            media_index = shared_media_index()
+        if media_index is not None:
+            media_pdf_url = media_index.find(hop_slug)
+
+    bodies = _state_bodies(response.content, known_pdf_url, media_pdf_url)
+    previous = state.lookup(hop_url, *bodies, parser_version=PARSER_VERSION)
+    pdf_bodies: Dict[str, SpooledBody] = {}
+    if previous is not None:
+        try:
+            for dep_url in previous.dependencies:
+                pdf_bodies[dep_url] = _download_pdf(dep_url)
+        except requests.exceptions.RequestException:
+            pdf_bodies = {}
+        if previous.dependencies_unchanged(pdf_bodies):
+            return state.reuse(previous)
 
-    # Name from <h1>, fallback to slug
-    h1 = soup.find("h1")
-    name = h1.get_text(strip=True) if h1 else hop_slug.replace("-", " ").title()
+    soup, fields, bv = _parse_hop_html(hop_url, response.content)
 
-    # Brewing values from HTML (tables / definition lists / inline text)
-    bv = parse_brewing_values(soup)
-    alpha_from, alpha_to = parse_range(bv.get("alpha", ""))
-    beta_from, beta_to = parse_range(bv.get("beta", ""))
-    coh_from, coh_to = parse_range(bv.get("cohumulone", ""))
-    oil_from, oil_to = parse_range(bv.get("oil", ""))
-
-    description = parse_description(soup)
-    notes = parse_aroma_notes(soup)
-
-    # PDF discovery: listing-page URL first, then page link, then WP REST API
-    pdf_source = "listing" if known_pdf_url else None
-    pdf_url = known_pdf_url
-    if not pdf_url:
-        pdf_url = find_pdf_url(soup, hop_url)
-        if pdf_url:
-            pdf_source = "page-link"
-    if not pdf_url:
-        pdf_url = _find_pdf_via_wp_api(hop_slug)
-        if pdf_url:
-            pdf_source = "wp-api"
+    pdf_url, pdf_source = _page_pdf_url(soup, hop_url, known_pdf_url)
+    if not pdf_url and media_pdf_url:
+        pdf_url, pdf_source = media_pdf_url, "wp-media"
 
     print(f"  [DBG] {hop_slug}: pdf_source={pdf_source!r} pdf_url={pdf_url!r}")
     print(f"  [DBG] {hop_slug}: html_bv={bv!r}")
 
     # PDF data — brewing values from PDF override HTML; sensory always from PDF
-    pdf_bytes: Optional[bytes] = None
+    pdf_bytes: Optional[SpooledBody] = None
     if pdf_url:
         try:
-            pdf_resp = _get_with_retry(pdf_url, timeout=PDF_TIMEOUT)
-            pdf_bytes = pdf_resp.content
+            pdf_bytes = pdf_bodies.get(pdf_url)
+            if pdf_bytes is None:
+                pdf_bytes = _download_pdf(pdf_url)
             print(f"  PDF downloaded: {pdf_url}")
-
-            pdf_bv = parse_pdf_brewing_values(pdf_bytes)
-            print(f"  [DBG] {hop_slug}: pdf_bv={pdf_bv!r}")
-            if pdf_bv.get("alpha"):
-                alpha_from, alpha_to = parse_range(pdf_bv["alpha"])
-            if pdf_bv.get("beta"):
-                beta_from, beta_to = parse_range(pdf_bv["beta"])
-            if pdf_bv.get("cohumulone"):
-                coh_from, coh_to = parse_range(pdf_bv["cohumulone"])
-            if pdf_bv.get("oil"):
-                oil_from, oil_to = parse_range(pdf_bv["oil"])
         except requests.exceptions.RequestException as exc:
             print(f"  Warning: could not download PDF {pdf_url}: {exc}")
-            pdf_bytes = None
+            return _build_hop_entry(hop_url, fields, pdf_url, None)
 
-    hop_entry = HopEntry(
-        name=name,
-        country="Australia",
-        source="Hop Products Australia",
-        href=hop_url,
-        alpha_from=alpha_from,
-        alpha_to=alpha_to,
-        beta_from=beta_from,
-        beta_to=beta_to,
-        oil_from=oil_from,
-        oil_to=oil_to,
-        co_h_from=coh_from,
-        co_h_to=coh_to,
-        notes=notes,
-        description=description,
+    sensory_data = None
+    if pdf_bytes:
+        spec_sheet = run_parser(parse_pdf_spec_sheet, pdf_bytes)
+        _apply_pdf_brewing_values(fields, spec_sheet["brewing_values"], hop_slug)
+        sensory_data = spec_sheet["sensory"]
+    entry = _build_hop_entry(hop_url, fields, pdf_url, sensory_data)
+    if not pdf_url and media_index is None:
+        return entry  # the media library could not be searched: look again next run
+    dependencies = {pdf_url: pdf_bytes} if pdf_url else None
+    return state.remember(
+        hop_url, "Hop Products Australia", bodies, entry, dependencies, parser_version=PARSER_VERSION
     )
 
-    if pdf_bytes:
-        sensory_data = parse_pdf_sensory(pdf_bytes)
-        hop_entry.set_standardized_aromas("australianhops", sensory_data)
 
-    print(
-        f"  [DBG] {hop_slug}: final alpha={alpha_from}-{alpha_to} "
-        f"beta={beta_from}-{beta_to} coh={coh_from}-{coh_to} oil={oil_from}-{oil_to}"
-    )
-    print(f"  Page loaded: {name} — pdf: {pdf_url or 'none'}")
-    return hop_entry
+async def process_hop_page_async(
+    fetcher: aio.AsyncFetcher,
+    hop_url: str,
+    known_pdf_url: Optional[str] = None,
+    media_index: Optional[MediaIndex] = None,
+) -> Optional[HopEntry]:
+    """Coroutine variant of process_hop_page()."""
+    try:
+        response = await _get_with_retry_async(fetcher, hop_url, timeout=PAGE_TIMEOUT)
+    except requests.exceptions.RequestException as exc:
+        print(f"  Error fetching {hop_url}: {exc}")
+        return None
 
+    hop_slug = hop_url.rstrip("/").rsplit("/", 1)[-1]
+    media_pdf_url = media_index.find(hop_slug) if media_index is not None and not known_pdf_url else None
 
-MAX_WORKERS = 5  # concurrent threads for page and PDF fetches
+    bodies = _state_bodies(response.content, known_pdf_url, media_pdf_url)
+    previous = await state.lookup_async(hop_url, *bodies, parser_version=PARSER_VERSION)
+    pdf_bodies: Dict[str, SpooledBody] = {}
+    if previous is not None:
+        try:
+            for dep_url in previous.dependencies:
+                pdf_bodies[dep_url] = await _download_pdf_async(fetcher, dep_url)
+        except requests.exceptions.RequestException:
+            pdf_bodies = {}
+        if await previous.dependencies_unchanged_async(pdf_bodies):
+            return state.reuse(previous)
 
+    soup, fields, bv = _parse_hop_html(hop_url, response.content)
 
-def scrape(save: bool = False) -> List[HopEntry]:
-    """
-    Main entry point: scrape all hops from hops.com.au.
+    pdf_url, pdf_source = _page_pdf_url(soup, hop_url, known_pdf_url)
+    if not pdf_url and media_pdf_url:
+        pdf_url, pdf_source = media_pdf_url, "wp-media"
 
-    Phase 1 — load the listing page and collect hop page URLs.
-    Phase 2 — for each hop page concurrently: fetch HTML, find PDF (page link or
-               WP REST API), download PDF, merge both sources into a HopEntry.
+    print(f"  [DBG] {hop_slug}: pdf_source={pdf_source!r} pdf_url={pdf_url!r}")
+    print(f"  [DBG] {hop_slug}: html_bv={bv!r}")
 
-    Args:
-        save: If True, save results to data/hops_australia.json.
+    pdf_bytes: Optional[SpooledBody] = None
+    if pdf_url:
+        try:
+            pdf_bytes = pdf_bodies.get(pdf_url)
+            if pdf_bytes is None:
+                pdf_bytes = await _download_pdf_async(fetcher, pdf_url)
+            print(f"  PDF downloaded: {pdf_url}")
+        except requests.exceptions.RequestException as exc:
+            print(f"  Warning: could not download PDF {pdf_url}: {exc}")
+            return _build_hop_entry(hop_url, fields, pdf_url, None)
 
-    Returns:
-        List of HopEntry objects.
+    sensory_data = None
+    if pdf_bytes:
+        spec_sheet = await run_parser_async(parse_pdf_spec_sheet, pdf_bytes)
+        _apply_pdf_brewing_values(fields, spec_sheet["brewing_values"], hop_slug)
+        sensory_data = spec_sheet["sensory"]
+    entry = _build_hop_entry(hop_url, fields, pdf_url, sensory_data)
+    if not pdf_url and media_index is None:
+        return entry  # the media library could not be searched: look again next run
+    dependencies = {pdf_url: pdf_bytes} if pdf_url else None
+    return await state.remember_async(
+        hop_url, "Hop Products Australia", bodies, entry, dependencies, parser_version=PARSER_VERSION
+    )
+
+
+async def scrape_async(fetcher: aio.AsyncFetcher) -> List[HopEntry]:
+    """
+    Scrape all hops from hops.com.au on one event loop.
+
+    Phase 1 — load the listing page and collect hop page URLs; meanwhile
+               index the PDFs of the WordPress media library.
+    Phase 2 — for each hop page concurrently: fetch HTML, find PDF (page link or
+               media index), download PDF, merge both sources into a HopEntry.
     """
-    # Phase 1: listing page — collect hop URLs and PDF links together
-    listing = collect_listing_links()
+    # Phase 1: listing page — collect hop URLs and PDF links together.  This is a
+    # single request (plus rare fallbacks), so it runs on a worker thread.
+    loop = asyncio.get_running_loop()
+    media_index_task = asyncio.ensure_future(build_media_index_async(fetcher))
+    listing = await loop.run_in_executor(None, collect_listing_links)
     if not listing:
+        media_index_task.cancel()
         print("No hop links found for hops.com.au — skipping.")
         return []
+    media_index = await media_index_task
 
     # Phase 2: fetch + parse hop pages concurrently (HTML and PDF merged)
     print(f"\nProcessing {len(listing)} hop pages concurrently...")
-    hop_entries: List[HopEntry] = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_hop_page, url, pdf_url): url
+    results = await asyncio.gather(
+        *(
+            process_hop_page_async(fetcher, url, pdf_url, media_index)
             for url, pdf_url in listing.items()
-        }
-        for future in concurrent.futures.as_completed(futures):
-            entry = future.result()
-            if entry:
-                hop_entries.append(entry)
+        )
+    )
+    hop_entries: List[HopEntry] = [entry for entry in results if entry]
 
     # Filter out non-hop pages: a real hop entry has at least one numeric brewing value.
     kept, dropped = [], []
@@ -729,6 +1013,22 @@ def scrape(save: bool = False) -> List[HopEntry]:
     hop_entries = kept
 
     print(f"\nHop Products Australia: scraped {len(hop_entries)} of {len(listing)} hops.")
+    return hop_entries
+
+
+def scrape(save: bool = False) -> List[HopEntry]:
+    """
+    Main entry point: scrape all hops from hops.com.au.
+
+    Runs scrape_async() on a new event loop; see there for the phases.
+
+    Args:
+        save: If True, save results to data/hops_australia.json.
+
+    Returns:
+        List of HopEntry objects.
+    """
+    hop_entries = aio.run(scrape_async)
 
     if save:
         save_hop_entries(hop_entries, "data/hops_australia.json")
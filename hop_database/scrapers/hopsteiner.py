@@ -2,6 +2,35 @@ import json
 import os
 
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..utils.fields import RangeField, parse_ranges
+
+# Range fields of the raw dataset ("13.0 - 17.0" or a single "3.5")
+RANGE_FIELDS = (
+    RangeField("acid_alpha"),
+    RangeField("acid_beta"),
+    RangeField("cohumulone", convert=int),
+    RangeField("oils"),
+    RangeField("acid_hardresins"),
+    RangeField("polyphenoles"),
+    RangeField("xantholhumol"),
+    RangeField("humulen"),
+    RangeField("farnesen"),
+    RangeField("linalool_oil"),
+    RangeField("linalool_acid"),
+)
+
+# Fields kept as <field>_from/<field>_to in additional_properties
+EXTENDED_FIELDS = (
+    "acid_hardresins",
+    "polyphenoles",
+    "xantholhumol",
+    "oils",
+    "humulen",
+    "farnesen",
+    "linalool_oil",
+    "linalool_acid",
+)
+
 
 def scrape(save=False):
     # Specify the path to the JSON file
@@ -38,79 +67,21 @@ def scrape(save=False):
     # "cone_url": "https:\/\/www.hopsteiner.com\/wp-content\/uploads\/2016\/04\/Herkules.png",
     # "permalink": "herkules",
 
+    # Parse every range field of every entry in one pass; bad values are reported, not raised
+    ranges = parse_ranges(data["hops"], RANGE_FIELDS)
+    for error in ranges.errors:
+        print(f"Warning: Hopsteiner {error}")
+
     hop_data = []
     # Iterate over each entry in the JSON data
-    for entry in data["hops"]:
+    for row, entry in enumerate(data["hops"]):
         # Extract the required fields from the entry
         name = entry["name"]
         href = entry["permalink"]
-        alpha_low, alpha_high = (
-            map(float, entry["acid_alpha"].split(" - "))
-            if " - " in entry["acid_alpha"]
-            else (float(entry["acid_alpha"]), float(entry["acid_alpha"]))
-        )
-        if entry["acid_beta"] != "0.0":
-            beta_low, beta_high = (
-                map(float, entry["acid_beta"].split(" - "))
-                if " - " in entry["acid_beta"]
-                else (float(entry["acid_beta"]), float(entry["acid_beta"]))
-            )
-        else:
-            beta_low = 0.0
-            beta_high = 0.0
-        co_h_low, co_h_high = (
-            map(int, entry["cohumulone"].split(" - "))
-            if " - " in entry["cohumulone"]
-            else (int(entry["cohumulone"]), int(entry["cohumulone"]))
-        )
-        oil_low, oil_high = (
-            map(float, entry["oils"].split(" - "))
-            if " - " in entry["oils"]
-            else (float(entry["oils"]), float(entry["oils"]))
-        )
-
-        # Extra oil properties
-        acid_hardresins_low, acid_hardresins_high = (
-            map(float, entry["acid_hardresins"].split(" - "))
-            if " - " in entry["acid_hardresins"]
-            else (float(entry["acid_hardresins"]), float(entry["acid_hardresins"]))
-        )
-        polyphenoles_low, polyphenoles_high = (
-            map(float, entry["polyphenoles"].split(" - "))
-            if " - " in entry["polyphenoles"]
-            else (float(entry["polyphenoles"]), float(entry["polyphenoles"]))
-        )
-        xantholhumol_low, xantholhumol_high = (
-            map(float, entry["xantholhumol"].split(" - "))
-            if " - " in entry["xantholhumol"]
-            else (float(entry["xantholhumol"]), float(entry["xantholhumol"]))
-        )
-        oils_low, oils_high = (
-            map(float, entry["oils"].split(" - "))
-            if " - " in entry["oils"]
-            else (float(entry["oils"]), float(entry["oils"]))
-        )
-        humulen_low, humulen_high = (
-            map(float, entry["humulen"].split(" - "))
-            if " - " in entry["humulen"]
-            else (float(entry["humulen"]), float(entry["humulen"]))
-        )
-        farnesen_low, farnesen_high = (
-            map(float, entry["farnesen"].split(" - "))
-            if " - " in entry["farnesen"]
-            else (float(entry["farnesen"]), float(entry["farnesen"]))
-        )
-        linalool_oil_low, linalool_oil_high = (
-            map(float, entry["linalool_oil"].split(" - "))
-            if " - " in entry["linalool_oil"]
-            else (float(entry["linalool_oil"]), float(entry["linalool_oil"]))
-        )
-        linalool_acid_low, linalool_acid_high = (
-            map(float, entry["linalool_acid"].split(" - "))
-            if " - " in entry["linalool_acid"]
-            else (float(entry["linalool_acid"]), float(entry["linalool_acid"]))
-        )
-        # "linalool_acid": "0.25 - 0.33",
+        alpha_low, alpha_high = ranges.range("acid_alpha", row)
+        beta_low, beta_high = ranges.range("acid_beta", row)
+        co_h_low, co_h_high = ranges.range("cohumulone", row)
+        oil_low, oil_high = ranges.range("oils", row)
 
         hop_aromas_notes = entry["aroma_spec"].split(", ")
         # Map numeric IDs directly to standard aroma categories
@@ -135,25 +106,12 @@ def scrape(save=False):
             hop_aromas = []
             
         # Create additional properties dictionary for extended data
-        additional_properties = {
-            "acid_hardresins_from": acid_hardresins_low,
-            "acid_hardresins_to": acid_hardresins_high,
-            "polyphenoles_from": polyphenoles_low,
-            "polyphenoles_to": polyphenoles_high,
-            "xantholhumol_from": xantholhumol_low,
-            "xantholhumol_to": xantholhumol_high,
-            "oils_from": oils_low,
-            "oils_to": oils_high,
-            "humulen_from": humulen_low,
-            "humulen_to": humulen_high,
-            "farnesen_from": farnesen_low,
-            "farnesen_to": farnesen_high,
-            "linalool_oil_from": linalool_oil_low,
-            "linalool_oil_to": linalool_oil_high,
-            "linalool_acid_from": linalool_acid_low,
-            "linalool_acid_to": linalool_acid_high
-        }
-        
+        additional_properties = {}
+        for field_name in EXTENDED_FIELDS:
+            low, high = ranges.range(field_name, row)
+            additional_properties[f"{field_name}_from"] = low
+            additional_properties[f"{field_name}_to"] = high
+
         # Create HopEntry directly
         hop_entry = HopEntry(
             name=name,
@@ -8,15 +8,19 @@ Brewing values and aroma data are parsed from both the page HTML
 and the PDF.
 """
 
-import io
+import asyncio
 import re
-import concurrent.futures
-from typing import Dict, Optional, Tuple, List, Set
+from typing import Dict, Iterable, Optional, Tuple, List, Set, Union
 
 import requests
 from bs4 import BeautifulSoup
 
+from .. import aio, http, scheduler, state
+from ..cache import cached_pdf_parser
+from ..download import SpooledBody
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..utils.html import make_soup, only
+from ..utils.pdf import extract_pdf, pdfplumber_available, run_parser, run_parser_async
 
 BASE_URL = "https://www.johnihaas.com"
 
@@ -35,16 +39,16 @@ NON_HOP_SLUGS = {
     "australian-hops",  # category landing page, not a variety
 }
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
-
 PAGE_TIMEOUT = 30
-PDF_TIMEOUT = 60
+PDF_STALL_TIMEOUT = 20            # seconds without data before a PDF download is abandoned
+PDF_DEADLINE = 60                 # seconds allowed for a whole PDF download
+PDF_MAX_BYTES = 25 * 1024 * 1024  # spec sheets are well under this
+
+MAX_CONCURRENCY = 5  # initial concurrent requests to johnihaas.com (adapted by throttle)
+# Bump when the entries parsed from unchanged pages change, so the state store re-parses them
+PARSER_VERSION = 1
+
+http.configure_host(BASE_URL, pool_size=MAX_CONCURRENCY, timeout=PAGE_TIMEOUT)
 
 
 def parse_range(text: str) -> Tuple[str, str]:
@@ -83,6 +87,36 @@ def hop_name_from_pdf_filename(pdf_url: str) -> str:
     return name
 
 
+def _parse_catalog_page(content: bytes, pdf_links: Dict[str, str], hop_page_links: Set[str]) -> None:
+    """Adds the PDF links and root-level hop page links found on one catalog page."""
+    soup = make_soup(content, parse_only=only("a", href=True))
+
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag["href"]
+
+        # Direct PDF links (wp-content/uploads/*.pdf)
+        if "wp-content/uploads" in href and href.lower().endswith(".pdf"):
+            full_url = href if href.startswith("http") else BASE_URL + href
+            if full_url not in pdf_links:
+                anchor = a_tag.get_text(strip=True)
+                pdf_links[full_url] = anchor
+                print(f"    [DEBUG] PDF link: {full_url!r} (anchor: {anchor!r})")
+            continue
+
+        # Root-level hop variety page links: /slug/ or https://www.johnihaas.com/slug/
+        full_url = href if href.startswith("http") else BASE_URL + href
+        m = re.match(r"^https?://www\.johnihaas\.com/([^/]+)/?$", full_url)
+        if m:
+            slug = m.group(1)
+            if slug and slug not in NON_HOP_SLUGS:
+                hop_page_links.add(full_url.rstrip("/"))
+
+
+def _report_catalog_links(pdf_links: Dict[str, str], hop_page_links: Set[str]) -> None:
+    print(f"  [DEBUG] Collected {len(pdf_links)} PDF links and {len(hop_page_links)} root-level hop page links")
+    print(f"  [DEBUG] Root-level hop pages: {sorted(hop_page_links)}")
+
+
 def collect_catalog_links() -> Tuple[Dict[str, str], Set[str]]:
     """
     Fetches all catalog pages and returns:
@@ -94,36 +128,40 @@ def collect_catalog_links() -> Tuple[Dict[str, str], Set[str]]:
 
     for catalog_url in CATALOG_PAGES:
         try:
-            resp = requests.get(catalog_url, headers=HEADERS, timeout=PAGE_TIMEOUT)
+            resp = http.get(catalog_url, timeout=PAGE_TIMEOUT, priority=scheduler.LISTING)
             resp.raise_for_status()
             print(f"  [DEBUG] Fetched {catalog_url} → {resp.status_code}")
-            soup = BeautifulSoup(resp.content, "html.parser")
-
-            for a_tag in soup.find_all("a", href=True):
-                href = a_tag["href"]
-
-                # Direct PDF links (wp-content/uploads/*.pdf)
-                if "wp-content/uploads" in href and href.lower().endswith(".pdf"):
-                    full_url = href if href.startswith("http") else BASE_URL + href
-                    if full_url not in pdf_links:
-                        anchor = a_tag.get_text(strip=True)
-                        pdf_links[full_url] = anchor
-                        print(f"    [DEBUG] PDF link: {full_url!r} (anchor: {anchor!r})")
-                    continue
-
-                # Root-level hop variety page links: /slug/ or https://www.johnihaas.com/slug/
-                full_url = href if href.startswith("http") else BASE_URL + href
-                m = re.match(r"^https?://www\.johnihaas\.com/([^/]+)/?$", full_url)
-                if m:
-                    slug = m.group(1)
-                    if slug and slug not in NON_HOP_SLUGS:
-                        hop_page_links.add(full_url.rstrip("/"))
+        except requests.exceptions.RequestException as e:
+            print(f"  Error fetching catalog page {catalog_url}: {e}")
+            continue
+        _parse_catalog_page(resp.content, pdf_links, hop_page_links)
+
+    _report_catalog_links(pdf_links, hop_page_links)
+    return pdf_links, hop_page_links
+
+
+async def collect_catalog_links_async(fetcher: aio.AsyncFetcher) -> Tuple[Dict[str, str], Set[str]]:
+    """Coroutine variant of collect_catalog_links(); the catalog pages are fetched concurrently."""
+    pdf_links: Dict[str, str] = {}
+    hop_page_links: Set[str] = set()
 
+    responses = await asyncio.gather(
+        *(fetcher.get(url, timeout=PAGE_TIMEOUT, priority=scheduler.LISTING) for url in CATALOG_PAGES),
+        return_exceptions=True,
+    )
+    # Parse in CATALOG_PAGES order so the first anchor seen for a PDF wins, as in the sync path
+    for catalog_url, resp in zip(CATALOG_PAGES, responses):
+        try:
+            if isinstance(resp, BaseException):
+                raise resp
+            resp.raise_for_status()
+            print(f"  [DEBUG] Fetched {catalog_url} → {resp.status_code}")
         except requests.exceptions.RequestException as e:
             print(f"  Error fetching catalog page {catalog_url}: {e}")
+            continue
+        _parse_catalog_page(resp.content, pdf_links, hop_page_links)
 
-    print(f"  [DEBUG] Collected {len(pdf_links)} PDF links and {len(hop_page_links)} root-level hop page links")
-    print(f"  [DEBUG] Root-level hop pages: {sorted(hop_page_links)}")
+    _report_catalog_links(pdf_links, hop_page_links)
     return pdf_links, hop_page_links
 
 
@@ -143,6 +181,7 @@ def find_pdf_url(soup: BeautifulSoup) -> Optional[str]:
     return None
 
 
+@cached_pdf_parser("haas-spec-sheet", version=1)
 def parse_pdf_data(pdf_content: bytes) -> Dict:
     """
     Extract brewing values, aroma notes, and description from a Haas PDF spec sheet.
@@ -150,57 +189,52 @@ def parse_pdf_data(pdf_content: bytes) -> Dict:
     """
     result: Dict = {"alpha": "", "beta": "", "cohumulone": "", "oil": "", "notes": [], "description": ""}
 
-    try:
-        import pdfplumber
-    except ImportError:
+    if not pdfplumber_available():
         print("  Warning: pdfplumber not installed — skipping PDF parsing.")
         return result
 
     try:
-        with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-            full_text = ""
-            for page in pdf.pages:
-                full_text += (page.extract_text() or "") + "\n"
-
-            # Brewing values.
-            # Handles three PDF formats seen in the wild:
-            #   MiniSpecSheet:  "Alpha (%) 13-17"
-            #   Haas:           "Alpha Acids* 10.1 - 14.1%"
-            #   HPA:            "Alpha 16.2 – 18.4%"
-            # Key fix: capture only digit-range, not arbitrary whitespace (old [\d.\s\-–]+
-            # could match empty/whitespace strings).  Optional parenthetical units like
-            # "(%)" or "(% of Alpha Acids)" or "(ml/100g)" are skipped via (?:\([^)]*\))?.
-            for pattern, key in [
-                (r"(?i)alpha\s*(?:acids?\*?)?\s*(?:\([^)]*\))?\s*\*?\s*([\d.]+\s*[-–]\s*[\d.]+)", "alpha"),
-                (r"(?i)beta\s*(?:acids?\*?)?\s*(?:\([^)]*\))?\s*\*?\s*([\d.]+\s*[-–]\s*[\d.]+)", "beta"),
-                (r"(?i)co-?h(?:um(?:ulone)?)?\s*(?:\([^)]*\))?\s*([\d.]+\s*[-–]\s*[\d.]+)", "cohumulone"),
-                (r"(?i)(?:total\s+)?oil(?:\s+content)?\s*(?:\([^)]*\))?\s*([\d.]+\s*[-–]\s*[\d.]+)", "oil"),
-            ]:
-                m = re.search(pattern, full_text)
-                if m and not result[key]:
-                    result[key] = m.group(1).strip()
-
-            # Aroma/flavor notes — comma-separated descriptors
-            for pattern in [
-                r"(?i)aroma[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
-                r"(?i)flavor[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
-                r"(?i)sensory[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
-            ]:
-                m = re.search(pattern, full_text)
-                if m:
-                    raw = m.group(1).strip()
-                    candidates = [n.strip() for n in re.split(r"[,;]", raw) if n.strip()]
-                    if candidates:
-                        result["notes"] = candidates
-                        break
-
-            # Description — first substantial paragraph-like block
-            lines = [l.strip() for l in full_text.splitlines() if len(l.strip()) > 60]
-            for line in lines:
-                if not re.match(r"(?i)^(alpha|beta|cohumulone|oil|storage|copyright|john i\. haas)", line):
-                    result["description"] = line
+        full_text = extract_pdf(pdf_content).text
+
+        # Brewing values.
+        # Handles three PDF formats seen in the wild:
+        #   MiniSpecSheet:  "Alpha (%) 13-17"
+        #   Haas:           "Alpha Acids* 10.1 - 14.1%"
+        #   HPA:            "Alpha 16.2 – 18.4%"
+        # Key fix: capture only digit-range, not arbitrary whitespace (old [\d.\s\-–]+
+        # could match empty/whitespace strings).  Optional parenthetical units like
+        # "(%)" or "(% of Alpha Acids)" or "(ml/100g)" are skipped via (?:\([^)]*\))?.
+        for pattern, key in [
+            (r"(?i)alpha\s*(?:acids?\*?)?\s*(?:\([^)]*\))?\s*\*?\s*([\d.]+\s*[-–]\s*[\d.]+)", "alpha"),
+            (r"(?i)beta\s*(?:acids?\*?)?\s*(?:\([^)]*\))?\s*\*?\s*([\d.]+\s*[-–]\s*[\d.]+)", "beta"),
+            (r"(?i)co-?h(?:um(?:ulone)?)?\s*(?:\([^)]*\))?\s*([\d.]+\s*[-–]\s*[\d.]+)", "cohumulone"),
+            (r"(?i)(?:total\s+)?oil(?:\s+content)?\s*(?:\([^)]*\))?\s*([\d.]+\s*[-–]\s*[\d.]+)", "oil"),
+        ]:
+            m = re.search(pattern, full_text)
+            if m and not result[key]:
+                result[key] = m.group(1).strip()
+
+        # Aroma/flavor notes — comma-separated descriptors
+        for pattern in [
+            r"(?i)aroma[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
+            r"(?i)flavor[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
+            r"(?i)sensory[:\s]+([a-zA-Z ,/&\-]+?)(?:\n|\.)",
+        ]:
+            m = re.search(pattern, full_text)
+            if m:
+                raw = m.group(1).strip()
+                candidates = [n.strip() for n in re.split(r"[,;]", raw) if n.strip()]
+                if candidates:
+                    result["notes"] = candidates
                     break
 
+        # Description — first substantial paragraph-like block
+        lines = [l.strip() for l in full_text.splitlines() if len(l.strip()) > 60]
+        for line in lines:
+            if not re.match(r"(?i)^(alpha|beta|cohumulone|oil|storage|copyright|john i\. haas)", line):
+                result["description"] = line
+                break
+
     except Exception as exc:
         print(f"  Warning: could not parse PDF: {exc}")
 
@@ -254,15 +288,14 @@ def _extract_brewing_from_html(soup: BeautifulSoup) -> Dict[str, str]:
     return brewing
 
 
-def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optional[HopEntry]:
-    """Fetches a hop variety page, finds its PDF, and returns a HopEntry."""
-    try:
-        response = requests.get(hop_url, headers=HEADERS, timeout=PAGE_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-    except requests.exceptions.RequestException as e:
-        print(f"  Error fetching {hop_url}: {e}")
-        return None
+def _parse_hop_html(hop_url: str, content: bytes) -> Tuple[BeautifulSoup, Dict, Dict[str, str]]:
+    """
+    Parses a hop variety page.
+
+    Returns (soup, fields, brewing) where ``fields`` holds the HopEntry values
+    found in the HTML and ``brewing`` the raw brewing strings they came from.
+    """
+    soup = make_soup(content)
 
     h1 = soup.find("h1")
     name = h1.get_text(strip=True) if h1 else hop_url.rstrip("/").split("/")[-1].replace("-", " ").title()
@@ -273,10 +306,11 @@ def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optio
     coh_raw = brewing.get("cohumulone", brewing.get("co-h", ""))
     oil_raw = brewing.get("oil", brewing.get("total oil", ""))
 
-    alpha_from, alpha_to = parse_range(alpha_raw)
-    beta_from, beta_to = parse_range(beta_raw)
-    co_h_from, co_h_to = parse_range(coh_raw)
-    oil_from, oil_to = parse_range(oil_raw)
+    fields: Dict = {"name": name, "country": country}
+    fields["alpha_from"], fields["alpha_to"] = parse_range(alpha_raw)
+    fields["beta_from"], fields["beta_to"] = parse_range(beta_raw)
+    fields["co_h_from"], fields["co_h_to"] = parse_range(coh_raw)
+    fields["oil_from"], fields["oil_to"] = parse_range(oil_raw)
 
     notes: List[str] = []
     description = ""
@@ -289,69 +323,212 @@ def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optio
             if any(kw in text.lower() for kw in ("aroma", "flavor", "flavour")):
                 candidates = [n.strip() for n in re.split(r"[,;]", text) if n.strip()]
                 notes = notes or candidates
+    fields["notes"] = notes
+    fields["description"] = description
+
+    return soup, fields, brewing
+
+
+def _merge_pdf_data(fields: Dict, pdf_data: Dict) -> None:
+    """Fills brewing values, notes and description missing from the HTML with PDF data."""
+    if not fields["alpha_from"] and pdf_data["alpha"]:
+        fields["alpha_from"], fields["alpha_to"] = parse_range(pdf_data["alpha"])
+    if not fields["beta_from"] and pdf_data["beta"]:
+        fields["beta_from"], fields["beta_to"] = parse_range(pdf_data["beta"])
+    if not fields["co_h_from"] and pdf_data["cohumulone"]:
+        fields["co_h_from"], fields["co_h_to"] = parse_range(pdf_data["cohumulone"])
+    if not fields["oil_from"] and pdf_data["oil"]:
+        fields["oil_from"], fields["oil_to"] = parse_range(pdf_data["oil"])
+    fields["notes"] = fields["notes"] or pdf_data["notes"]
+    fields["description"] = fields["description"] or pdf_data["description"]
+
+
+def _hop_page_entry(hop_url: str, fields: Dict, brewing: Dict[str, str], pdf_url: Optional[str]) -> Optional[HopEntry]:
+    """Creates the HopEntry for a hop variety page, or None if it has no brewing data."""
+    if not fields["alpha_from"] and not fields["alpha_to"] and not fields["beta_from"] and not fields["beta_to"]:
+        print(f"  Skipping {fields['name']} — no brewing data found (html_keys={list(brewing.keys())}, pdf_url={pdf_url!r})")
+        return None
+
+    hop_entry = HopEntry(source="John I. Haas", href=hop_url, **fields)
+    print(f"  Processed: {hop_entry.name} ({hop_entry.country}) — alpha {hop_entry.alpha_from}-{hop_entry.alpha_to}%")
+    return hop_entry
+
+
+def _download_pdf(pdf_url: str) -> SpooledBody:
+    """Stream a spec sheet into a spooled body; raises requests exceptions on failure."""
+    download = http.download(
+        pdf_url, max_bytes=PDF_MAX_BYTES, stall_timeout=PDF_STALL_TIMEOUT, deadline=PDF_DEADLINE
+    )
+    download.raise_for_status()
+    return download.body
+
+
+async def _download_pdf_async(fetcher: aio.AsyncFetcher, pdf_url: str) -> SpooledBody:
+    """Coroutine variant of _download_pdf()."""
+    download = await fetcher.download(
+        pdf_url, max_bytes=PDF_MAX_BYTES, stall_timeout=PDF_STALL_TIMEOUT, deadline=PDF_DEADLINE
+    )
+    download.raise_for_status()
+    return download.body
+
+
+class PdfSingleFlight:
+    """
+    Downloads and parses each spec sheet at most once per run.
+
+    Callers asking for the same URL concurrently await the same task.  A
+    failed download is forgotten, so a later caller may try again.
+    ``consumed`` collects the PDFs whose data went into a hop-page entry;
+    the PDF-only phase skips them.  Bodies are kept until release()d (parse
+    results for the whole run).
+    """
+
+    def __init__(self, fetcher: aio.AsyncFetcher):
+        self._fetcher = fetcher
+        self._bodies: Dict[str, asyncio.Future] = {}
+        self._data: Dict[str, asyncio.Future] = {}
+        self.consumed: Set[str] = set()
+
+    @staticmethod
+    async def _once(flights: Dict[str, asyncio.Future], pdf_url: str, start):
+        task = flights.get(pdf_url)
+        if task is None:
+            task = flights[pdf_url] = asyncio.ensure_future(start())
+        try:
+            # Shielded: one cancelled caller must not cancel the others' download
+            return await asyncio.shield(task)
+        except requests.exceptions.RequestException:
+            if flights.get(pdf_url) is task:
+                del flights[pdf_url]
+            raise
+
+    async def body(self, pdf_url: str) -> SpooledBody:
+        """The downloaded spec sheet; raises requests exceptions on failure."""
+        return await self._once(
+            self._bodies, pdf_url, lambda: _download_pdf_async(self._fetcher, pdf_url)
+        )
+
+    async def data(self, pdf_url: str) -> Dict:
+        """parse_pdf_data() of the spec sheet, downloading it if needed."""
+
+        async def parse() -> Dict:
+            return await run_parser_async(parse_pdf_data, await self.body(pdf_url))
+
+        return await self._once(self._data, pdf_url, parse)
+
+    def release(self, pdf_urls: Iterable[str]) -> None:
+        """Drop the downloaded bodies of ``pdf_urls``, deleting any spooled files."""
+        for pdf_url in list(pdf_urls):
+            task = self._bodies.pop(pdf_url, None)
+            # A download still running for a cancelled caller is left to the GC
+            if task is not None and task.done() and not task.cancelled() and task.exception() is None:
+                task.result().close()
+
+    def release_all_except(self, pdf_urls: Iterable[str]) -> None:
+        """Drop every downloaded body except those of ``pdf_urls``."""
+        keep = set(pdf_urls)
+        self.release([pdf_url for pdf_url in self._bodies if pdf_url not in keep])
+
+
+def process_hop_page(hop_url: str, known_pdf_url: Optional[str] = None) -> Optional[HopEntry]:
+    """
+    Fetches a hop variety page, finds its PDF, and returns a HopEntry.
+
+    If the page and its PDF are unchanged since the last run, the stored entry
+    is returned without parsing either of them.
+    """
+    try:
+        response = http.get(hop_url, timeout=PAGE_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"  Error fetching {hop_url}: {e}")
+        return None
+
+    bodies = (response.content, (known_pdf_url or "").encode())
+    previous = state.lookup(hop_url, *bodies, parser_version=PARSER_VERSION)
+    pdf_bodies: Dict[str, SpooledBody] = {}
+    if previous is not None:
+        try:
+            for dep_url in previous.dependencies:
+                pdf_bodies[dep_url] = _download_pdf(dep_url)
+        except requests.exceptions.RequestException:
+            pdf_bodies = {}
+        if previous.dependencies_unchanged(pdf_bodies):
+            return state.reuse(previous)
+
+    soup, fields, brewing = _parse_hop_html(hop_url, response.content)
 
     pdf_url = known_pdf_url or find_pdf_url(soup)
     if pdf_url:
         try:
-            pdf_resp = requests.get(pdf_url, headers=HEADERS, timeout=PDF_TIMEOUT)
-            pdf_resp.raise_for_status()
-            pdf_data = parse_pdf_data(pdf_resp.content)
-
-            if not alpha_from and pdf_data["alpha"]:
-                alpha_from, alpha_to = parse_range(pdf_data["alpha"])
-            if not beta_from and pdf_data["beta"]:
-                beta_from, beta_to = parse_range(pdf_data["beta"])
-            if not co_h_from and pdf_data["cohumulone"]:
-                co_h_from, co_h_to = parse_range(pdf_data["cohumulone"])
-            if not oil_from and pdf_data["oil"]:
-                oil_from, oil_to = parse_range(pdf_data["oil"])
-            notes = notes or pdf_data["notes"]
-            description = description or pdf_data["description"]
+            if pdf_url not in pdf_bodies:
+                pdf_bodies = {pdf_url: _download_pdf(pdf_url)}
+            _merge_pdf_data(fields, run_parser(parse_pdf_data, pdf_bodies[pdf_url]))
         except requests.exceptions.RequestException as e:
             print(f"  Warning: could not download PDF {pdf_url}: {e}")
-    if not alpha_from and not alpha_to and not beta_from and not beta_to:
-        print(f"  Skipping {name} — no brewing data found (html_keys={list(brewing.keys())}, pdf_url={pdf_url!r})")
-        return None
+            return _hop_page_entry(hop_url, fields, brewing, pdf_url)
 
-    hop_entry = HopEntry(
-        name=name,
-        country=country,
-        source="John I. Haas",
-        href=hop_url,
-        alpha_from=alpha_from,
-        alpha_to=alpha_to,
-        beta_from=beta_from,
-        beta_to=beta_to,
-        oil_from=oil_from,
-        oil_to=oil_to,
-        co_h_from=co_h_from,
-        co_h_to=co_h_to,
-        notes=notes,
-        description=description,
+    entry = _hop_page_entry(hop_url, fields, brewing, pdf_url)
+    dependencies = {pdf_url: pdf_bodies[pdf_url]} if pdf_url else None
+    return state.remember(
+        hop_url, "John I. Haas", bodies, entry, dependencies, parser_version=PARSER_VERSION
     )
-    print(f"  Processed: {hop_entry.name} ({country}) — alpha {alpha_from}-{alpha_to}%")
-    return hop_entry
 
 
-def process_pdf_directly(pdf_url: str, anchor_text: str) -> Optional[HopEntry]:
+async def process_hop_page_async(
+    fetcher: aio.AsyncFetcher,
+    hop_url: str,
+    known_pdf_url: Optional[str] = None,
+    pdfs: Optional[PdfSingleFlight] = None,
+) -> Optional[HopEntry]:
     """
-    Creates a HopEntry from a PDF spec sheet directly (used when no hop page exists).
-    The hop name is derived from the anchor text or filename.
-    """
-    # Always derive name from filename: catalog PDFs all have anchor "Download Specs"
-    # which is useless as a hop name.
-    name = hop_name_from_pdf_filename(pdf_url)
-    if not name:
-        return None
+    Coroutine variant of process_hop_page().
 
+    Spec sheets are fetched through ``pdfs`` when given, so pages sharing a
+    PDF (and the PDF-only phase) download and parse it once.
+    """
+    pdfs = pdfs or PdfSingleFlight(fetcher)
     try:
-        pdf_resp = requests.get(pdf_url, headers=HEADERS, timeout=PDF_TIMEOUT)
-        pdf_resp.raise_for_status()
-        pdf_data = parse_pdf_data(pdf_resp.content)
+        response = await fetcher.get(hop_url, timeout=PAGE_TIMEOUT)
+        response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        print(f"  Warning: could not download PDF {pdf_url}: {e}")
+        print(f"  Error fetching {hop_url}: {e}")
         return None
 
+    bodies = (response.content, (known_pdf_url or "").encode())
+    previous = await state.lookup_async(hop_url, *bodies, parser_version=PARSER_VERSION)
+    pdf_bodies: Dict[str, SpooledBody] = {}
+    if previous is not None:
+        try:
+            for dep_url in previous.dependencies:
+                pdf_bodies[dep_url] = await pdfs.body(dep_url)
+        except requests.exceptions.RequestException:
+            pdf_bodies = {}
+        if await previous.dependencies_unchanged_async(pdf_bodies):
+            pdfs.consumed.update(pdf_bodies)
+            return state.reuse(previous)
+
+    soup, fields, brewing = _parse_hop_html(hop_url, response.content)
+
+    pdf_url = known_pdf_url or find_pdf_url(soup)
+    if pdf_url:
+        try:
+            pdf_bodies = {pdf_url: await pdfs.body(pdf_url)}
+            _merge_pdf_data(fields, await pdfs.data(pdf_url))
+            pdfs.consumed.add(pdf_url)
+        except requests.exceptions.RequestException as e:
+            print(f"  Warning: could not download PDF {pdf_url}: {e}")
+            return _hop_page_entry(hop_url, fields, brewing, pdf_url)
+
+    entry = _hop_page_entry(hop_url, fields, brewing, pdf_url)
+    dependencies = {pdf_url: pdf_bodies[pdf_url]} if pdf_url else None
+    return await state.remember_async(
+        hop_url, "John I. Haas", bodies, entry, dependencies, parser_version=PARSER_VERSION
+    )
+
+
+def _pdf_entry(pdf_url: str, name: str, pdf_data: Dict) -> Optional[HopEntry]:
+    """Creates a HopEntry from parsed PDF data, or None if it has no brewing data."""
     alpha_from, alpha_to = parse_range(pdf_data["alpha"])
     beta_from, beta_to = parse_range(pdf_data["beta"])
     co_h_from, co_h_to = parse_range(pdf_data["cohumulone"])
@@ -381,48 +558,123 @@ def process_pdf_directly(pdf_url: str, anchor_text: str) -> Optional[HopEntry]:
     return hop_entry
 
 
-def scrape(save: bool = False) -> List[HopEntry]:
-    """Main function to scrape all hops from John I. Haas."""
-    pdf_links, hop_page_links = collect_catalog_links()
+def _entry_for_pdf(pdf_url: str, name: str, pdf_content: Union[bytes, SpooledBody]) -> Optional[HopEntry]:
+    """Parse a downloaded spec sheet, reusing the stored entry if the PDF is unchanged."""
+    previous = state.lookup(pdf_url, pdf_content, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    entry = _pdf_entry(pdf_url, name, run_parser(parse_pdf_data, pdf_content))
+    return state.remember(
+        pdf_url, "John I. Haas", (pdf_content,), entry, parser_version=PARSER_VERSION
+    )
+
+
+async def _entry_for_pdf_async(
+    pdfs: PdfSingleFlight, pdf_url: str, name: str, pdf_content: Union[bytes, SpooledBody]
+) -> Optional[HopEntry]:
+    """Coroutine variant of _entry_for_pdf(); parsing runs on the PDF process pool."""
+    previous = await state.lookup_async(pdf_url, pdf_content, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    pdf_data = await pdfs.data(pdf_url)
+    entry = _pdf_entry(pdf_url, name, pdf_data)
+    return await state.remember_async(
+        pdf_url, "John I. Haas", (pdf_content,), entry, parser_version=PARSER_VERSION
+    )
+
+
+def process_pdf_directly(pdf_url: str, anchor_text: str) -> Optional[HopEntry]:
+    """
+    Creates a HopEntry from a PDF spec sheet directly (used when no hop page exists).
+    The hop name is derived from the anchor text or filename.
+    """
+    # Always derive name from filename: catalog PDFs all have anchor "Download Specs"
+    # which is useless as a hop name.
+    name = hop_name_from_pdf_filename(pdf_url)
+    if not name:
+        return None
+
+    try:
+        pdf_body = _download_pdf(pdf_url)
+    except requests.exceptions.RequestException as e:
+        print(f"  Warning: could not download PDF {pdf_url}: {e}")
+        return None
+
+    return _entry_for_pdf(pdf_url, name, pdf_body)
+
 
-    # Track which PDFs get consumed by hop page processing
-    processed_pdf_urls: Set[str] = set()
+async def process_pdf_directly_async(
+    fetcher: aio.AsyncFetcher,
+    pdf_url: str,
+    anchor_text: str,
+    pdfs: Optional[PdfSingleFlight] = None,
+) -> Optional[HopEntry]:
+    """Coroutine variant of process_pdf_directly(), optionally sharing a PdfSingleFlight."""
+    pdfs = pdfs or PdfSingleFlight(fetcher)
+    name = hop_name_from_pdf_filename(pdf_url)
+    if not name:
+        return None
+
+    try:
+        pdf_body = await pdfs.body(pdf_url)
+    except requests.exceptions.RequestException as e:
+        print(f"  Warning: could not download PDF {pdf_url}: {e}")
+        return None
+
+    return await _entry_for_pdf_async(pdfs, pdf_url, name, pdf_body)
+
+
+async def scrape_async(fetcher: aio.AsyncFetcher) -> List[HopEntry]:
+    """Scrapes all hops from John I. Haas, fetching pages and PDFs concurrently."""
+    pdf_links, hop_page_links = await collect_catalog_links_async(fetcher)
+
+    # Every PDF is downloaded and parsed once; pages record the ones they consume
+    pdfs = PdfSingleFlight(fetcher)
     hop_entries: List[HopEntry] = []
 
     # Phase 1: process each root-level hop variety page (HTML + PDF)
     if hop_page_links:
         print(f"  Processing {len(hop_page_links)} hop variety pages...")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {executor.submit(process_hop_page, url): url for url in hop_page_links}
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result:
-                    hop_entries.append(result)
+        results = await asyncio.gather(
+            *(process_hop_page_async(fetcher, url, pdfs=pdfs) for url in hop_page_links)
+        )
+        hop_entries.extend(result for result in results if result)
     else:
         print("  No root-level hop variety pages found; falling back to PDF-only mode.")
 
-    # Phase 2: process any PDFs not already covered by hop pages.
-    # `processed_pdf_urls` tracks PDFs consumed during Phase 1.  Because hop variety
-    # pages each download their own PDF internally, we approximate the set by skipping
-    # PDFs whose derived filename-name matches a Phase 1 hop name.
+    # Phase 2: process the PDFs no hop page consumed.  PDF entries whose
+    # filename-derived name matches a Phase 1 hop (e.g. a second copy of a
+    # spec sheet under another URL) are still dropped.
     phase1_names = {e.name.lower() for e in hop_entries}
     remaining_pdfs = {url: anchor for url, anchor in pdf_links.items()
-                      if url not in processed_pdf_urls}
+                      if url not in pdfs.consumed}
+    # Only the PDF-only phase still needs bodies, and each of its PDFs once
+    pdfs.release_all_except(remaining_pdfs)
+
+    async def process_remaining(url: str, anchor: str) -> Optional[HopEntry]:
+        try:
+            return await process_pdf_directly_async(fetcher, url, anchor, pdfs)
+        finally:
+            pdfs.release([url])
+
     if remaining_pdfs:
         print(f"  Processing {len(remaining_pdfs)} additional PDFs directly...")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {
-                executor.submit(process_pdf_directly, url, anchor): url
-                for url, anchor in remaining_pdfs.items()
-            }
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result and result.name.lower() not in phase1_names:
-                    hop_entries.append(result)
-                    phase1_names.add(result.name.lower())
+        results = await asyncio.gather(
+            *(process_remaining(url, anchor) for url, anchor in remaining_pdfs.items())
+        )
+        for result in results:
+            if result and result.name.lower() not in phase1_names:
+                hop_entries.append(result)
+                phase1_names.add(result.name.lower())
 
     print(f"\nJohn I. Haas: successfully scraped {len(hop_entries)} hops "
           f"({len(hop_page_links)} pages + {len(remaining_pdfs)} PDFs attempted).")
+    return hop_entries
+
+
+def scrape(save: bool = False) -> List[HopEntry]:
+    """Main function to scrape all hops from John I. Haas."""
+    hop_entries = aio.run(scrape_async)
 
     if save:
         save_hop_entries(hop_entries, "data/johnihaas.json")
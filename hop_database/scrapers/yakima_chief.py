@@ -1,11 +1,24 @@
-from bs4 import BeautifulSoup
-import requests as req
+import asyncio
+import itertools
 import math
 import os
 import re
 import json
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+from .. import aio, http, scheduler, state
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..pagination import paginate
+from ..utils.html import make_soup, only
+
+DEFAULT_URL = "https://www.yakimachief.com/commercial/hop-varieties.html?product_list_limit=all"
+EU_URL = "https://www.yakimachief.eu/commercial/hop-varieties.html?product_list_limit=all"
+STOREFRONT_URLS = (DEFAULT_URL, EU_URL)  # in priority order for shared hop pages
+DETAIL_TIMEOUT = 30
+MAX_CONCURRENCY = 10  # initial concurrent requests per Yakima Chief storefront (adapted by throttle)
+LISTING_PAGE_SIZE = 36  # cards per listing page (one of the storefront's per-page options)
+# Bump when the entries parsed from unchanged pages change, so the state store re-parses them
+PARSER_VERSION = 1
 
 # Known product type keywords and their canonical names
 PRODUCT_TYPE_PATTERNS = [
@@ -298,121 +311,383 @@ def process_name_and_country(name: str):
     cleaned_name = re.sub(r'\s*\(\w+\)$', '', cleaned_name)
     return cleaned_name.strip(), country
 
-def scrape(url="https://www.yakimachief.com/commercial/hop-varieties.html?product_list_limit=all",save=False):
-    r = req.get(url)
-    html = r.text
+def parse_listing_item(hop):
+    """
+    Extract the fields shown on a hop's listing card (li.product-item): link,
+    name, aroma notes, storage and the brewing value ranges.
+
+    Returns None for cards without a name or aroma notes.
+    """
+    href = hop.find("a", {"class": "hop"})["href"]
+    # Extract brewing values
+    product_properties = hop.find("table", {"class": "product-properties"})
+
+    # Aromas
+    product_details = hop.find("div", {"class": "product-item-details-wrapper"})
+    hop_aromas_notes = product_details.find("p", {"class": "product-sight"})
+    if hop_aromas_notes is not None:
+        hop_aromas_notes = hop_aromas_notes.contents[0].strip().split(", ")
+
+    # Name
+    # Some names may have hyphens or spaces; ensure the full name is captured
+    name_elem = product_details.find("a")
+    name = name_elem.get_text(strip=True) if name_elem else ""
+
+    properties_dict = {}
+
+    for row in product_properties("tr"):
+        contents = row.find_all("td")
+        key = contents[0].contents[0].strip(":")
+        value = contents[1].contents[0]
+        properties_dict[key] = value
+
+    alpha_range = properties_dict.get("Alpha", "").split("-")
+    alpha_low = alpha_range[0].strip() if alpha_range else ""
+    alpha_high = alpha_range[1].strip("%") if len(alpha_range) > 1 else ""
+
+    beta_range = properties_dict.get("Beta", "").split("-")
+    beta_low = beta_range[0].strip() if beta_range else ""
+    beta_high = beta_range[1].strip("%") if len(beta_range) > 1 else ""
+
+    co_h_range = properties_dict.get("CO_H", "").split("-")
+    co_h_low = co_h_range[0].strip() if co_h_range else ""
+    co_h_high = co_h_range[1].strip("%") if len(co_h_range) > 1 else ""
+
+    oil_range = properties_dict.get("Oil", "").split("-")
+    oil_low = oil_range[0].strip() if oil_range else ""
+    # Extract only the number from oil_high, removing units like "mL/100g"
+    if len(oil_range) > 1:
+        oil_high_raw = oil_range[1].strip()
+        # Extract just the number part from strings like "3 mL/100g"
+        oil_number_match = re.match(r'^(\d+\.?\d*)', oil_high_raw)
+        oil_high = oil_number_match.group(1) if oil_number_match else ""
+    else:
+        oil_high = ""
+
+    if not (name and hop_aromas_notes):
+        return None
+
+    return {
+        "href": href,
+        "name": name,
+        "notes": hop_aromas_notes,
+        "alpha_from": alpha_low,
+        "alpha_to": alpha_high,
+        "beta_from": beta_low,
+        "beta_to": beta_high,
+        "oil_from": oil_low,
+        "oil_to": oil_high,
+        "co_h_from": co_h_low,
+        "co_h_to": co_h_high,
+        "storage": str(properties_dict.get("Storage", "")).strip(),
+    }
+
+
+def parse_hop_page(html):
+    """
+    Parse an individual hop page.
+
+    Returns a (sensory_data, product_variants, description) tuple.
+    """
+    hop_page_soup = make_soup(html)
+    sensory_data = extract_sensory_analysis(hop_page_soup)
+    product_variants = extract_product_variants(hop_page_soup)
+    description = extract_description(hop_page_soup)
+    return sensory_data, product_variants, description
+
+
+def _build_hop_entry(item, sensory_data, product_variants, description):
+    """Create the HopEntry for a listing card and its parsed individual page."""
+    # Use the function to process the name and country
+    name, country = process_name_and_country(item["name"])
+    hop_entry = HopEntry(
+        name=name,
+        country=country,
+        source="Yakima Chief Hops",
+        href=item["href"],
+        alpha_from=item["alpha_from"],
+        alpha_to=item["alpha_to"],
+        beta_from=item["beta_from"],
+        beta_to=item["beta_to"],
+        oil_from=item["oil_from"],
+        oil_to=item["oil_to"],
+        co_h_from=item["co_h_from"],
+        co_h_to=item["co_h_to"],
+        notes=item["notes"],
+        storage=item["storage"],
+        product_variants=product_variants,
+        description=description,
+    )
+
+    # Set standardized aromas from sensory analysis data
+    hop_entry.set_standardized_aromas("yakima", sensory_data)
+    return hop_entry
+
+
+def _variety_name(item):
+    """Cleaned variety name of a listing item, as used for HopEntry.name."""
+    return process_name_and_country(item["name"])[0]
+
+
+def _is_known(item, known):
+    """True if the listing item's variety name or href is in ``known``."""
+    return bool(known) and (item["href"] in known or _variety_name(item) in known)
+
+
+class DetailPageCache:
+    """
+    Individual hop pages shared by the storefronts of one multi-region scrape.
+
+    A variety listed on several storefronts has its page fetched once, from
+    the first storefront (in priority order) that lists it; the other
+    storefronts reuse the downloaded page.
+    """
+
+    def __init__(self):
+        self._hrefs = {}  # variety name → href on the highest priority storefront
+        self._tasks = {}  # href → task resolving to the page HTML (None on failure)
+
+    def register(self, item):
+        """Record a listing item; the first storefront to list a variety owns its page."""
+        self._hrefs.setdefault(_variety_name(item), item["href"])
+
+    async def get(self, fetcher, item):
+        href = self._hrefs.get(_variety_name(item), item["href"])
+        task = self._tasks.get(href)
+        if task is None:
+            task = self._tasks[href] = asyncio.ensure_future(_fetch_detail_async(fetcher, href))
+        return await task
+
+    def __len__(self):
+        return len(self._tasks)
+
 
-    soup = BeautifulSoup(html, "html.parser")
+async def _fetch_detail_async(fetcher, href):
+    """Fetch one individual hop page; returns its HTML, or None on failure."""
+    try:
+        hop_page_response = await fetcher.get(href, timeout=DETAIL_TIMEOUT)
+        return hop_page_response.text
+    except Exception:
+        return None
+
+
+def _entry_for_card(hop, item, page):
+    """
+    Build the HopEntry for a listing card and its individual page HTML.
+
+    When the card and page are unchanged since the last run the stored entry
+    is reused without parsing the page.
+    """
+    if page is None:
+        return _build_hop_entry(item, {}, [], "")
+    bodies = (str(hop).encode("utf-8"), page.encode("utf-8"))
+    previous = state.lookup(item["href"], *bodies, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    try:
+        detail = parse_hop_page(page)
+    except Exception:
+        return _build_hop_entry(item, {}, [], "")
+    entry = _build_hop_entry(item, *detail)
+    return state.remember(
+        item["href"], "Yakima Chief Hops", bodies, entry, parser_version=PARSER_VERSION
+    )
+
+
+async def _entry_for_card_async(hop, item, page):
+    """Coroutine variant of _entry_for_card(); the state store is used off the event loop."""
+    if page is None:
+        return _build_hop_entry(item, {}, [], "")
+    bodies = (str(hop).encode("utf-8"), page.encode("utf-8"))
+    previous = await state.lookup_async(item["href"], *bodies, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    try:
+        detail = parse_hop_page(page)
+    except Exception:
+        return _build_hop_entry(item, {}, [], "")
+    entry = _build_hop_entry(item, *detail)
+    return await state.remember_async(
+        item["href"], "Yakima Chief Hops", bodies, entry, parser_version=PARSER_VERSION
+    )
 
-    hop_data = soup.find_all("li", {"class": "item product product-item"})
-    hop_entries = []
-    total_hops = len(hop_data)
-    print(f"Found {total_hops} hops to process...")
 
-    import concurrent.futures
+def process_hop(i, hop, known=None):
+    """
+    Build the HopEntry for listing card ``hop``, fetching its individual page
+    once for sensory analysis, product variants and description.
 
-    def process_hop(i, hop):
+    Cards whose variety name or href is in ``known`` are skipped (None).
+    """
+    try:
+        item = parse_listing_item(hop)
+        if item is None or _is_known(item, known):
+            return None
         try:
-            href = hop.find("a", {"class": "hop"})["href"]
-            # Extract brewing values
-            product_properties = hop.find("table", {"class": "product-properties"})
-
-            # Aromas
-            product_details = hop.find("div", {"class": "product-item-details-wrapper"})
-            hop_aromas_notes = product_details.find("p", {"class": "product-sight"})
-            if hop_aromas_notes is not None:
-                hop_aromas_notes = hop_aromas_notes.contents[0].strip().split(", ")
-
-            # Name
-            # Some names may have hyphens or spaces; ensure the full name is captured
-            name_elem = product_details.find("a")
-            name = name_elem.get_text(strip=True) if name_elem else ""
-            # name = product_details.find("a").contents[0].strip()
-
-            properties_dict = {}
-
-            for row in product_properties("tr"):
-                contents = row.find_all("td")
-                key = contents[0].contents[0].strip(":")
-                value = contents[1].contents[0]
-                properties_dict[key] = value
-
-            alpha_range = properties_dict.get("Alpha", "").split("-")
-            alpha_low = alpha_range[0].strip() if alpha_range else ""
-            alpha_high = alpha_range[1].strip("%") if len(alpha_range) > 1 else ""
-
-            beta_range = properties_dict.get("Beta", "").split("-")
-            beta_low = beta_range[0].strip() if beta_range else ""
-            beta_high = beta_range[1].strip("%") if len(beta_range) > 1 else ""
-
-            co_h_range = properties_dict.get("CO_H", "").split("-")
-            co_h_low = co_h_range[0].strip() if co_h_range else ""
-            co_h_high = co_h_range[1].strip("%") if len(co_h_range) > 1 else ""
-
-            oil_range = properties_dict.get("Oil", "").split("-")
-            oil_low = oil_range[0].strip() if oil_range else ""
-            # Extract only the number from oil_high, removing units like "mL/100g"
-            if len(oil_range) > 1:
-                oil_high_raw = oil_range[1].strip()
-                # Extract just the number part from strings like "3 mL/100g"
-                import re
-                oil_number_match = re.match(r'^(\d+\.?\d*)', oil_high_raw)
-                oil_high = oil_number_match.group(1) if oil_number_match else ""
-            else:
-                oil_high = ""
-
-            if name and hop_aromas_notes:
-                # Fetch individual hop page once for sensory analysis, product variants and description
-                description = ""
-                try:
-                    hop_page_response = req.get(href, timeout=30)
-                    hop_page_soup = BeautifulSoup(hop_page_response.text, "html.parser")
-                    sensory_data = extract_sensory_analysis(hop_page_soup)
-                    product_variants = extract_product_variants(hop_page_soup)
-                    description = extract_description(hop_page_soup)
-                except Exception:
-                    sensory_data = {}
-                    product_variants = []
-
-                # Use the function to process the name and country
-                name, country = process_name_and_country(name)
-                # Create HopEntry directly
-                hop_entry = HopEntry(
-                    name=name,
-                    country=country,
-                    source="Yakima Chief Hops",
-                    href=href,
-                    alpha_from=alpha_low,
-                    alpha_to=alpha_high,
-                    beta_from=beta_low,
-                    beta_to=beta_high,
-                    oil_from=oil_low,
-                    oil_to=oil_high,
-                    co_h_from=co_h_low,
-                    co_h_to=co_h_high,
-                    notes=hop_aromas_notes,
-                    storage=str(properties_dict.get("Storage", "")).strip(),
-                    product_variants=product_variants,
-                    description=description,
-                )
+            page = http.get(item["href"], timeout=DETAIL_TIMEOUT).text
+        except Exception:
+            page = None
+        return _entry_for_card(hop, item, page)
+    except Exception as e:
+        print(f"Error processing hop {i}: {e}")
+        return None
 
-                # Set standardized aromas from sensory analysis data
-                hop_entry.set_standardized_aromas("yakima", sensory_data)
-                return hop_entry
-        except Exception as e:
-            print(f"Error processing hop {i}: {e}")
+
+async def process_hop_async(fetcher, i, hop, known=None, detail_cache=None):
+    """Coroutine variant of process_hop(), optionally sharing a DetailPageCache."""
+    try:
+        item = parse_listing_item(hop)
+        if item is None or _is_known(item, known):
             return None
+        if detail_cache is not None:
+            page = await detail_cache.get(fetcher, item)
+        else:
+            page = await _fetch_detail_async(fetcher, item["href"])
+        return await _entry_for_card_async(hop, item, page)
+    except Exception as e:
+        print(f"Error processing hop {i}: {e}")
+        return None
+
+
+def listing_page_url(url, page):
+    """URL of page ``page`` (1-based) of a storefront listing, LISTING_PAGE_SIZE cards per page."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update(product_list_limit=str(LISTING_PAGE_SIZE), p=str(page))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _listing_cards(response):
+    # Only the product cards are built from a listing page
+    product_item = {"class": "item product product-item"}
+    soup = make_soup(response.text, parse_only=only("li", product_item))
+    return soup.find_all("li", product_item)
+
+
+def _listing_page_count(response, cards):
+    """Page count from the toolbar ("Items 1-36 of 120" or "7 Items"), None if missing."""
+    toolbar = make_soup(response.text, parse_only=only("p", id="toolbar-amount")).find("p")
+    if toolbar is None or not cards:
+        return None
+    text = toolbar.get_text(" ", strip=True)
+    match = re.search(r"of\s+(\d+)", text) or re.search(r"(\d+)\s+Items?", text)
+    if match is None:
+        return None
+    # The storefront may ignore an unsupported per-page option, so use the cards actually served
+    return math.ceil(int(match.group(1)) / len(cards))
+
+
+async def iter_listing_pages(fetcher, url=DEFAULT_URL):
+    """
+    Yield (page number, product cards) of a storefront listing as its pages arrive.
+
+    The page count is read from the first page and the other pages are fetched
+    concurrently.  Magento answers out-of-range page numbers with the last
+    page, so nothing is fetched speculatively: if the first page is full but
+    has no page count, the rest of the listing is taken from ``url`` itself.
+    """
+    pages = 0
+    cards_seen = 0
+    async for number, cards in paginate(
+        fetcher,
+        lambda page: listing_page_url(url, page),
+        _listing_cards,
+        LISTING_PAGE_SIZE,
+        count_pages=_listing_page_count,
+        window=0,
+    ):
+        pages += 1
+        cards_seen += len(cards)
+        yield number, cards
+    if pages == 1 and cards_seen >= LISTING_PAGE_SIZE:
+        r = await fetcher.get(url, priority=scheduler.LISTING)
+        rest = _listing_cards(r)[cards_seen:]
+        if rest:
+            yield 2, rest
+
+
+async def fetch_listing_async(fetcher, url=DEFAULT_URL):
+    """Fetch every page of a storefront listing and return its product cards in listing order."""
+    pages = {number: cards async for number, cards in iter_listing_pages(fetcher, url)}
+    hop_data = [card for number in sorted(pages) for card in pages[number]]
+    print(f"Found {len(hop_data)} hops to process...")
+    return hop_data
+
+
+async def scrape_async(fetcher, url=DEFAULT_URL, known=None, hop_data=None, detail_cache=None):
+    """
+    Fetch the listing pages, then every individual hop page concurrently.
+
+    Hop pages are requested as soon as the listing page that links them
+    arrives, without waiting for the rest of the listing.
+
+    Args:
+        known: Variety names or hrefs to skip entirely (no detail fetch).
+        hop_data: Already fetched listing cards; the listing is not fetched again.
+        detail_cache: DetailPageCache shared with other storefronts.
+    """
+    counter = itertools.count(1)
 
-    hop_entries = []
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(process_hop, i, hop)
-            for i, hop in enumerate(hop_data, 1)
+    def process(cards):
+        return [
+            asyncio.ensure_future(process_hop_async(fetcher, next(counter), hop, known, detail_cache))
+            for hop in cards
         ]
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                hop_entries.append(result)
+
+    if hop_data is not None:
+        tasks = process(hop_data)
+    else:
+        pages = {}
+        async for number, cards in iter_listing_pages(fetcher, url):
+            pages[number] = process(cards)
+        tasks = [task for number in sorted(pages) for task in pages[number]]
+        print(f"Found {len(tasks)} hops to process...")
+
+    results = await asyncio.gather(*tasks)
+    return [result for result in results if result]
+
+
+async def scrape_storefronts_async(fetcher, urls=STOREFRONT_URLS):
+    """
+    Scrape several storefronts with one shared DetailPageCache.
+
+    All listings are fetched first so every variety's page is fetched once,
+    from the first storefront in ``urls`` that lists it.  Returns one list of
+    HopEntry per storefront, in ``urls`` order.
+    """
+    listings = await asyncio.gather(*(fetch_listing_async(fetcher, url) for url in urls))
+
+    detail_cache = DetailPageCache()
+    for hop_data in listings:
+        for hop in hop_data:
+            try:
+                item = parse_listing_item(hop)
+            except Exception:
+                continue
+            if item is not None:
+                detail_cache.register(item)
+
+    results = await asyncio.gather(
+        *(
+            scrape_async(fetcher, url, hop_data=hop_data, detail_cache=detail_cache)
+            for url, hop_data in zip(urls, listings)
+        )
+    )
+    print(f"Fetched {len(detail_cache)} hop pages for {len(urls)} storefronts")
+    return results
+
+
+def scrape(url=DEFAULT_URL, save=False, known=None):
+    """
+    Scrape one storefront.
+
+    Args:
+        known: Optional set of variety names or hrefs that are already known
+            (e.g. from another storefront); their cards are skipped without
+            fetching their individual pages.
+    """
+    http.configure_host(url, pool_size=MAX_CONCURRENCY)
+    hop_entries = aio.run(lambda fetcher: scrape_async(fetcher, url, known=known))
 
     # Save using the model's save function
     output_file = "data/yakimachiefhops.json"
@@ -422,6 +697,19 @@ def scrape(url="https://www.yakimachief.com/commercial/hop-varieties.html?produc
     return hop_entries
 
 
+def scrape_storefronts(urls=STOREFRONT_URLS, save=False):
+    """Scrape several regional storefronts, sharing individual hop pages across them."""
+    for url in urls:
+        http.configure_host(url, pool_size=MAX_CONCURRENCY)
+    results = aio.run(lambda fetcher: scrape_storefronts_async(fetcher, urls))
+
+    output_file = "data/yakimachiefhops.json"
+    if save:
+        save_hop_entries([entry for entries in results for entry in entries], output_file)
+
+    return results
+
+
 def main():
     scrape()
 
@@ -6,24 +6,25 @@ Uses the Shopify storefront JSON API for reliable data extraction.
 This source provides brewing values (alpha, beta, cohumulone, oil) without sensory analysis.
 """
 
+import json
 import re
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
 
+from .. import aio, http, state
 from ..models.hop_model import HopEntry, save_hop_entries
+from ..pagination import paginate
+from ..utils.html import make_soup
 
 BASE_URL = "https://yakimavalleyhops.com"
 PRODUCTS_API_URL = "https://yakimavalleyhops.com/collections/all-hops/products.json"
+PAGE_SIZE = 250  # Shopify maximum per page
+PAGE_CONCURRENCY = 4  # product pages requested at once
+# Bump when the entries parsed from unchanged pages change, so the state store re-parses them
+PARSER_VERSION = 1
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
+http.configure_host(BASE_URL, pool_size=PAGE_CONCURRENCY, timeout=20)
 
 # Tags used by Yakima Valley Hops to indicate country of origin
 COUNTRY_TAG_MAP = {
@@ -96,7 +97,7 @@ def extract_brewing_values(body_html: str) -> dict:
     if not body_html:
         return {}
 
-    soup = BeautifulSoup(body_html, "html.parser")
+    soup = make_soup(body_html)
     plain_text = soup.get_text(" ", strip=True)
     brewing_data = {}
 
@@ -139,7 +140,7 @@ def extract_notes(body_html: str) -> List[str]:
     if not body_html:
         return []
 
-    soup = BeautifulSoup(body_html, "html.parser")
+    soup = make_soup(body_html)
 
     # Look for aroma/flavor descriptors in specific sections
     notes = []
@@ -194,7 +195,7 @@ def process_product(product: dict) -> Optional[HopEntry]:
         # Extract description from product body_html
         description = ""
         if body_html:
-            desc_soup = BeautifulSoup(body_html, "html.parser")
+            desc_soup = make_soup(body_html)
             for p in desc_soup.find_all("p"):
                 text = p.get_text(strip=True)
                 if len(text) > 60 and not re.match(
@@ -205,7 +206,7 @@ def process_product(product: dict) -> Optional[HopEntry]:
         if not description:
             description = product.get("body_html", "")
             if description:
-                description = BeautifulSoup(description, "html.parser").get_text(strip=True)
+                description = make_soup(description).get_text(strip=True)
                 description = description[:500].strip() if len(description) > 500 else description
 
         # Skip entries with no meaningful brewing data
@@ -236,54 +237,96 @@ def process_product(product: dict) -> Optional[HopEntry]:
         return None
 
 
+async def _entry_for_product_async(product: dict) -> Optional[HopEntry]:
+    """
+    process_product(), reusing the stored entry if the product JSON is
+    unchanged; the state store is used off the event loop.
+    """
+    handle = product.get("handle", "")
+    product_url = f"{BASE_URL}/products/{handle}" if handle else f"{BASE_URL}#{product.get('id', '')}"
+    body = json.dumps(product, sort_keys=True).encode("utf-8")
+    previous = await state.lookup_async(product_url, body, parser_version=PARSER_VERSION)
+    if previous is not None:
+        return state.reuse(previous)
+    return await state.remember_async(
+        product_url, "Yakima Valley Hops", (body,), process_product(product), parser_version=PARSER_VERSION
+    )
+
+
+def _products_page_url(page: int) -> str:
+    return f"{PRODUCTS_API_URL}?limit={PAGE_SIZE}&page={page}"
+
+
+def _page_products(response: requests.Response) -> List[dict]:
+    return response.json().get("products", [])
+
+
+async def iter_product_pages(fetcher: aio.AsyncFetcher) -> AsyncIterator[Tuple[int, List[dict]]]:
+    """
+    Yield (page number, products) from the Shopify storefront JSON API as
+    pages arrive; pages are fetched concurrently (Shopify reports no page
+    count, so a few pages are requested ahead of the last full one).
+    """
+    try:
+        async for number, products in paginate(
+            fetcher,
+            _products_page_url,
+            _page_products,
+            PAGE_SIZE,
+            window=PAGE_CONCURRENCY,
+            timeout=20,
+        ):
+            print(f"  Fetched page {number}: {len(products)} products")
+            yield number, products
+    except requests.exceptions.RequestException as e:
+        print(f"  Error fetching Yakima Valley Hops products: {e}")
+
+
 def get_all_products() -> List[dict]:
     """
     Fetches all hop products from the Shopify storefront JSON API.
-    Handles pagination automatically.
+    Handles pagination automatically, fetching pages concurrently.
     """
-    all_products = []
-    page = 1
-    limit = 250  # Shopify maximum per page
-
-    while True:
-        url = f"{PRODUCTS_API_URL}?limit={limit}&page={page}"
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=20)
-            response.raise_for_status()
-            data = response.json()
-            products = data.get("products", [])
-            if not products:
-                break
-            all_products.extend(products)
-            print(f"  Fetched page {page}: {len(products)} products (total so far: {len(all_products)})")
-            if len(products) < limit:
-                break
-            page += 1
-        except requests.exceptions.RequestException as e:
-            print(f"  Error fetching Yakima Valley Hops products (page {page}): {e}")
-            break
 
-    return all_products
+    async def collect(fetcher: aio.AsyncFetcher) -> List[dict]:
+        pages = {number: products async for number, products in iter_product_pages(fetcher)}
+        return [product for number in sorted(pages) for product in pages[number]]
 
+    return aio.run(collect)
 
-def scrape(save: bool = False) -> List[HopEntry]:
-    """Main function to scrape all hops from Yakima Valley Hops."""
-    print("Fetching products from Yakima Valley Hops API...")
-    products = get_all_products()
 
-    if not products:
-        print("No products found for Yakima Valley Hops.")
-        return []
-
-    print(f"Processing {len(products)} products...")
+async def _process_products(products: List[dict]) -> List[HopEntry]:
     hop_entries = []
     for product in products:
-        entry = process_product(product)
+        entry = await _entry_for_product_async(product)
         if entry:
             hop_entries.append(entry)
             print(f"  Processed: {entry.name} (alpha: {entry.alpha_from}-{entry.alpha_to}%)")
+    return hop_entries
+
+
+async def scrape_async(fetcher: aio.AsyncFetcher) -> List[HopEntry]:
+    """Fetch the product pages concurrently and process each page as it arrives."""
+    print("Fetching products from Yakima Valley Hops API...")
+    pages = {}
+    product_count = 0
+    async for number, products in iter_product_pages(fetcher):
+        product_count += len(products)
+        pages[number] = await _process_products(products)
 
-    print(f"\nYakima Valley Hops: successfully scraped {len(hop_entries)} of {len(products)} products.")
+    if not product_count:
+        print("No products found for Yakima Valley Hops.")
+        return []
+
+    # Catalog order, whatever order the pages arrived in
+    hop_entries = [entry for number in sorted(pages) for entry in pages[number]]
+    print(f"\nYakima Valley Hops: successfully scraped {len(hop_entries)} of {product_count} products.")
+    return hop_entries
+
+
+def scrape(save: bool = False) -> List[HopEntry]:
+    """Main function to scrape all hops from Yakima Valley Hops."""
+    hop_entries = aio.run(scrape_async)
 
     if save:
         save_hop_entries(hop_entries, "data/yakimavalleyhops.json")
@@ -0,0 +1,290 @@
+"""
+Incremental scraping state
+
+A small SQLite database that remembers, for every scraped URL, the SHA-256 of
+the body (or bodies) a ``HopEntry`` was parsed from, together with that entry.
+When a page comes back with the same content on the next run, the scrapers
+reuse the stored entry instead of running BeautifulSoup or pdfplumber again,
+so only new or changed varieties are parsed.
+
+Every stored entry also records the version of the parser that built it:
+each scraper declares a ``PARSER_VERSION`` and a stored entry is only reused
+under the same version, so bumping it (whenever a parser change alters the
+entries built from the same pages) re-parses that source's pages once.
+
+Entries built from more than one download (a hop page plus its PDF spec sheet)
+record the extra URLs as dependencies; the stored entry is only reused when
+the page and every dependency are unchanged.
+
+The store also keeps the complete entry list of each source's last successful
+scrape, so a run can fall back to it for a source that fails or misses its
+deadline.
+"""
+
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from .download import SpooledBody
+from .models.hop_model import HopEntry
+
+# Bump when the schema changes (a parser change bumps its scraper's PARSER_VERSION)
+STATE_VERSION = 2
+
+_store: Optional["StateStore"] = None
+
+
+def content_hash(*bodies: Union[bytes, SpooledBody]) -> str:
+    """SHA-256 over one or more bodies (length-prefixed, so boundaries matter)."""
+    digest = hashlib.sha256()
+    for body in bodies:
+        digest.update(len(body).to_bytes(8, "big"))
+        if isinstance(body, SpooledBody):
+            for chunk in body.iter_chunks():
+                digest.update(chunk)
+        else:
+            digest.update(body)
+    return digest.hexdigest()
+
+
+def _entry_to_json(entry: Optional[HopEntry]) -> Optional[str]:
+    if entry is None:
+        return None
+    return json.dumps(
+        {f.name: getattr(entry, f.name) for f in dataclasses.fields(HopEntry)}
+    )
+
+
+def _entry_from_json(data: Optional[str]) -> Optional[HopEntry]:
+    if data is None:
+        return None
+    return HopEntry(**json.loads(data))
+
+
+@dataclass
+class PageState:
+    """What was parsed from a URL the last time its content changed."""
+
+    content_hash: str
+    entry: Optional[HopEntry]
+    # url → content hash of each extra body the entry was built from
+    dependencies: Dict[str, str] = field(default_factory=dict)
+
+    def dependencies_unchanged(self, bodies: Dict[str, Union[bytes, SpooledBody]]) -> bool:
+        """True if ``bodies`` ({url: body}) are exactly the stored dependencies, unchanged."""
+        return set(bodies) == set(self.dependencies) and all(
+            self.dependencies[url] == content_hash(body) for url, body in bodies.items()
+        )
+
+    async def dependencies_unchanged_async(self, bodies: Dict[str, Union[bytes, SpooledBody]]) -> bool:
+        """Coroutine variant of dependencies_unchanged(); hashes on the loop's default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.dependencies_unchanged, bodies)
+
+
+class StateStore:
+    """SQLite-backed map of URL → (content hash, parsed HopEntry)."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._stats: Counter = Counter()
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or int(row[0]) != STATE_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS pages")
+                self._conn.execute("DROP TABLE IF EXISTS sources")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (str(STATE_VERSION),),
+                )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    parser_version INTEGER NOT NULL,
+                    dependencies TEXT NOT NULL,
+                    entry TEXT,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY,
+                    entries TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of 'reused' and 'parsed' pages in this process."""
+        with self._lock:
+            return dict(self._stats)
+
+    def lookup(self, url: str, *bodies: bytes, parser_version: int) -> Optional[PageState]:
+        """
+        Return the stored state for ``url`` if ``bodies`` hash to the stored
+        content hash and the entry was built by ``parser_version``, otherwise
+        None (new or changed page, or a changed parser).
+        """
+        digest = content_hash(*bodies)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, parser_version, dependencies, entry FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None or row[0] != digest or row[1] != parser_version:
+            return None
+        return PageState(row[0], _entry_from_json(row[3]), json.loads(row[2]))
+
+    def save(
+        self,
+        url: str,
+        source: str,
+        bodies: tuple,
+        entry: Optional[HopEntry],
+        dependencies: Optional[Dict[str, Union[bytes, SpooledBody]]] = None,
+        *,
+        parser_version: int,
+    ) -> None:
+        """
+        Store the entry ``parser_version`` parsed from ``bodies`` (and the
+        dependency bodies) for ``url``.
+        """
+        dependency_hashes = {
+            dep_url: content_hash(body) for dep_url, body in (dependencies or {}).items()
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    source,
+                    content_hash(*bodies),
+                    parser_version,
+                    json.dumps(dependency_hashes),
+                    _entry_to_json(entry),
+                    time.time(),
+                ),
+            )
+            self._stats["parsed"] += 1
+
+    def save_source(self, source: str, entries: List[HopEntry]) -> None:
+        """Store the complete result of a successful scrape of ``source``."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+                (source, json.dumps([_entry_to_json(entry) for entry in entries]), time.time()),
+            )
+
+    def previous_source(self, source: str) -> Optional[Tuple[List[HopEntry], float]]:
+        """The entries and time (epoch seconds) of the last stored scrape of ``source``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entries, updated_at FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        if row is None:
+            return None
+        return [_entry_from_json(data) for data in json.loads(row[0])], row[1]
+
+    def count_reuse(self) -> None:
+        with self._lock:
+            self._stats["reused"] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def set_store(store: Optional[StateStore]) -> None:
+    """Install (or with None, remove) the state store used by the scrapers."""
+    global _store
+    _store = store
+
+
+def get_store() -> Optional[StateStore]:
+    """The installed state store, if any."""
+    return _store
+
+
+def lookup(url: str, *bodies: bytes, parser_version: int) -> Optional[PageState]:
+    """
+    Stored state for ``url`` when its content and parser are unchanged (None
+    without a store).
+    """
+    if _store is None:
+        return None
+    return _store.lookup(url, *bodies, parser_version=parser_version)
+
+
+async def lookup_async(url: str, *bodies: bytes, parser_version: int) -> Optional[PageState]:
+    """
+    Coroutine variant of lookup(): hashing, the SQLite read and the wait for
+    the store's lock run on the loop's default executor.
+    """
+    if _store is None:
+        return None
+    return await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(_store.lookup, url, *bodies, parser_version=parser_version)
+    )
+
+
+def reuse(state: PageState) -> Optional[HopEntry]:
+    """Count a reused page and return its stored entry."""
+    if _store is not None:
+        _store.count_reuse()
+    return state.entry
+
+
+def remember(
+    url: str,
+    source: str,
+    bodies: tuple,
+    entry: Optional[HopEntry],
+    dependencies: Optional[Dict[str, Union[bytes, SpooledBody]]] = None,
+    *,
+    parser_version: int,
+) -> Optional[HopEntry]:
+    """Record the entry ``parser_version`` parsed for ``url`` (no-op without a store) and return it."""
+    if _store is not None:
+        _store.save(url, source, bodies, entry, dependencies, parser_version=parser_version)
+    return entry
+
+
+async def remember_async(
+    url: str,
+    source: str,
+    bodies: tuple,
+    entry: Optional[HopEntry],
+    dependencies: Optional[Dict[str, Union[bytes, SpooledBody]]] = None,
+    *,
+    parser_version: int,
+) -> Optional[HopEntry]:
+    """Coroutine variant of remember(); the store is written on the loop's default executor."""
+    if _store is not None:
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                _store.save, url, source, bodies, entry, dependencies, parser_version=parser_version
+            ),
+        )
+    return entry
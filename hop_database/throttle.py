@@ -0,0 +1,188 @@
+"""
+Adaptive per-host concurrency limits for all fetches
+
+Each supplier host gets an ``AdaptiveLimiter`` that decides how many requests
+may be in flight at once, using AIMD (additive increase, multiplicative
+decrease) as in TCP congestion control:
+
+* every successful response while the limit is saturated adds ``1 / limit``,
+  i.e. roughly one extra slot per round of ``limit`` responses, as long as the
+  smoothed latency stays within LATENCY_TOLERANCE of the fastest latency seen;
+* a timeout, 429 or 5xx halves the limit (at most once per latency window, so a
+  burst of failures from one overloaded moment counts as a single signal).
+
+The limit starts at the pool size registered with ``http.configure_host()``
+and moves between ``minimum`` and ``maximum``.  Limiters live for the whole
+process, so what was learned about a host carries over between scrapes, and
+``report()`` prints each host's decisions at the end of a run.
+
+Limiters do not queue requests themselves: the scheduler (``scheduler.py``)
+asks ``try_acquire()`` when it dispatches a waiting fetch, and reports each
+outcome through ``release()``.  Their state is guarded by a thread lock, since
+sources run on their own threads.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from . import http
+
+DEFAULT_MAX_LIMIT = 32     # ceiling for a host's in-flight requests (and its connection pool size)
+DEFAULT_MIN_LIMIT = 1
+DECREASE_FACTOR = 0.5      # multiplicative decrease on timeouts, 429s and 5xx
+LATENCY_TOLERANCE = 3.0    # stop growing once latency exceeds this × the fastest seen
+LATENCY_SMOOTHING = 0.2    # EWMA weight of the newest latency sample
+
+# Outcomes passed to AdaptiveLimiter.release()
+SUCCESS = "success"
+TIMEOUT = "timeout"
+THROTTLED = "throttled"        # HTTP 429
+SERVER_ERROR = "server_error"  # HTTP 5xx
+FAILED = "failed"              # other errors: counted, but do not move the limit
+
+_CONGESTION = (TIMEOUT, THROTTLED, SERVER_ERROR)
+
+_limiters: Dict[str, "AdaptiveLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def outcome_for_status(status_code: int) -> str:
+    """Classify an HTTP status for the limiter."""
+    if status_code == 429:
+        return THROTTLED
+    if status_code >= 500:
+        return SERVER_ERROR
+    return SUCCESS
+
+
+class AdaptiveLimiter:
+    """AIMD-controlled concurrency limit for one host."""
+
+    def __init__(
+        self,
+        host: str,
+        initial: int,
+        minimum: int = DEFAULT_MIN_LIMIT,
+        maximum: int = DEFAULT_MAX_LIMIT,
+    ):
+        self.host = host
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._saturated = False  # a request was refused since the last release
+        self._latency: Optional[float] = None   # EWMA of successful responses
+        self._fastest: Optional[float] = None
+        self._last_decrease = 0.0
+        self._counts: Counter = Counter()
+        self._peak_limit = int(self._limit)
+        self._peak_in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        with self._lock:
+            return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free under the current limit."""
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                self._saturated = True
+                return False
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            return True
+
+    def release(self, started: float, outcome: str) -> None:
+        """Free a slot and adapt the limit to how the request (started at ``started``) went."""
+        now = time.monotonic()
+        elapsed = now - started
+        with self._lock:
+            saturated = self._saturated or self._in_flight >= int(self._limit)
+            self._saturated = False
+            self._in_flight -= 1
+            self._counts[outcome] += 1
+            if outcome == SUCCESS:
+                self._observe_latency(elapsed)
+                if saturated and self._latency_healthy() and self._limit < self.maximum:
+                    previous = int(self._limit)
+                    self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+                    if int(self._limit) > previous:
+                        self._counts["increases"] += 1
+                        self._peak_limit = max(self._peak_limit, int(self._limit))
+            elif outcome in _CONGESTION:
+                window = self._latency or elapsed
+                # Requests started before the last decrease reflect the old limit
+                if started >= self._last_decrease or now - self._last_decrease > window:
+                    if self._limit > self.minimum:
+                        self._limit = max(float(self.minimum), self._limit * DECREASE_FACTOR)
+                        self._counts["decreases"] += 1
+                    self._last_decrease = now
+
+    def _observe_latency(self, elapsed: float) -> None:
+        if self._latency is None:
+            self._latency = elapsed
+        else:
+            self._latency += LATENCY_SMOOTHING * (elapsed - self._latency)
+        if self._fastest is None or elapsed < self._fastest:
+            self._fastest = elapsed
+
+    def _latency_healthy(self) -> bool:
+        if self._latency is None or not self._fastest:
+            return True
+        return self._latency <= self._fastest * LATENCY_TOLERANCE
+
+    def stats(self) -> Dict[str, float]:
+        """Current limit, peaks, latency and per-outcome/decision counters."""
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "peak_limit": self._peak_limit,
+                "peak_in_flight": self._peak_in_flight,
+                "in_flight": self._in_flight,
+                "latency": self._latency or 0.0,
+                "fastest": self._fastest or 0.0,
+                **{key: self._counts[key] for key in (SUCCESS, *_CONGESTION, FAILED, "increases", "decreases")},
+            }
+
+
+def limiter(url_or_host: str) -> AdaptiveLimiter:
+    """The process-wide limiter for a host, created from its configured pool size."""
+    host = http.host_of(url_or_host)
+    with _limiters_lock:
+        result = _limiters.get(host)
+        if result is None:
+            result = _limiters[host] = AdaptiveLimiter(host, http.host_pool_size(host))
+        return result
+
+
+def all_stats() -> Dict[str, Dict[str, float]]:
+    """Stats of every host limiter used so far, keyed by host."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {item.host: item.stats() for item in limiters}
+
+
+def report() -> List[str]:
+    """One line per host describing its concurrency decisions."""
+    lines = []
+    for host, s in sorted(all_stats().items()):
+        congestion = s[TIMEOUT] + s[THROTTLED] + s[SERVER_ERROR]
+        lines.append(
+            f"  {host:<28} limit {s['limit']:>2} (peak {s['peak_limit']:>2}, "
+            f"max in flight {s['peak_in_flight']:>2})  "
+            f"+{s['increases']}/-{s['decreases']}  "
+            f"{s[SUCCESS]} ok, {congestion} congested, {s[FAILED]} failed  "
+            f"latency {s['latency']:.2f}s (best {s['fastest']:.2f}s)"
+        )
+    return lines
+
+
+def reset() -> None:
+    """Forget every host limiter (limits start again from the pool sizes)."""
+    with _limiters_lock:
+        _limiters.clear()
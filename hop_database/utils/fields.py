@@ -0,0 +1,104 @@
+"""
+Declarative parsing of range fields in structured supplier data
+
+Suppliers that publish JSON (the Hopsteiner dataset, Shopify and WordPress
+APIs) give brewing values as strings such as ``"13.0 - 17.0"`` or ``"3.5"``.
+Instead of splitting and converting each field by hand, a scraper declares
+its fields once as ``RangeField`` specs and ``parse_ranges()`` parses every
+field of every record in one pass, column by column.
+
+The result is columnar: ``low[name]`` and ``high[name]`` hold one value per
+record, in record order.  A single value fills both ends of the range.
+Missing keys and values that do not convert are not raised: the record gets
+the field's ``default`` at both ends and a ``FieldError`` is added to
+``errors`` so the scraper can report it.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class RangeField:
+    """A ``"low - high"`` (or single value) field of a JSON record."""
+
+    key: str
+    convert: Callable[[str], Any] = float
+    separator: str = " - "
+    default: Any = ""  # both ends of a missing or malformed value
+    column: str = ""  # name of the parsed columns (defaults to key)
+
+    @property
+    def name(self) -> str:
+        return self.column or self.key
+
+
+@dataclass
+class FieldError:
+    """A value that could not be parsed."""
+
+    row: int
+    key: str
+    value: Any
+    reason: str
+
+    def __str__(self) -> str:
+        return f"record {self.row}: {self.key}={self.value!r} ({self.reason})"
+
+
+@dataclass
+class RangeColumns:
+    """Parsed range columns, keyed by field name, one value per record."""
+
+    rows: int
+    low: Dict[str, List[Any]]
+    high: Dict[str, List[Any]]
+    errors: List[FieldError]
+
+    def range(self, name: str, row: int) -> tuple:
+        """The ``(low, high)`` pair of one record."""
+        return self.low[name][row], self.high[name][row]
+
+
+def _parse_column(values: List[Any], spec: RangeField, errors: List[FieldError]) -> tuple:
+    convert, separator, default = spec.convert, spec.separator, spec.default
+    low, high = [], []
+    for row, value in enumerate(values):
+        try:
+            if value is _MISSING:
+                raise KeyError("missing")
+            first, sep, last = value.partition(separator)
+            if sep:
+                a, b = convert(first), convert(last)
+            else:
+                a = b = convert(value)
+        except KeyError:
+            errors.append(FieldError(row, spec.key, None, "missing"))
+            a = b = default
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append(FieldError(row, spec.key, value, str(e)))
+            a = b = default
+        low.append(a)
+        high.append(b)
+    return low, high
+
+
+def parse_ranges(records: Sequence[Mapping[str, Any]], fields: Sequence[RangeField]) -> RangeColumns:
+    """
+    Parse the range ``fields`` of every record.
+
+    Args:
+        records: The decoded JSON records.
+        fields: Specs of the range fields; two specs may not share a name.
+
+    Returns:
+        RangeColumns with a low and a high column per field and the errors
+        found, in field then record order.
+    """
+    columns = RangeColumns(len(records), {}, {}, [])
+    for spec in fields:
+        values = [record.get(spec.key, _MISSING) for record in records]
+        columns.low[spec.name], columns.high[spec.name] = _parse_column(values, spec, columns.errors)
+    return columns
@@ -0,0 +1,69 @@
+"""
+HTML parsing helpers shared by the scrapers
+
+``make_soup()`` builds BeautifulSoup trees with the stdlib "html.parser".
+lxml (a C parser, several times faster) is opt-in through ``set_parser()``:
+it is not a declared dependency, and its trees differ from "html.parser"'s
+on malformed markup, so the scrapers' output is only checked against the
+default builder.
+
+Most pages are only read for a handful of nodes, so scrapers pass a
+``SoupStrainer`` from ``only()`` as ``parse_only``: elements outside the
+strainer are never turned into Tag objects, which keeps large listing pages
+cheap to parse.  Strainers are only used where the scraper never looks
+outside the matched elements (no ``.parent`` walks, no whole-page text).
+"""
+
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+
+# Tree builder used by make_soup() unless a call overrides it, see set_parser()
+PARSER = "html.parser"
+
+_parser = PARSER
+
+
+def set_parser(parser: Optional[str]) -> None:
+    """
+    Set the tree builder make_soup() uses (None restores PARSER).
+
+    Raises:
+        ValueError: If BeautifulSoup has no such builder installed (e.g.
+            "lxml" without the lxml package).
+    """
+    if parser is not None and builder_registry.lookup(parser) is None:
+        raise ValueError(f"HTML parser {parser!r} is not available; is it installed?")
+    global _parser
+    _parser = parser or PARSER
+
+
+def get_parser() -> str:
+    """The tree builder make_soup() uses."""
+    return _parser
+
+
+def only(name, attrs: Optional[dict] = None, **kwargs) -> SoupStrainer:
+    """
+    A strainer for ``make_soup(..., parse_only=...)`` that keeps only the
+    elements matching ``name``/``attrs`` (same arguments as ``find_all``).
+    """
+    return SoupStrainer(name, attrs or {}, **kwargs)
+
+
+def make_soup(
+    markup: Union[str, bytes],
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    Parse ``markup`` with the configured tree builder.
+
+    Args:
+        markup: HTML as text or bytes.
+        parse_only: Optional strainer restricting which elements are built.
+        parser: Override the tree builder (defaults to get_parser()).
+    """
+    return BeautifulSoup(markup, parser or _parser, parse_only=parse_only)
@@ -0,0 +1,274 @@
+"""
+PDF extraction and process-pool execution for PDF parsing
+
+``open_pdf()`` opens a spec sheet once as a ``PdfDocument`` whose pages
+extract their text, tables and words on first access, so each parser pays
+only for the pdfplumber passes it reads; ``extract_pdf()`` runs the requested
+passes up front and closes the PDF.
+
+pdfplumber and pdfminer are pure Python and hold the GIL, so parsing spec
+sheets on the fetch threads (or the event loop) serialises the whole crawl on
+one core.  The scrapers keep doing network I/O on threads/asyncio and hand the
+downloaded bytes to ``run_parser()`` / ``run_parser_async()``, which parse them
+on a ``ProcessPoolExecutor`` sized to the CPU count and return plain dicts.
+
+Parsers are module-level functions decorated with ``@cached_pdf_parser``: the
+parse-result cache is consulted in the parent process, and only cache misses
+are shipped to a worker.  Spooled downloads that rolled over to disk are sent
+to the worker as a file path rather than as bytes.  Each parse shipped to the
+pool holds a PARSE slot of the global scheduler, whose parse budget follows
+the pool size.  With ``configure(workers=0)`` everything runs in-process,
+exactly as before (run_parser_async() then parses on the event loop's
+default executor).
+"""
+
+import asyncio
+import atexit
+import importlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .. import scheduler
+from ..cache import get_pdf_cache
+from ..download import SpooledBody
+
+WORD_TOLERANCE = 5  # x/y tolerance used when grouping characters into words
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_workers: Optional[int] = None  # None → os.cpu_count()
+
+
+class PdfPage:
+    """One PDF page; its text, tables and words are extracted on first access."""
+
+    def __init__(self, page):
+        self._page = page
+
+    def _open_page(self):
+        if self._page is None:
+            raise ValueError("PDF is closed; extract this page's contents inside open_pdf()")
+        return self._page
+
+    @cached_property
+    def text(self) -> str:
+        return self._open_page().extract_text() or ""
+
+    @cached_property
+    def tables(self) -> List[List[List[Optional[str]]]]:
+        return self._open_page().extract_tables() or []
+
+    @cached_property
+    def words(self) -> List[Dict[str, Any]]:
+        page = self._open_page()
+        try:
+            return page.extract_words(x_tolerance=WORD_TOLERANCE, y_tolerance=WORD_TOLERANCE)
+        except Exception:
+            return []
+
+    def close(self) -> None:
+        """Forget the pdfplumber page; contents not extracted yet are no longer available."""
+        self._page = None
+
+
+@dataclass
+class PdfDocument:
+    """The pages of a PDF opened by open_pdf() or extract_pdf()."""
+
+    pages: List[PdfPage] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Text of all pages, each followed by a newline."""
+        return "".join(page.text + "\n" for page in self.pages)
+
+
+def pdfplumber_available() -> bool:
+    """True if pdfplumber can be imported."""
+    try:
+        import pdfplumber  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@contextmanager
+def open_pdf(pdf_content: Union[bytes, str, SpooledBody]) -> Iterator[PdfDocument]:
+    """
+    Open ``pdf_content`` once for the block; each page pass (text, tables,
+    words) runs only when a parser first reads it.
+
+    Args:
+        pdf_content: The PDF bytes, a path to the PDF, or a spooled download.
+
+    Raises:
+        ImportError: If pdfplumber is not installed.
+        Exception: Whatever pdfplumber raises for unreadable PDFs.
+    """
+    import pdfplumber
+
+    with ExitStack() as stack:
+        if isinstance(pdf_content, SpooledBody):
+            # pdfplumber only closes the streams it opened itself
+            source = stack.enter_context(pdf_content.open())
+        elif isinstance(pdf_content, str):
+            source = pdf_content
+        else:
+            source = io.BytesIO(pdf_content)
+        pdf = stack.enter_context(pdfplumber.open(source))
+        doc = PdfDocument([PdfPage(page) for page in pdf.pages])
+        try:
+            yield doc
+        finally:
+            for page in doc.pages:
+                page.close()
+
+
+def extract_pdf(
+    pdf_content: Union[bytes, str, SpooledBody], tables: bool = False, words: bool = False
+) -> PdfDocument:
+    """
+    Open ``pdf_content`` once and extract the text, and on request the tables
+    and words, of every page.
+
+    Args:
+        pdf_content: The PDF bytes, a path to the PDF, or a spooled download.
+        tables: Also extract the tables of every page.
+        words: Also extract the words (with their positions) of every page.
+
+    Raises:
+        ImportError: If pdfplumber is not installed.
+        Exception: Whatever pdfplumber raises for unreadable PDFs.
+    """
+    with open_pdf(pdf_content) as doc:
+        # Read now, so the passes stay available once the PDF is closed
+        for page in doc.pages:
+            page.text
+            if tables:
+                page.tables
+            if words:
+                page.words
+    return doc
+
+
+def configure(workers: Optional[int] = None) -> None:
+    """
+    Set the number of parser processes (None = CPU count, 0 = parse in-process).
+
+    An already running pool is shut down and recreated on next use.
+    """
+    global _workers
+    shutdown()
+    _workers = workers
+    scheduler.configure(parse_budget=worker_count() or 1)
+
+
+def worker_count() -> int:
+    """Number of parser processes that will be used (0 = in-process)."""
+    if _workers is None:
+        return os.cpu_count() or 1
+    return max(0, _workers)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if worker_count() == 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # "spawn" rather than fork: the parent runs fetch threads and
+                # event loops whose locks must not be copied into the children
+                _pool = ProcessPoolExecutor(
+                    max_workers=worker_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown() -> None:
+    """Stop the parser processes (they are started again on demand)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def _call_parser(module: str, name: str, pdf_content: Union[bytes, str]) -> Any:
+    """Worker entry point: run the undecorated parser ``module.name`` on bytes or a path."""
+    parser = getattr(importlib.import_module(module), name)
+    return getattr(parser, "__wrapped__", parser)(pdf_content)
+
+
+def _picklable(pdf_content: Union[bytes, SpooledBody]) -> Union[bytes, str]:
+    if isinstance(pdf_content, SpooledBody):
+        return pdf_content.source()
+    return pdf_content
+
+
+def _parse_on_pool(pool: ProcessPoolExecutor, parser: Callable, pdf_content: Union[bytes, SpooledBody]) -> Any:
+    with scheduler.slot(scheduler.PARSE):
+        return pool.submit(
+            _call_parser, parser.__module__, parser.__name__, _picklable(pdf_content)
+        ).result()
+
+
+def _cache_key(parser: Callable):
+    return getattr(parser, "cache_name", None), getattr(parser, "cache_version", None)
+
+
+def run_parser(parser: Callable, pdf_content: Union[bytes, SpooledBody]) -> Any:
+    """
+    Parse ``pdf_content`` with ``parser`` on the process pool and return the result.
+
+    Blocks the calling thread; coroutines should use run_parser_async().
+    """
+    pool = _get_pool()
+    if pool is None:
+        return parser(pdf_content)
+    cache = get_pdf_cache()
+    name, version = _cache_key(parser)
+    if cache is not None and name is not None:
+        return cache.get_or_parse(
+            name, version, lambda content: _parse_on_pool(pool, parser, content), pdf_content
+        )
+    return _parse_on_pool(pool, parser, pdf_content)
+
+
+async def _parse_on_pool_async(pool: ProcessPoolExecutor, parser: Callable, pdf_content: Union[bytes, SpooledBody]) -> Any:
+    loop = asyncio.get_running_loop()
+    async with scheduler.slot_async(scheduler.PARSE):
+        return await loop.run_in_executor(
+            pool, _call_parser, parser.__module__, parser.__name__, _picklable(pdf_content)
+        )
+
+
+async def run_parser_async(parser: Callable, pdf_content: Union[bytes, SpooledBody]) -> Any:
+    """
+    Coroutine variant of run_parser(); the event loop keeps fetching meanwhile.
+
+    Nothing blocking runs on the loop: an in-process parse and the cache's
+    hashing and disk I/O go to the loop's default executor.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    if pool is None:
+        return await loop.run_in_executor(None, parser, pdf_content)
+    cache = get_pdf_cache()
+    name, version = _cache_key(parser)
+    if cache is not None and name is not None:
+        return await cache.get_or_parse_async(
+            name, version, lambda content: _parse_on_pool_async(pool, parser, content), pdf_content
+        )
+    return await _parse_on_pool_async(pool, parser, pdf_content)
@@ -6,14 +6,23 @@ This script runs all hop scrapers, combines the raw data into 'hops.json',
 and then merges the data into a standardized 'merged_hops.json' file.
 """
 
+import argparse
 import os
 import json
+import queue
 import re
-from collections import defaultdict
-from typing import Dict, List, Optional, Union
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 # Import the data model and scrapers
+from hop_database import http, scheduler, state, throttle
+from hop_database.archive import RawArchive
+from hop_database.cache import HttpCache, PdfParseCache, set_pdf_cache
+from hop_database.models import aroma_scaling, merge
 from hop_database.models.hop_model import HopEntry, save_hop_entries
+from hop_database.utils import html
+from hop_database.utils import pdf as pdf_workers
 from hop_database.scrapers import yakima_chief, barth_haas, hopsteiner, crosby_hops, john_i_haas, yakima_valley_hops, hops_australia
 
 
@@ -43,12 +52,6 @@ def normalize_hop_name(name):
     name = re.sub(r'\s+hops?$', '', name)
     return name.strip()
 
-def get_safe_float(value, default=0.0):
-    """Safely converts a value to a float."""
-    if value is None or value == '': return default
-    try: return float(value)
-    except (ValueError, TypeError): return default
-
 INVALID_HOP_NAMES = {"hop varieties", "hop variety", "all hops", "unknown"}
 
 # Add a mapping for known equivalent hop names
@@ -61,256 +64,410 @@ MERGE_NAME_ALIASES = {
     # Add more aliases as needed
 }
 
-def scale_aroma_values_by_source(hops_data: List[HopEntry]) -> List[HopEntry]:
+DEFAULT_AROMA_SCALING = "global-max"  # see aroma_scaling.STRATEGIES
+
+def scale_aroma_values_by_source(
+    hops_data: List[HopEntry], strategy: str = DEFAULT_AROMA_SCALING
+) -> List[HopEntry]:
     """
     Scale aroma values to 0-5 range based on the maximum value found for each source.
     This ensures each producer's data is properly normalized relative to their own scale.
+
+    ``strategy`` names the reference value of a source (see
+    ``aroma_scaling.STRATEGIES``): its largest value ("global-max"), the
+    largest value of each category ("category-max") or a percentile.
     """
-    # Group hops by source to analyze their aroma ranges
-    source_max_values = defaultdict(lambda: defaultdict(float))
-    
-    # First pass: find the maximum aroma value for each source and aroma category
-    for hop in hops_data:
-        if hop.source and isinstance(hop.standardized_aromas, dict):
-            for aroma_category, value in hop.standardized_aromas.items():
-                if isinstance(value, (int, float)) and value > 0:
-                    current_max = source_max_values[hop.source][aroma_category]
-                    source_max_values[hop.source][aroma_category] = max(current_max, float(value))
-    
-    # Calculate overall max for each source (across all aroma categories)
-    source_overall_max = {}
-    for source, aroma_maxes in source_max_values.items():
-        if aroma_maxes:
-            source_overall_max[source] = max(aroma_maxes.values())
-        else:
-            source_overall_max[source] = 1.0  # Default to prevent division by zero
-    
+    report = aroma_scaling.scale_by_source(hops_data, aroma_scaling.STRATEGIES[strategy])
+
     print("\nAroma scaling analysis by source:")
-    for source, max_val in source_overall_max.items():
+    for source, max_val in report.maxima.items():
         print(f"  {source}: max aroma value = {max_val}")
-    
-    # Track which sources need scaling to avoid duplicate messages
-    scaled_sources = set()
-    
-    # Second pass: scale the aroma values
-    for hop in hops_data:
-        if hop.source and isinstance(hop.standardized_aromas, dict):
-            overall_max = source_overall_max.get(hop.source, 1.0)
-            
-            # Only scale if the max value is greater than 5
-            if overall_max > 5:
-                scale_factor = 5.0 / overall_max
-                
-                # Print scaling message only once per source
-                if hop.source not in scaled_sources:
-                    print(f"  Scaling {hop.source} by factor {scale_factor:.3f}")
-                    scaled_sources.add(hop.source)
-                
-                for aroma_category in hop.standardized_aromas:
-                    original_value = hop.standardized_aromas[aroma_category]
-                    if isinstance(original_value, (int, float)) and original_value > 0:
-                        scaled_value = original_value * scale_factor
-                        # Round to 1 decimal place and ensure it's within 0-5
-                        hop.standardized_aromas[aroma_category] = min(5.0, max(0.0, round(scaled_value, 1)))
-            else:
-                # Even if no scaling needed, ensure values are clamped to 0-5 and rounded
-                for aroma_category in hop.standardized_aromas:
-                    original_value = hop.standardized_aromas[aroma_category]
-                    if isinstance(original_value, (int, float)):
-                        hop.standardized_aromas[aroma_category] = min(5.0, max(0.0, round(float(original_value), 1)))
-    
+    for source, (low, high) in report.factors.items():
+        if low == high:
+            print(f"  Scaling {source} by factor {low:.3f}")
+        else:
+            print(f"  Scaling {source} by factors {low:.3f}-{high:.3f}")
+
     return hops_data
 
 def merge_hops(hops_data: List[HopEntry]) -> List[HopEntry]:
     """Merges a list of HopEntry objects into a standardized list."""
-    grouped_hops = defaultdict(list)
-    for hop in hops_data:
-        normalized_name = normalize_hop_name(hop.name)
+    group_keys = {}
+    for name in dict.fromkeys(hop.name for hop in hops_data):
+        normalized_name = normalize_hop_name(name)
         normalized_name = MERGE_NAME_ALIASES.get(normalized_name, normalized_name)
         if normalized_name and normalized_name not in INVALID_HOP_NAMES:
-            grouped_hops[normalized_name].append(hop)
-
-    merged_hops = []
-    for name, entries in grouped_hops.items():
-        if not entries: continue
-
-        final_hop = HopEntry(name=name.capitalize())
-        
-        all_notes = set()
-        all_countries = []
-        all_sources = set()
-        all_hrefs = []
-        all_standardized_aromas = []
-        all_storage = []
-        all_descriptions = []
-
-        range_values = defaultdict(lambda: {'from': [], 'to': []})
-        additional_props_values = defaultdict(lambda: {'from': [], 'to': []})
-
-        # Collect product variants, merged by type using min/max for numeric range fields
-        all_product_variants: Dict[str, Dict] = {}
-        _range_min_keys = {"alpha_from", "beta_from", "oil_from", "co_h_from"}
-        _range_max_keys = {"alpha_to", "beta_to", "oil_to", "co_h_to"}
-
-        for hop in entries:
-            all_notes.update([note.strip().lower() for note in hop.notes if note])
-            if hop.country: all_countries.append(normalize_country(hop.country))
-            if hop.source: all_sources.add(hop.source)
-            if hop.href: all_hrefs.append(hop.href)
-            if hop.storage: all_storage.append(hop.storage)
-            if hop.description: all_descriptions.append(hop.description)
-
-            if isinstance(hop.standardized_aromas, dict):
-                all_standardized_aromas.append(hop.standardized_aromas)
-
-            for key in ["alpha", "beta", "oil", "co_h"]:
-                range_values[key]['from'].append(get_safe_float(getattr(hop, f"{key}_from")))
-                range_values[key]['to'].append(get_safe_float(getattr(hop, f"{key}_to")))
-
-            for prop_key, prop_val in hop.additional_properties.items():
-                if prop_key.endswith("_from"):
-                    base_key = prop_key[:-5]
-                    additional_props_values[base_key]['from'].append(get_safe_float(prop_val))
-                elif prop_key.endswith("_to"):
-                    base_key = prop_key[:-3]
-                    additional_props_values[base_key]['to'].append(get_safe_float(prop_val))
-
-            # Merge product variants by type using min/max for numeric range fields
-            for variant in getattr(hop, 'product_variants', []):
-                variant_type = variant.get("type", "")
-                if not variant_type:
-                    continue
-                existing = all_product_variants.get(variant_type)
-                if existing is None:
-                    all_product_variants[variant_type] = dict(variant)
-                    continue
-                merged = dict(existing)
-                for key, value in variant.items():
-                    if value in (None, ""):
-                        continue
-                    if key in _range_min_keys:
-                        new_val = get_safe_float(value)
-                        existing_num = get_safe_float(merged.get(key))
-                        if existing_num == 0:
-                            merged[key] = value
-                        elif new_val > 0:
-                            merged[key] = str(min(existing_num, new_val))
-                    elif key in _range_max_keys:
-                        new_val = get_safe_float(value)
-                        existing_num = get_safe_float(merged.get(key))
-                        if existing_num == 0:
-                            merged[key] = value
-                        elif new_val > 0:
-                            merged[key] = str(max(existing_num, new_val))
-                    else:
-                        if not merged.get(key):
-                            merged[key] = value
-                all_product_variants[variant_type] = merged
-
-        final_hop.notes = sorted(list(all_notes))
-        final_hop.description = all_descriptions[0] if all_descriptions else ""
-        final_hop.country = all_countries[0] if all_countries else ""
-        final_hop.source = " / ".join(sorted(list(all_sources)))
-        # Store all unique hrefs, separated by " | " for multiple sources
-        unique_hrefs = list(dict.fromkeys(all_hrefs))  # Remove duplicates while preserving order
-        final_hop.href = " | ".join(unique_hrefs) if unique_hrefs else ""
-        # Use the first available storage value (deduplicated)
-        unique_storage = list(dict.fromkeys(all_storage))
-        final_hop.storage = " / ".join(unique_storage) if unique_storage else ""
-
-        for key, values in range_values.items():
-            from_vals = [v for v in values['from'] if v > 0]
-            to_vals = [v for v in values['to'] if v > 0]
-            setattr(final_hop, f"{key}_from", min(from_vals) if from_vals else 0.0)
-            setattr(final_hop, f"{key}_to", max(to_vals) if to_vals else 0.0)
-
-        aroma_aggregator = defaultdict(lambda: {'sum': 0, 'count': 0})
-        for aroma_dict in all_standardized_aromas:
-            for aroma, value in aroma_dict.items():
-                if value > 0:
-                    aroma_aggregator[aroma]['sum'] += value
-                    aroma_aggregator[aroma]['count'] += 1
-        
-        # Re-initialize aromas in final_hop before populating
-        final_hop.standardized_aromas = {aroma: 0 for aroma in final_hop.standardized_aromas}
-        for aroma, data in aroma_aggregator.items():
-            if data['count'] > 0:
-                final_hop.standardized_aromas[aroma] = round(data['sum'] / data['count'], 2)
-
-        for base_key, values in additional_props_values.items():
-            from_vals = [v for v in values['from'] if v > 0]
-            to_vals = [v for v in values['to'] if v > 0]
-            final_hop.additional_properties[f"{base_key}_from"] = min(from_vals) if from_vals else 0.0
-            final_hop.additional_properties[f"{base_key}_to"] = max(to_vals) if to_vals else 0.0
-
-        # Attach collected product variants (sorted by type name for consistency)
-        final_hop.product_variants = sorted(
-            list(all_product_variants.values()), key=lambda v: v.get("type", "")
-        )
-
-        merged_hops.append(final_hop)
+            group_keys[name] = normalized_name
 
-    return merged_hops
+    entries = [hop for hop in hops_data if hop.name in group_keys]
+    return merge.merge_entries(entries, [group_keys[hop.name] for hop in entries], normalize_country)
 
 def _require_hops(results: list, source: str, min_count: int = 1) -> list:
     """Raise an error if a scraper returned fewer hops than expected."""
     if len(results) < min_count:
         raise RuntimeError(
             f"Scraper '{source}' returned {len(results)} hops (expected >= {min_count}). "
-            "Data collection is incomplete — aborting."
+            "Data collection is incomplete."
         )
     return results
 
 
-def main():
-    """Run all scrapers, combine the data, and then merge it."""
-    print("Starting hop data scraping...")
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'http')
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'archive')
+DEFAULT_ARCHIVE_KEEP = 10
+DEFAULT_STATE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'state.sqlite3')
+DEFAULT_PDF_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pdf')
+DEFAULT_SOURCE_DEADLINE = 1200  # seconds each source may take before it is abandoned
+# Seconds a late source gets to stop at its next fetch (or parse) after its deadline
+SOURCE_GRACE_PERIOD = 60
 
-    # --- Run all scrapers ---
-    print("\nScraping Yakima Chief Hops...")
-    ych = _require_hops(yakima_chief.scrape(save=False), "Yakima Chief Hops (US)")
-    print(f"Found {len(ych)} hops from Yakima Chief")
 
-    ych_eu = _require_hops(
-        yakima_chief.scrape(url="https://www.yakimachief.eu/commercial/hop-varieties.html?product_list_limit=all", save=False),
-        "Yakima Chief Hops (EU)",
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses command line options for a scraping run."""
+    parser = argparse.ArgumentParser(
+        description="Scrape all hop sources and merge them into hops.json."
+    )
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR,
+        help="Directory of the persistent HTTP cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-max-age", type=float, default=0,
+        help="Seconds a cached response is reused without revalidation "
+             "(default: 0, always revalidate with ETag/Last-Modified)",
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=int, default=1024,
+        help="Size bound of the HTTP cache in MiB; least recently used entries are evicted",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Disable the HTTP cache and download everything again",
+    )
+    parser.add_argument(
+        "--state-db", default=DEFAULT_STATE_DB,
+        help="SQLite database of content hashes and parsed entries (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--pdf-cache-dir", default=DEFAULT_PDF_CACHE_DIR,
+        help="Directory of cached PDF parse results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--pdf-cache-max-mb", type=int, default=64,
+        help="Size bound of the PDF parse cache in MiB; least recently used results are evicted",
+    )
+    parser.add_argument(
+        "--pdf-workers", type=int, default=None,
+        help="Processes used to parse PDFs (default: CPU count; 0 parses on the fetch threads)",
+    )
+    parser.add_argument(
+        "--max-fetches", type=int, default=scheduler.DEFAULT_FETCH_BUDGET,
+        help="Requests in flight across all sources and hosts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--source-deadline", type=float, default=DEFAULT_SOURCE_DEADLINE,
+        help="Seconds each source may run before it is abandoned and its previous "
+             "entries are used instead (default: %(default)s; 0 disables)",
+    )
+    parser.add_argument(
+        "--strict", action="store_true",
+        help="Abort the run when a source fails or misses its deadline instead of "
+             "falling back to its entries from the previous run",
+    )
+    parser.add_argument(
+        "--allow-missing-sources", action="store_true",
+        help="Publish without a source that failed and has no previous run to fall "
+             "back on, instead of aborting the run",
+    )
+    parser.add_argument(
+        "--no-state", action="store_true",
+        help="Parse every page and PDF again, even if its content is unchanged "
+             "(disables the state store and the PDF parse cache)",
     )
-    print(f"Found {len(ych_eu)} hops from Yakima Chief EU")
+    parser.add_argument(
+        "--archive-dir", default=DEFAULT_ARCHIVE_DIR,
+        help="Directory of the raw capture archive (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-archive", action="store_true",
+        help="Do not record the raw pages, JSON payloads and PDFs of this run",
+    )
+    parser.add_argument(
+        "--archive-keep", type=int, default=DEFAULT_ARCHIVE_KEEP, metavar="N",
+        help="Keep only the N most recent archived runs, deleting older ones and "
+             "the captures only they used (0 keeps every run; default: %(default)s)",
+    )
+    parser.add_argument(
+        "--from-archive", metavar="RUN_ID",
+        help="Re-parse an archived run ('latest' for the most recent) without any network I/O",
+    )
+    parser.add_argument(
+        "--aroma-scaling", choices=sorted(aroma_scaling.STRATEGIES), default=DEFAULT_AROMA_SCALING,
+        help="Reference value each source's aromas are scaled to 0-5 by (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--html-parser", choices=("html.parser", "lxml"), default=html.PARSER,
+        help="BeautifulSoup tree builder (default: %(default)s).  lxml is faster but "
+             "must be installed separately and may parse malformed pages differently",
+    )
+    args = parser.parse_args(argv)
+    try:
+        html.set_parser(args.html_parser)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
-    ych_us_names = {hop.name for hop in ych}
-    ych_combined = ych + [hop for hop in ych_eu if hop.name not in ych_us_names]
 
-    print("\nScraping Barth Haas...")
-    bh = _require_hops(barth_haas.scrape(save=False), "Barth Haas")
-    print(f"Found {len(bh)} hops from Barth Haas")
+def scrape_yakima_chief() -> List[HopEntry]:
+    """
+    Scrapes the US and EU Yakima Chief storefronts with shared hop pages and
+    keeps EU entries only for varieties the US storefront does not list.
+    """
+    ych, ych_eu = yakima_chief.scrape_storefronts(
+        [yakima_chief.DEFAULT_URL, yakima_chief.EU_URL], save=False
+    )
+    _require_hops(ych, "Yakima Chief Hops (US)")
+    _require_hops(ych_eu, "Yakima Chief Hops (EU)")
+    print(f"Found {len(ych)} hops from Yakima Chief, {len(ych_eu)} from Yakima Chief EU")
+
+    ych_us_names = {hop.name for hop in ych}
+    return ych + [hop for hop in ych_eu if hop.name not in ych_us_names]
+
+
+# (source, scraper) pairs run concurrently by scrape_all_sources(); the
+# combined output keeps this order regardless of which source finishes first.
+SOURCES = [
+    ("Yakima Chief Hops", scrape_yakima_chief),
+    ("Barth Haas", lambda: barth_haas.scrape(save=False)),
+    ("Hopsteiner", lambda: hopsteiner.scrape(save=False)),
+    ("Crosby Hops", lambda: crosby_hops.scrape(save=False)),
+    ("John I. Haas", lambda: john_i_haas.scrape(save=False)),
+    ("Yakima Valley Hops", lambda: yakima_valley_hops.scrape(save=False)),
+    ("Hop Products Australia", lambda: hops_australia.scrape(save=False)),
+]
+
+
+def _timed_scrape(scraper, budget: Optional[float]) -> Tuple[Optional[list], Optional[BaseException], float]:
+    """Runs one scraper under a wall-clock budget and returns (hops, error, seconds)."""
+    start = time.perf_counter()
+    try:
+        with http.deadline(budget):
+            return scraper(), None, time.perf_counter() - start
+    except Exception as exc:
+        return None, exc, time.perf_counter() - start
+
+
+def _previous_hops(source: str) -> Optional[List[HopEntry]]:
+    """The entries of the last successful scrape of ``source``, if the state store has them."""
+    store = state.get_store()
+    previous = store.previous_source(source) if store is not None else None
+    if previous is None:
+        return None
+    hops, saved_at = previous
+    age_hours = (time.time() - saved_at) / 3600
+    print(f"  {source}: using {len(hops)} hops from the previous run ({age_hours:.1f}h old)")
+    return hops
+
+
+# Thread of each source started by the last scrape_all_sources() call
+_source_threads: Dict[str, threading.Thread] = {}
+
+
+def running_sources() -> List[str]:
+    """Sources of the last scrape_all_sources() call whose threads have not exited."""
+    return [source for source, thread in _source_threads.items() if thread.is_alive()]
+
+
+def scrape_all_sources(
+    source_deadline: Optional[float] = DEFAULT_SOURCE_DEADLINE,
+    strict: bool = False,
+    allow_missing: bool = False,
+) -> List[HopEntry]:
+    """
+    Runs every scraper concurrently and returns the combined raw hop entries.
+
+    Each source runs on its own thread (the concurrent scrapers drive their own
+    event loop there), so the run takes about as long as the slowest source.
+    With a ``source_deadline`` a source's fetches fail and its event loop is
+    cancelled once the deadline passes; a late source is then given
+    SOURCE_GRACE_PERIOD seconds to stop, so this returns at most that long
+    after the deadline.  A source still running then is left behind on its
+    (daemon) thread and reported by running_sources(), so the caller can keep
+    the resources it may still use open.
+
+    Every source is awaited before the _require_hops() checks are applied, so
+    the timing report is complete even when a source comes back empty.  A
+    source that failed, came back empty or missed its deadline is replaced by
+    the entries of its last successful run (kept in the state store); with
+    ``strict`` such a source aborts the run instead.  A source without a
+    previous run aborts the run too, unless ``allow_missing`` leaves it out.
+    """
+    print(f"\nScraping {len(SOURCES)} sources concurrently...")
+    start = time.perf_counter()
+    results = {}
+    finished = queue.Queue()
+    _source_threads.clear()
+    for source, scraper in SOURCES:
+        thread = _source_threads[source] = threading.Thread(
+            target=lambda source=source, scraper=scraper: finished.put(
+                (source, _timed_scrape(scraper, source_deadline))
+            ),
+            name=f"source-{source}",
+            daemon=True,
+        )
+        thread.start()
 
-    print("\nScraping Hopsteiner...")
-    hs = _require_hops(hopsteiner.scrape(save=False), "Hopsteiner")
-    print(f"Found {len(hs)} hops from Hopsteiner")
+    give_up_at = None if source_deadline is None else start + source_deadline + SOURCE_GRACE_PERIOD
+    while len(results) < len(SOURCES):
+        try:
+            if give_up_at is None:
+                source, result = finished.get()
+            else:
+                source, result = finished.get(timeout=max(0.0, give_up_at - time.perf_counter()))
+        except queue.Empty:
+            break
+        _source_threads[source].join()
+        hops, error, elapsed = results[source] = result
+        if error is not None:
+            print(f"  {source} failed after {elapsed:.1f}s: {error}")
+        else:
+            print(f"  {source}: {len(hops)} hops in {elapsed:.1f}s")
+    for source, _ in SOURCES:
+        if source not in results:
+            error = http.DeadlineExceeded(
+                f"still running {SOURCE_GRACE_PERIOD}s after its {source_deadline:.0f}s deadline"
+            )
+            results[source] = (None, error, time.perf_counter() - start)
+            print(f"  {source} did not stop within {SOURCE_GRACE_PERIOD}s of its deadline; leaving it behind")
+
+    print(f"\nPer-source timings (wall clock {time.perf_counter() - start:.1f}s):")
+    for source, (hops, error, elapsed) in sorted(results.items(), key=lambda item: -item[1][2]):
+        outcome = "failed" if error is not None else f"{len(hops)} hops"
+        print(f"  {source:<26} {elapsed:7.1f}s  {outcome}")
+
+    concurrency = throttle.report()
+    if concurrency:
+        print("\nAdaptive per-host concurrency:")
+        for line in concurrency:
+            print(line)
+
+    scheduling = scheduler.report()
+    if scheduling:
+        print("\nScheduler (fetch and parse slots):")
+        for line in scheduling:
+            print(line)
+
+    source_hops = {}
+    missing = []
+    store = state.get_store()
+    for source, _ in SOURCES:
+        hops, error, _ = results[source]
+        try:
+            if error is not None:
+                raise error
+            source_hops[source] = _require_hops(hops, source)
+        except Exception as exc:
+            if strict:
+                raise
+            previous = _previous_hops(source)
+            if previous is None:
+                print(f"  {source}: no previous run to fall back on ({exc})")
+                missing.append(source)
+            source_hops[source] = previous or []
+        else:
+            if store is not None:
+                store.save_source(source, hops)
+    if missing and not allow_missing:
+        raise RuntimeError(
+            f"No hops and no previous run for {', '.join(missing)}; "
+            "pass --allow-missing-sources to publish without them"
+        )
 
-    print("\nScraping Crosby Hops...")
-    crosby = _require_hops(crosby_hops.scrape(save=False), "Crosby Hops")
-    print(f"Found {len(crosby)} hops from Crosby Hops")
+    # --- Combine all entries ---
+    combined_hop_entries = [hop for source, _ in SOURCES for hop in source_hops[source]]
+    print(f"\nTotal raw hop entries: {len(combined_hop_entries)}")
+    return combined_hop_entries
 
-    print("\nScraping John I. Haas...")
-    jih = _require_hops(john_i_haas.scrape(save=False), "John I. Haas")
-    print(f"Found {len(jih)} hops from John I. Haas")
 
-    print("\nScraping Yakima Valley Hops...")
-    yvh = _require_hops(yakima_valley_hops.scrape(save=False), "Yakima Valley Hops")
-    print(f"Found {len(yvh)} hops from Yakima Valley Hops")
+def main(argv: Optional[List[str]] = None):
+    """Run all scrapers, combine the data, and then merge it."""
+    args = parse_args(argv)
+
+    cache = None
+    store = None
+    pdf_cache = None
+    pdf_workers.configure(args.pdf_workers)
+    scheduler.configure(fetch_budget=args.max_fetches)
+    archive_run = None
+    if args.from_archive:
+        # Replay mode: every fetch is answered from the archive, never the network
+        archive_run = RawArchive(args.archive_dir).open_run(args.from_archive)
+        http.set_archive(archive_run)
+        print(f"Re-parsing archived run {archive_run.run_id} ({len(archive_run)} responses)...")
+    else:
+        if not args.no_cache:
+            cache = HttpCache(
+                args.cache_dir,
+                max_age=args.cache_max_age,
+                max_bytes=args.cache_max_mb * 1024 * 1024,
+            )
+            http.set_cache(cache)
+        if not args.no_state:
+            store = state.StateStore(args.state_db)
+            state.set_store(store)
+            pdf_cache = PdfParseCache(
+                args.pdf_cache_dir, max_bytes=args.pdf_cache_max_mb * 1024 * 1024
+            )
+            set_pdf_cache(pdf_cache)
+        if not args.no_archive:
+            archive_run = RawArchive(args.archive_dir).new_run()
+            http.set_archive(archive_run)
+        print("Starting hop data scraping...")
 
-    print("\nScraping Hop Products Australia (hops.com.au)...")
-    hpa = _require_hops(hops_australia.scrape(save=False), "Hop Products Australia")
-    print(f"Found {len(hpa)} hops from Hop Products Australia")
+    # --- Run all scrapers ---
+    try:
+        combined_hop_entries = scrape_all_sources(
+            args.source_deadline or None, args.strict, args.allow_missing_sources
+        )
+    finally:
+        # Sources left behind past their deadline may still use the state store
+        # and the PDF workers; those are then left to process exit.  What they
+        # still capture is not archived, but their entries are not used either.
+        left_behind = running_sources()
+        # Keep whatever was captured, even if a source aborted the run
+        if archive_run is not None and not archive_run.replaying:
+            archive_run.save()
+            print(f"\nArchived {len(archive_run)} raw responses as run {archive_run.run_id}")
+            if args.archive_keep > 0:
+                try:
+                    pruned_runs, pruned_blobs = archive_run.archive.prune(args.archive_keep)
+                except OSError as e:
+                    print(f"Warning: could not prune the archive: {e}")
+                else:
+                    if pruned_runs:
+                        print(f"Pruned {pruned_runs} old archived runs ({pruned_blobs} unused captures)")
+        http.set_archive(None)
+        if not left_behind:
+            pdf_workers.shutdown()
+        if store is not None:
+            stats = store.stats
+            print(
+                f"Incremental state: {stats.get('reused', 0)} unchanged pages reused, "
+                f"{stats.get('parsed', 0)} parsed"
+            )
+            state.set_store(None)
+            if not left_behind:
+                store.close()
+        if pdf_cache is not None:
+            stats = pdf_cache.stats
+            print(
+                f"PDF parse cache: {stats.get('hits', 0)} hits, {stats.get('misses', 0)} parsed"
+            )
+            set_pdf_cache(None)
 
-    # --- Combine all entries ---
-    combined_hop_entries = ych_combined + bh + hs + crosby + jih + yvh + hpa
-    print(f"\nTotal raw hop entries: {len(combined_hop_entries)}")
-    
     # --- Scale aroma values by source before merging ---
     print("\nScaling aroma values by source...")
-    scaled_hop_entries = scale_aroma_values_by_source(combined_hop_entries)
+    scaled_hop_entries = scale_aroma_values_by_source(combined_hop_entries, args.aroma_scaling)
     
     # --- Run the merger on the scaled data ---
     print("\nStarting hop data merging...")
@@ -340,5 +497,13 @@ def main():
         save_hop_entries(merged_data, website_data_path)
         print(f"Merged data also saved to {website_data_path}")
 
+    if cache is not None:
+        stats = cache.stats
+        print(
+            f"\nHTTP cache: {stats.get('revalidated', 0)} not modified (304), "
+            f"{stats.get('fresh', 0)} served fresh, {stats.get('fetched', 0)} downloaded, "
+            f"{stats.get('uncached', 0)} uncached responses"
+        )
+
 if __name__ == "__main__":
     main()
\ No newline at end of file